@@ -0,0 +1,41 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends
+import asyncpg
+
+from app.api.deps import get_current_admin_erm
+from app.core.db import get_read_db
+from app.repository.analytics_repo import AnalyticsRepository
+from app.schemas.analytics import LabelCount, RiskTypeAverage, ScoreTrendPoint
+
+# Dashboard portofolio (Admin ERM / Super Admin), dibaca dari tabel agregat (sql/006_analytics_stats.sql).
+# Rebuild agregat: POST /ops/analytics-rebuild (Super Admin, background)
+router = APIRouter(prefix="/analytics", tags=["Analytics"], dependencies=[Depends(get_current_admin_erm)])
+
+# --- 1. TREN SKOR KOMPOSIT PER PERIODE ---
+@router.get("/score-trend", response_model=List[ScoreTrendPoint])
+async def score_trend(
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db)],
+    unit_type: str | None = None
+):
+    """Rata-rata skor akhir & jumlah assessment per periode dan unit type"""
+    return await AnalyticsRepository.trend(pool, unit_type)
+
+# --- 2. DISTRIBUSI LABEL AKHIR ---
+@router.get("/label-distribution", response_model=List[LabelCount])
+async def label_distribution(
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db)],
+    period_id: int | None = None,
+    unit_type: str | None = None
+):
+    """Jumlah assessment per label akhir per unit type (semua periode jika period_id kosong)"""
+    return await AnalyticsRepository.labels(pool, period_id, unit_type)
+
+# --- 3. RATA-RATA PER RISK TYPE ---
+@router.get("/risk-types", response_model=List[RiskTypeAverage])
+async def risk_type_averages(
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db)],
+    period_id: int | None = None,
+    unit_type: str | None = None
+):
+    """Rata-rata peringkat risiko & composite per risk type"""
+    return await AnalyticsRepository.risk_types(pool, period_id, unit_type)
@@ -1,27 +1,292 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import hashlib
+import json
+from typing import Annotated, List, Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 import asyncpg
 
+from app.core.admission import get_calculate_admission
+from app.core.cache import get_idempotency_cache
 from app.core.db import get_db
+from app.core.executor import ExecutorSaturated
+from app.core.metrics import request_timeouts
+from app.core.config import settings
+from app.core.serialization import RecordJSONResponse
+from app.core.singleflight import calculate_flight
 from app.api.auth import get_current_user
-from app.schemas.assessment import AssessmentSubmit, AssessmentResponse
+from app.api.deps import get_current_admin_erm, get_read_db_for_user, get_write_db, is_admin_erm
+from app.schemas.assessment import (
+    AssessmentDetailView, AssessmentResponse, AssessmentSubmit, AssessmentSummary, BulkImportResponse
+)
 from app.repository.assessment_repo import AssessmentRepository
+from app.services.assessment_feed import assessment_feed
+from app.services.bulk_import import iter_csv, iter_ndjson, score_submissions
+from app.services.export import TempFileResponse, csv_chunks, write_xlsx
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import risk_weight_cache
+from app.schemas.simulation import SimulationRequest, SimulationResponse
+from app.services.simulation import build_spec, cache_key, run_simulation, get_simulation_cache, get_simulation_pool
 
 router = APIRouter(prefix="/assessment", tags=["Risk Profile Calculation"])
 
+def _submission_key(user_id: int, data: AssessmentSubmit) -> str:
+    """Key submission identik (user + isi) untuk single-flight & cek Idempotency-Key"""
+    payload = json.dumps({"user_id": user_id, "submission": data.model_dump(mode="json")}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def _calculate(pool: asyncpg.Pool, user_id: int, data: AssessmentSubmit) -> dict:
+    # Admission control: 429 jika user ini sudah punya request berjalan, 503 jika server penuh
+    async with get_calculate_admission().admit(user_id):
+        try:
+            # Submit & Langsung dapat balikan hasil hitungan
+            return await AssessmentRepository.calculate(
+                pool=pool, user_id=user_id, data=data,
+                acquire_timeout=settings.CALCULATE_ACQUIRE_TIMEOUT_SECONDS,
+                query_timeout=settings.CALCULATE_QUERY_TIMEOUT_SECONDS
+            )
+        except (asyncio.TimeoutError, asyncpg.QueryCanceledError):
+            # Pool habis / query terlalu lama: 503 supaya klien retry, bukan 500
+            request_timeouts.inc("assessment.calculate")
+            raise ExecutorSaturated("calculate", get_calculate_admission().retry_after)
+
 @router.post("/calculate", response_model=AssessmentResponse)
 async def calculate_risk_profile(
     data: AssessmentSubmit,
+    response: Response,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    pool: Annotated[asyncpg.Pool, Depends(get_write_db)],
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", max_length=255)] = None
+):
+    user_id = current_user['id']
+    key = _submission_key(user_id, data)
+
+    # Retry dengan Idempotency-Key yang sama: hasil pertama, tanpa simpan ulang
+    cached = get_idempotency_cache().get((user_id, idempotency_key)) if idempotency_key else None
+    if cached is not None:
+        cached_key, result = cached
+        if cached_key != key:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Idempotency-Key already used for a different submission"
+            )
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        # Double-click / retry bersamaan: ikut menunggu hasil submission identik yang sedang berjalan
+        result = await calculate_flight.do(key, lambda: _calculate(pool, user_id, data))
+        if idempotency_key:
+            get_idempotency_cache().put((user_id, idempotency_key), (key, result))
+
+    if settings.FAST_JSON_RESPONSES:
+        # table_data dibangun sendiri oleh repository: tidak perlu validasi AssessmentResponse lagi
+        return RecordJSONResponse(result, headers=response.headers)
+    return result
+
+# --- SIMULASI WHAT-IF (MONTE CARLO) ---
+@router.post("/simulate", response_model=SimulationResponse)
+async def simulate_risk_profile(
+    request: SimulationRequest,
     current_user: Annotated[dict, Depends(get_current_user)],
     pool: Annotated[asyncpg.Pool, Depends(get_db)]
 ):
-    try:
-        # Submit & Langsung dapat balikan hasil hitungan
-        result = await AssessmentRepository.calculate(
-            pool=pool, user_id=current_user['id'], data=data
+    if request.n_scenarios > settings.SIMULATION_MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"n_scenarios must be <= {settings.SIMULATION_MAX_SCENARIOS}"
+        )
+    submitted = {d.risk_type_id for d in request.submission.details}
+    unknown = [d.risk_type_id for d in request.distributions if d.risk_type_id not in submitted]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Distributions reference risk types not in submission: {unknown}"
         )
-        return result
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Calculation Failed")
+
+    table = await risk_weight_cache.get(pool, request.submission.unit_type)
+    rules = await get_risk_rule_cache().active(pool)
+    key = cache_key(request, risk_weight_cache.version, rules.version_id)
+    cached = get_simulation_cache().get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    seed = request.seed if request.seed is not None else int(key[:13], 16)
+    result = await get_simulation_pool().run(run_simulation, build_spec(request, table.risk_map, rules, seed))
+    get_simulation_cache().put(key, result)
+    return result
+
+# --- BULK IMPORT (NDJSON / CSV) ---
+# Body dibaca sebagai stream & disimpan per batch, jadi upload besar tidak ditampung di memori
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_import(
+    request: Request,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    pool: Annotated[asyncpg.Pool, Depends(get_write_db)],
+    format: Annotated[Literal["ndjson", "csv"] | None, Query()] = None
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    records = iter_csv(request.stream()) if format == "csv" else iter_ndjson(request.stream())
+
+    risk_maps = await risk_weight_cache.get_risk_maps(pool)
+    # Satu versi aturan untuk seluruh upload
+    rules = await get_risk_rule_cache().active(pool)
+    results = {}     # index -> hasil per record
+    saved_by_key = {}  # (period_id, unit_type) -> index terakhir yang tersimpan
+    batch = {}       # (period_id, unit_type) -> (index, submission)
+
+    async def flush():
+        items = list(batch.values())
+        batch.clear()
+        submissions = [sub for _, sub in items]
+        scored = score_submissions(submissions, risk_maps, rules)
+        try:
+            ids = await AssessmentRepository.bulk_save(pool, current_user['id'], submissions, scored)
+        except (asyncpg.PostgresError, OSError) as e:
+            for index, sub in items:
+                results[index].update(status="ERROR", error=f"Batch failed: {e}")
+            return
+
+        for (index, sub), header_id, calc in zip(items, ids, scored):
+            key = (sub.period_id, sub.unit_type)
+            # Record sebelumnya dengan key sama (batch lain) sudah ditimpa oleh batch ini (id tetap)
+            if key in saved_by_key:
+                results[saved_by_key[key]].update(status="REPLACED", id=None)
+            saved_by_key[key] = index
+            results[index].update(
+                status="OK",
+                id=header_id,
+                final_score=round(calc['total_composite'], 2),
+                final_rating=calc['final_label']
+            )
+
+    async for index, record in records:
+        if isinstance(record, str):
+            results[index] = {"index": index, "status": "ERROR", "error": record}
+            continue
+
+        key = (record.period_id, record.unit_type)
+        results[index] = {"index": index, "period_id": record.period_id, "unit_type": record.unit_type, "status": "PENDING"}
+        # Duplikat di batch yang sama: yang terakhir menang
+        if key in batch:
+            results[batch[key][0]]["status"] = "REPLACED"
+        batch[key] = (index, record)
+
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    ordered = [results[i] for i in sorted(results)]
+    succeeded = sum(1 for r in ordered if r["status"] == "OK")
+    return {
+        "total": len(ordered),
+        "succeeded": succeeded,
+        "failed": sum(1 for r in ordered if r["status"] == "ERROR"),
+        "results": ordered
+    }
+
+# --- EXPORT PER PERIODE (CSV / XLSX) ---
+# Dibaca dari server-side cursor per batch: memori tidak bertambah dengan jumlah baris
+@router.get("/export")
+async def export_assessments(
+    period_id: int,
+    admin: Annotated[dict, Depends(get_current_admin_erm)],
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db_for_user)],
+    format: Annotated[Literal["csv", "xlsx"], Query()] = "csv",
+    unit_type: str | None = None
+):
+    batches = AssessmentRepository.stream_export(pool, period_id, unit_type, settings.EXPORT_BATCH_SIZE)
+    filename = f"assessments_period_{period_id}" + (f"_{unit_type}" if unit_type else "")
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_chunks(batches),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+
+    # XLSX (zip) baru valid setelah selesai: tulis ke file sementara, lalu kirim dari disk
+    path = await write_xlsx(batches)
+    return TempFileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=f"{filename}.xlsx"
+    )
+
+# --- FEED SSE ASSESSMENT BARU ---
+# Pengganti polling dashboard ERM: autentikasi sekali saat connect, selanjutnya event dari
+# NOTIFY (commit /assessment/calculate) tanpa query DB per klien. Filter opsional ?period_id=&unit_type=
+@router.get("/feed")
+async def assessment_feed_stream(
+    admin: Annotated[dict, Depends(get_current_admin_erm)],
+    period_id: int | None = None,
+    unit_type: str | None = None
+):
+    if assessment_feed.full:
+        raise ExecutorSaturated("feed", retry_after=5)
+
+    async def events():
+        # Subscribe di dalam generator: klien yang putus sebelum stream mulai tidak meninggalkan subscriber
+        subscriber = assessment_feed.subscribe(period_id, unit_type)
+        if subscriber is None:
+            return
+        try:
+            # Jeda reconnect EventSource setelah stream berakhir
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if message is None:
+                    # Klien terlalu lambat / server shutdown: browser EventSource akan reconnect
+                    return
+                yield message
+        finally:
+            assessment_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --- RIWAYAT & DETAIL (dari result_snapshot) ---
+# Keyset pagination: ?before_id=<id terakhir>&limit=N (terbaru dulu), id berikutnya di header X-Next-Before-Id.
+# Riwayat user lain hanya untuk Admin ERM / Super Admin.
+@router.get("/history", response_model=List[AssessmentSummary])
+async def read_assessment_history(
+    response: Response,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db_for_user)],
+    user_id: int | None = None,
+    before_id: Annotated[int | None, Query(ge=1)] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50
+):
+    if user_id is None:
+        user_id = current_user['id']
+    elif user_id != current_user['id'] and not is_admin_erm(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges")
+
+    rows = await AssessmentRepository.history(pool, user_id, before_id, limit)
+    if len(rows) == limit:
+        response.headers["X-Next-Before-Id"] = str(rows[-1]['id'])
+    return [dict(row) for row in rows]
+
+# Harus setelah route statis (/export, /history): path param menangkap segmen apa pun
+@router.get("/{assessment_id}", response_model=AssessmentDetailView)
+async def read_assessment(
+    assessment_id: int,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    pool: Annotated[asyncpg.Pool, Depends(get_read_db_for_user)]
+):
+    assessment = await AssessmentRepository.get_snapshot(pool, assessment_id)
+    # Milik user lain tampil 404 (bukan 403) kecuali untuk Admin ERM / Super Admin
+    if assessment is None or (
+        assessment['user_id'] != current_user['id'] and not is_admin_erm(current_user)
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assessment not found")
+    return assessment
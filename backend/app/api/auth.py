@@ -5,11 +5,12 @@ import jwt
 from jwt.exceptions import InvalidTokenError
 import asyncpg
 
-from app.core.db import get_db
+from app.core.db import get_db, get_users_read_db
 from app.core.config import settings
+from app.core.cache import get_principal_cache
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    averify_password,
+    aget_password_hash,
     create_access_token,
     oauth2_scheme
 )
@@ -23,7 +24,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 # Fungsi ini dipasang di setiap endpoint yang butuh proteksi
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    pool: Annotated[asyncpg.Pool, Depends(get_db)]
+    pool: Annotated[asyncpg.Pool, Depends(get_users_read_db)]
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,10 +40,14 @@ async def get_current_user(
     except InvalidTokenError:
         raise credentials_exception
     
-    # Cek ke Database via Repository
-    user = await UserRepository.get_by_email(pool, email)
+    # Cek cache dulu, baru ke Database via Repository
+    user = get_principal_cache().get(email)
     if user is None:
-        raise credentials_exception
+        generation = get_principal_cache().generation
+        user = await UserRepository.get_principal_by_email(pool, email)
+        if user is None:
+            raise credentials_exception
+        get_principal_cache().put(email, user, generation)
     
     return user
 
@@ -58,7 +63,7 @@ async def register(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     
     # 2. Hash password
-    hashed_pw = get_password_hash(user_data.password)
+    hashed_pw = await aget_password_hash(user_data.password)
 
     # 3. Simpan ke DB
     new_user = await UserRepository.create(pool, user_data, hashed_pw)
@@ -72,7 +77,7 @@ async def register(
 @router.post("/token", response_model=Token)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    pool: Annotated[asyncpg.Pool, Depends(get_db)]
+    pool: Annotated[asyncpg.Pool, Depends(get_users_read_db)]
 ):
     # Catatan: form_data.username berisi EMAIL (bawaan OAuth2)
 
@@ -80,7 +85,7 @@ async def login(
     user = await UserRepository.get_by_email(pool, form_data.username)
 
     # 2. Verifikasi Password
-    if not user or not verify_password(form_data.password, user['password']):
+    if not user or not await averify_password(form_data.password, user['password']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
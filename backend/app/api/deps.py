@@ -1,6 +1,8 @@
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
+import asyncpg
 from app.api.auth import get_current_user
+from app.core.db import get_db, get_read_db, get_write_tracker
 from app.schemas.user import UserRole
 
 # Dependency: Wajib Super Admin
@@ -15,14 +17,40 @@ async def get_current_superuser(
         )
     return current_user
 
+# ERM atau Super Admin (boleh melihat data user lain)
+def is_admin_erm(user: dict) -> bool:
+    return user['role'] in [UserRole.ERM, UserRole.SUPER_ADMIN]
+
 # Dependency: Wajib Admin ERM (atau super admin juga boleh akses)
 async def get_current_admin_erm(
     current_user: Annotated[dict, Depends(get_current_user)]
 ) -> dict:
     # ERM atau Super Admin boleh akses
-    if current_user['role'] not in [UserRole.ERM, UserRole.SUPER_ADMIN]:
+    if not is_admin_erm(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough privileges. Admin ERM required."
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+# Dependency: Pool untuk endpoint yang menulis (primary)
+async def get_write_db(
+    primary: Annotated[asyncpg.Pool, Depends(get_db)]
+) -> asyncpg.Pool:
+    """
+    Repository menandai write_tracker setelah write ter-COMMIT (bukan di sini: request yang gagal
+    tidak boleh memindahkan baca user ke primary).
+    """
+    return primary
+
+# Dependency: Pool baca (replica), kecuali user ini baru saja menulis (read-your-writes)
+async def get_read_db_for_user(
+    current_user: Annotated[dict, Depends(get_current_user)],
+    primary: Annotated[asyncpg.Pool, Depends(get_db)],
+    replica: Annotated[asyncpg.Pool, Depends(get_read_db)]
+) -> asyncpg.Pool:
+    """
+    Read-your-writes hanya per worker (write_tracker per proses): baca yang jatuh ke worker lain
+    dalam DB_READ_AFTER_WRITE_SECONDS setelah write tetap ke replica dan bisa belum melihat write tsb.
+    """
+    return primary if get_write_tracker().is_fresh(current_user['id']) else replica
@@ -1,45 +1,34 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends
+from typing import Annotated
+from fastapi import APIRouter, Depends, Request
 import asyncpg
 
 from app.core.db import get_db
+from app.core.http_cache import cached_json_response
+from app.services.periods import period_cache
+from app.services.risk_weights import risk_weight_cache
 
 router = APIRouter(prefix="/master", tags=["Master Data"])
 
+# Kedua endpoint dilayani dari cache in-process (body & ETag sudah di-render):
+# If-None-Match yang cocok -> 304 tanpa body dan tanpa query DB.
+
 # --- 1. GET RISK TYPES ---
 @router.get("/risk-types")
 async def get_risk_types(
+    request: Request,
     unit_type: str,  # 'LPEI' or 'UUS'
     pool: Annotated[asyncpg.Pool, Depends(get_db)]
 ):
-    """Get all risk types for specific unit type"""
-    if unit_type == "UUS":
-        rows = await pool.fetch("""
-            SELECT id, name, weight_uus as weight, is_uus 
-            FROM risk_types 
-            WHERE is_uus = TRUE 
-            ORDER BY id
-        """)
-    else:
-        rows = await pool.fetch("""
-            SELECT id, name, weight_lpei as weight, is_lpei 
-            FROM risk_types 
-            WHERE is_lpei = TRUE 
-            ORDER BY id
-        """)
-    
-    return [dict(row) for row in rows]
+    """Get all risk types for specific unit type (dari cache, tanpa query DB)"""
+    table = await risk_weight_cache.get(pool, unit_type)
+    return cached_json_response(request, table.body, table.etag)
 
 # --- 2. GET PERIODS ---
 @router.get("/periods")
 async def get_periods(
+    request: Request,
     pool: Annotated[asyncpg.Pool, Depends(get_db)]
 ):
-    """Get all available periods"""
-    rows = await pool.fetch("""
-        SELECT id, name, year, quarter, start_date, end_date 
-        FROM periods 
-        ORDER BY year DESC, quarter DESC
-    """)
-    
-    return [dict(row) for row in rows]
+    """Get all available periods (dari cache, tanpa query DB)"""
+    await period_cache.ensure_loaded(pool)
+    return cached_json_response(request, period_cache.body, period_cache.etag)
@@ -0,0 +1,103 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import get_calculate_admission
+from app.core.cache import get_idempotency_cache, get_principal_cache
+from app.core.metrics import gauge_lines, register_collector, render_metrics
+from app.core.security import get_hashing_pool
+from app.core.singleflight import calculate_flight
+from app.core.startup import startup_profile
+from app.services.assessment_feed import assessment_feed
+from app.services.notify_listener import notify_listener
+from app.services.periods import period_cache
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import risk_weight_cache
+from app.services.simulation import get_simulation_cache, get_simulation_pool
+
+router = APIRouter(tags=["Metrics"])
+
+# --- PROMETHEUS SCRAPE ---
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics format Prometheus (pool DB, latency query, cache, worker pool)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@register_collector
+def _cache_metrics():
+    caches = {
+        ("principal",): get_principal_cache().stats(),
+        ("simulation",): get_simulation_cache().stats(),
+        ("idempotency",): get_idempotency_cache().stats(),
+    }
+    return (
+        gauge_lines("cache_hits", "Cache hit (kumulatif)", {k: v["hits"] for k, v in caches.items()}, ("cache",))
+        + gauge_lines("cache_misses", "Cache miss (kumulatif)", {k: v["misses"] for k, v in caches.items()}, ("cache",))
+        + gauge_lines("cache_size", "Jumlah entry cache", {k: v["size"] for k, v in caches.items()}, ("cache",))
+        + gauge_lines("risk_weight_cache_version", "Versi tabel bobot risiko yang ter-load", {(): risk_weight_cache.version})
+        + gauge_lines("risk_rule_active_version", "Id versi aturan penilaian yang aktif", {(): get_risk_rule_cache().stats()["active_version"] or 0})
+        + gauge_lines("risk_rule_compilations", "Versi aturan yang dikompilasi (kumulatif)", {(): get_risk_rule_cache().compilations})
+        + gauge_lines("period_cache_version", "Versi daftar periode yang ter-load", {(): period_cache.version})
+    )
+
+@register_collector
+def _executor_metrics():
+    pools = {(p.name,): p.stats() for p in (get_hashing_pool(), get_simulation_pool())}
+    lines = []
+    for key, help in (
+        ("running", "Pekerjaan sedang berjalan"),
+        ("waiting", "Pekerjaan menunggu slot"),
+        ("completed", "Pekerjaan selesai (kumulatif)"),
+        ("rejected", "Pekerjaan ditolak karena pool penuh (kumulatif)"),
+        ("avg_latency_ms", "Rata-rata latency (ms)"),
+        ("p99_latency_ms", "Latency p99 jendela terakhir (ms)"),
+    ):
+        lines += gauge_lines(f"worker_pool_{key}", help, {k: v[key] for k, v in pools.items()}, ("pool",))
+    return lines
+
+@register_collector
+def _admission_metrics():
+    stats = {(get_calculate_admission().name,): get_calculate_admission().stats()}
+    lines = []
+    for key, help in (
+        ("running", "Request sedang berjalan"),
+        ("waiting", "Request menunggu slot"),
+        ("users", "User dengan request berjalan"),
+        ("admitted", "Request diterima (kumulatif)"),
+    ):
+        lines += gauge_lines(f"admission_{key}", help, {k: v[key] for k, v in stats.items()}, ("controller",))
+    return lines
+
+@register_collector
+def _singleflight_metrics():
+    stats = {(calculate_flight.name,): calculate_flight.stats()}
+    return (
+        gauge_lines("singleflight_in_flight", "Pekerjaan unik sedang berjalan", {k: v["in_flight"] for k, v in stats.items()}, ("flight",))
+        + gauge_lines("singleflight_calls", "Panggilan (kumulatif)", {k: v["calls"] for k, v in stats.items()}, ("flight",))
+        + gauge_lines("singleflight_coalesced", "Panggilan yang menunggu hasil panggilan identik (kumulatif)", {k: v["coalesced"] for k, v in stats.items()}, ("flight",))
+    )
+
+@register_collector
+def _feed_metrics():
+    stats = assessment_feed.stats()
+    return (
+        gauge_lines("feed_subscribers", "Klien SSE /assessment/feed tersambung", {(): stats["subscribers"]})
+        + gauge_lines("feed_published", "Event assessment yang di-fan-out (kumulatif)", {(): stats["published"]})
+        + gauge_lines("feed_dropped", "Klien diputus karena antrean penuh (kumulatif)", {(): stats["dropped"]})
+    )
+
+@register_collector
+def _notify_listener_metrics():
+    stats = notify_listener.stats()
+    return (
+        gauge_lines("notify_listener_connected", "Koneksi LISTEN bersama worker tersambung (1/0)", {(): int(stats["connected"])})
+        + gauge_lines("notify_listener_channels", "Channel NOTIFY yang di-LISTEN", {(): len(stats["channels"])})
+        + gauge_lines("notify_listener_reconnects", "Reconnect koneksi LISTEN (kumulatif)", {(): stats["reconnects"]})
+    )
+
+@register_collector
+def _startup_metrics():
+    report = startup_profile.report()
+    return (
+        gauge_lines("startup_phase_seconds", "Durasi fase startup proses ini", {(k,): v for k, v in report["phases"].items()}, ("phase",))
+        + gauge_lines("startup_ready_seconds", "Detik sejak import app.main sampai siap menerima request", {(): report["ready_seconds"] or 0})
+    )
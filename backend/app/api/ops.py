@@ -0,0 +1,105 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, status
+import asyncpg
+
+from app.api.deps import get_current_admin_erm, get_current_superuser
+from app.core.cache import get_principal_cache
+from app.core.db import get_db
+from app.core.security import get_hashing_pool
+from app.core.startup import startup_profile
+from app.repository.recompute_repo import RecomputeRepository
+from app.schemas.recompute import RecomputeJobResponse
+from app.services.analytics_rebuild import analytics_rebuild_runner
+from app.services.recompute import recompute_runner
+from app.services.simulation import get_simulation_cache, get_simulation_pool
+
+router = APIRouter(prefix="/ops", tags=["Operations"])
+
+# --- 1. STATISTIK CACHE PRINCIPAL ---
+@router.get("/principal-cache")
+async def principal_cache_stats(
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """Hit/miss counter cache user terautentikasi"""
+    return get_principal_cache().stats()
+
+# --- 2. STATISTIK POOL HASHING PASSWORD ---
+@router.get("/hash-pool")
+async def hash_pool_stats(
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """Antrean, penolakan & latency pool Argon2"""
+    return get_hashing_pool().stats()
+
+# --- 3. STATISTIK SIMULASI ---
+@router.get("/simulation")
+async def simulation_stats(
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """Process pool & cache hasil simulasi Monte Carlo"""
+    return {"pool": get_simulation_pool().stats(), "cache": get_simulation_cache().stats()}
+
+# --- 4. HITUNG ULANG SKOR SETELAH BOBOT BERUBAH ---
+@router.post("/recompute", response_model=RecomputeJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_recompute(
+    pool: Annotated[asyncpg.Pool, Depends(get_db)],
+    admin: Annotated[dict, Depends(get_current_admin_erm)]
+):
+    """Hitung ulang semua assessment dengan bobot risk_types terbaru (background, per chunk)"""
+    job = await recompute_runner.start_job(pool, admin['id'])
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Another recompute job is still running")
+    return job
+
+@router.get("/recompute/{job_id}", response_model=RecomputeJobResponse)
+async def recompute_status(
+    job_id: int,
+    pool: Annotated[asyncpg.Pool, Depends(get_db)],
+    admin: Annotated[dict, Depends(get_current_admin_erm)]
+):
+    """Progress job recompute"""
+    job = await RecomputeRepository.get_job(pool, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recompute job not found")
+    return job
+
+@router.post("/recompute/{job_id}/resume", response_model=RecomputeJobResponse)
+async def resume_recompute(
+    job_id: int,
+    pool: Annotated[asyncpg.Pool, Depends(get_db)],
+    admin: Annotated[dict, Depends(get_current_admin_erm)]
+):
+    """Lanjutkan job FAILED dari checkpoint terakhir"""
+    job = await recompute_runner.resume_job(pool, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job not found, not FAILED, or another job is running")
+    return job
+
+# --- 5. PROFIL COLD START ---
+@router.get("/startup")
+async def startup_stats(
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """Durasi tiap fase startup (import router, build app, pool DB, warm-up cache) & waktu sampai siap"""
+    return startup_profile.report()
+
+# --- 6. REBUILD AGREGAT ANALYTICS ---
+@router.post("/analytics-rebuild", status_code=status.HTTP_202_ACCEPTED)
+async def start_analytics_rebuild(
+    pool: Annotated[asyncpg.Pool, Depends(get_db)],
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """
+    Hitung ulang semua agregat dari tabel sumber (fallback bila agregat diragukan), di background.
+    Selama rebuild, submission assessment menunggu lock tabel agregat.
+    """
+    if not await analytics_rebuild_runner.start(pool):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Analytics rebuild is already running")
+    return analytics_rebuild_runner.status()
+
+@router.get("/analytics-rebuild")
+async def analytics_rebuild_status(
+    admin: Annotated[dict, Depends(get_current_superuser)]
+):
+    """Status rebuild terakhir yang dijalankan worker ini"""
+    return analytics_rebuild_runner.status()
@@ -1,9 +1,14 @@
+import json
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 import asyncpg
 
-from app.core.db import get_db
-from app.core.security import get_password_hash
+from app.core import serialization
+from app.core.config import settings
+from app.core.db import get_db, get_users_read_db
+from app.core.serialization import RecordJSONResponse
+from app.core.security import aget_password_hash
 from app.schemas.user import UserResponse, UserCreate, UserUpdate
 from app.repository.user_repo import UserRepository
 from app.api.deps import get_current_superuser
@@ -11,18 +16,44 @@ from app.api.deps import get_current_superuser
 router = APIRouter(prefix="/users", tags=["Users Management"])
 
 # --- 1. LIHAT SEMUA USER ---
+# Keyset pagination: ?after_id=<id terakhir>&limit=N (default 100, maks 1000), id berikutnya dikirim
+# di header X-Next-After-Id. Seluruh tabel hanya lewat ?stream=true: NDJSON baris per baris dari
+# server-side cursor (untuk directory sync)
 @router.get("/", response_model=List[UserResponse])
 async def read_users(
-    pool: Annotated[asyncpg.Pool, Depends(get_db)],
-    admin: dict = Depends(get_current_superuser)
+    response: Response,
+    pool: Annotated[asyncpg.Pool, Depends(get_users_read_db)],
+    admin: dict = Depends(get_current_superuser),
+    after_id: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    stream: bool = False
 ):
-    return await UserRepository.get_all(pool)
+    if stream:
+        async def ndjson():
+            async for row in UserRepository.stream_all(pool, after_id):
+                if settings.FAST_JSON_RESPONSES:
+                    yield serialization.dumps(row, utc_z=False) + b"\n"
+                else:
+                    yield json.dumps(dict(row), default=_json_default) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    users = await UserRepository.get_all(pool, after_id, limit)
+    if len(users) == limit:
+        response.headers["X-Next-After-Id"] = str(users[-1]['id'])
+    if settings.FAST_JSON_RESPONSES:
+        # Record langsung ke orjson, tanpa validasi UserResponse
+        return RecordJSONResponse(users, headers=response.headers)
+    return [dict(row) for row in users]
+
+def _json_default(value):
+    # datetime (created_at) -> ISO 8601, sama seperti response JSON biasa
+    return value.isoformat()
 
 # --- 2. LIHAT 1 USER ---
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: int,
-    pool: Annotated[asyncpg.Pool, Depends(get_db)],
+    pool: Annotated[asyncpg.Pool, Depends(get_users_read_db)],
     admin: dict = Depends(get_current_superuser)
 ):
     user = await UserRepository.get_by_id(pool, user_id)
@@ -40,7 +71,7 @@ async def create_user(
     if await UserRepository.get_by_email(pool, user_in.email):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     
-    hashed_pw = get_password_hash(user_in.password)
+    hashed_pw = await aget_password_hash(user_in.password)
     new_user = await UserRepository.create(pool, user_in, hashed_pw)
     return new_user
 
@@ -67,7 +98,6 @@ async def delete_user(
     # Mencegah admin menghapus dirinya sendiri
     if user_id == admin['id']:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot delete yourself")
-    result = await pool.execute("DELETE FROM users WHERE id = $1", user_id)
-    if result == "DELETE 0":
+    if not await UserRepository.delete(pool, user_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return {"message": "User deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,112 @@
+import asyncio
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Hashable
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.executor import ExecutorSaturated
+from app.core.metrics import admission_rejected
+
+
+class UserConcurrencyLimited(HTTPException):
+    """User yang sama sudah punya terlalu banyak request berjalan: 429, bukan ikut antre"""
+
+    def __init__(self, name: str, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many concurrent requests ({name}), please retry",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class AdmissionController:
+    """
+    Admission control untuk endpoint yang memakai koneksi DB (mis. /assessment/calculate),
+    supaya saat lonjakan request ditolak cepat daripada antre di pool sampai command_timeout.
+    - max `per_user` request berjalan per user; lebih dari itu 429
+    - max `max_in_flight` request berjalan bersamaan, `max_queue` menunggu slot;
+      antrean penuh / menunggu lebih dari `queue_timeout` detik -> 503
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        per_user: int,
+        retry_after: int = 1,
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_user = per_user
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._by_user: Dict[Hashable, int] = {}
+        self._waiting = 0
+        self._running = 0
+        self.admitted = 0
+
+    def _reject(self, reason: str, error: type[HTTPException]):
+        admission_rejected.inc(self.name, reason)
+        raise error(self.name, self.retry_after)
+
+    @asynccontextmanager
+    async def admit(self, user_key: Hashable):
+        if self._by_user.get(user_key, 0) >= self.per_user:
+            self._reject("user_limit", UserConcurrencyLimited)
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._reject("queue_full", ExecutorSaturated)
+
+        self._by_user[user_key] = self._by_user.get(user_key, 0) + 1
+        try:
+            if not self._semaphore.locked():
+                # Slot kosong: ambil langsung (tanpa task wait_for) supaya request berikutnya melihat slot terpakai
+                await self._semaphore.acquire()
+            else:
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self._reject("queue_timeout", ExecutorSaturated)
+                finally:
+                    self._waiting -= 1
+
+            self._running += 1
+            self.admitted += 1
+            try:
+                yield
+            finally:
+                self._running -= 1
+                self._semaphore.release()
+        finally:
+            remaining = self._by_user[user_key] - 1
+            if remaining:
+                self._by_user[user_key] = remaining
+            else:
+                del self._by_user[user_key]
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "max_in_flight": self.max_in_flight,
+            "running": self._running,
+            "waiting": self._waiting,
+            "users": len(self._by_user),
+            "admitted": self.admitted,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_calculate_admission() -> AdmissionController:
+    return AdmissionController(
+        name="calculate",
+        max_in_flight=settings.CALCULATE_MAX_IN_FLIGHT,
+        max_queue=settings.CALCULATE_MAX_QUEUE,
+        queue_timeout=settings.CALCULATE_QUEUE_TIMEOUT_SECONDS,
+        per_user=settings.CALCULATE_PER_USER_LIMIT,
+    )
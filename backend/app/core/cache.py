@@ -0,0 +1,133 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """LRU cache dengan batas jumlah entry + TTL per entry, plus counter hit/miss"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._removed(key, value)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            self._removed(old_key, old_value)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self._removed(key, entry[1])
+        return entry[1]
+
+    def _removed(self, key: Hashable, value: Any):
+        """Dipanggil setiap entry keluar (expired / evicted / pop); subclass merapikan index tambahan"""
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class PrincipalCache(TTLCache):
+    """
+    Cache user yang sudah terautentikasi, key = subject token (email).
+    Hanya menyimpan field yang dibutuhkan endpoint (tanpa password hash).
+    Update/delete user di worker mana pun sampai ke semua worker lewat NOTIFY `users_changed`
+    (trigger sql/009_users_notify.sql, didaftarkan di app/main.py ke notify_listener).
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__(max_size, ttl_seconds)
+        self._key_by_user_id: dict[int, Hashable] = {}
+        # Naik setiap invalidate: hasil query yang dimulai sebelum invalidate tidak boleh masuk cache
+        self.generation = 0
+
+    def put(self, key: Hashable, value: dict, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        super().put(key, value)
+        self._key_by_user_id[value["id"]] = key
+
+    def _removed(self, key: Hashable, value: dict):
+        # Index ikut dirapikan, kecuali sudah menunjuk key lain (email user berubah)
+        if self._key_by_user_id.get(value["id"]) == key:
+            del self._key_by_user_id[value["id"]]
+
+    def invalidate_user(self, user_id: int):
+        """Dipanggil saat user di-update/di-delete"""
+        self.generation += 1
+        key = self._key_by_user_id.get(user_id)
+        if key is not None:
+            self.pop(key)
+
+    def on_notify(self, payload: str):
+        """NOTIFY users_changed: payload = id user, kosong = TRUNCATE"""
+        if payload:
+            self.invalidate_user(int(payload))
+        else:
+            self.clear()
+
+    def clear(self):
+        self.generation += 1
+        self._key_by_user_id.clear()
+        super().clear()
+
+
+# Channel NOTIFY dari trigger di sql/009_users_notify.sql
+USERS_CHANNEL = "users_changed"
+
+@lru_cache(maxsize=1)
+def get_principal_cache() -> PrincipalCache:
+    return PrincipalCache(
+        max_size=settings.PRINCIPAL_CACHE_SIZE,
+        ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+
+
+# Hasil /assessment/calculate per (user_id, Idempotency-Key): retry klien dengan key yang sama
+# mendapat hasil pertama tanpa menyimpan ulang. Per proses; retry yang jatuh ke worker lain
+# tetap aman karena simpan submission bersifat upsert.
+@lru_cache(maxsize=1)
+def get_idempotency_cache() -> TTLCache:
+    return TTLCache(
+        max_size=settings.IDEMPOTENCY_CACHE_SIZE,
+        ttl_seconds=settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+    )
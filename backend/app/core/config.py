@@ -1,3 +1,5 @@
+from functools import lru_cache
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -10,12 +12,107 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Pool koneksi database
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_COMMAND_TIMEOUT: float = 60
+    DB_ACQUIRE_TIMEOUT: float | None = 10 # detik menunggu koneksi kosong (None = tanpa batas)
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300
+    DB_SLOW_QUERY_MS: float = 200
+
+    # Replica baca (opsional): query read-only diarahkan ke sini, kredensial sama dengan primary
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None # default DB_PORT
+    # Read-your-writes: selama jendela ini setelah write, baca dari primary (lag replica)
+    DB_READ_AFTER_WRITE_SECONDS: float = 5.0
+
+    # Response JSON via orjson langsung dari Record, tanpa validasi response_model (lihat core/serialization.py)
+    FAST_JSON_RESPONSES: bool = False
+
+    # Cache-Control max-age endpoint /master (0 = browser selalu revalidate dengan If-None-Match)
+    MASTER_DATA_MAX_AGE_SECONDS: int = 0
+
+    # Admission control /assessment/calculate: request berjalan, antrean slot, batas per user,
+    # dan batas tunggu koneksi / durasi query (lewat dari itu 503 + Retry-After, bukan 500)
+    CALCULATE_MAX_IN_FLIGHT: int = 20
+    CALCULATE_MAX_QUEUE: int = 50
+    CALCULATE_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    CALCULATE_PER_USER_LIMIT: int = 2
+    CALCULATE_ACQUIRE_TIMEOUT_SECONDS: float = 2.0
+    CALCULATE_QUERY_TIMEOUT_SECONDS: float = 10.0
+
+    # Idempotency-Key /assessment/calculate: jumlah & umur hasil yang disimpan untuk retry
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 24 * 3600
+
+    # Feed SSE /assessment/feed per worker: batas klien, antrean per klien (penuh = klien diputus),
+    # interval heartbeat (komentar SSE) agar koneksi idle tidak diputus proxy
+    FEED_MAX_SUBSCRIBERS: int = 5000
+    FEED_CLIENT_QUEUE_SIZE: int = 100
+    FEED_HEARTBEAT_SECONDS: float = 15
+
+    # Versi aturan penilaian (risk_rule_*) yang disimpan hasil kompilasinya per worker (LRU)
+    RISK_RULE_CACHE_SIZE: int = 16
+
+    # Bulk import: jumlah assessment per transaksi COPY
+    BULK_IMPORT_BATCH_SIZE: int = 500
+
+    # Export assessment per periode: baris per fetch cursor
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Job hitung ulang skor setelah bobot berubah: assessment per transaksi & jeda antar chunk
+    RECOMPUTE_CHUNK_SIZE: int = 500
+    RECOMPUTE_CHUNK_PAUSE_SECONDS: float = 0.05
+    # Chunk yang deadlock diulang dengan jeda naik (pause x 2^n); lebih dari ini job FAILED (bisa di-resume)
+    RECOMPUTE_DEADLOCK_RETRIES: int = 5
+
+    # Cache user terautentikasi (get_current_user). Update/delete user di-broadcast ke semua worker
+    # (NOTIFY users_changed); TTL hanya batas atas basi selama koneksi LISTEN terputus (saat
+    # tersambung lagi cache dikosongkan), jadi jangan dinaikkan jauh di atas 60 detik.
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+
+    # Worker pool untuk hashing password (Argon2)
+    HASH_POOL_KIND: Literal["thread", "process"] = "thread"
+    HASH_POOL_WORKERS: int = 4
+    HASH_POOL_MAX_QUEUE: int = 64
+    HASH_POOL_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Simulasi Monte Carlo (/assessment/simulate)
+    SIMULATION_POOL_WORKERS: int = 2
+    SIMULATION_MAX_QUEUE: int = 8
+    SIMULATION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    SIMULATION_MAX_SCENARIOS: int = 200_000
+    SIMULATION_CACHE_SIZE: int = 256
+    SIMULATION_CACHE_TTL_SECONDS: float = 3600
+
     # Helper: Merakit URL koneksi otomatis 
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def REPLICA_DATABASE_URL(self) -> str | None:
+        if not self.DB_REPLICA_HOST:
+            return None
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_REPLICA_HOST}:{port}/{self.DB_NAME}"
     
     # Config untuk baca file .env di root folder
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore")
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings dibaca (env / .env) saat pertama kali dipakai, bukan saat modul di-import"""
+    return Settings()
+
+class _LazySettings:
+    """Proxy `settings`: kode lama tetap `settings.X`, instance asli dibuat lewat get_settings()"""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+settings = _LazySettings()
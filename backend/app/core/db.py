@@ -1,29 +1,166 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
 import asyncpg
-from fastapi import HTTPException, status
+from typing import Annotated
+from fastapi import Depends, HTTPException, status
 from app.core.config import settings
+from app.core.metrics import db_acquire_timeouts, db_acquire_wait, gauge_lines, register_collector
+
+class InstrumentedPool:
+    """
+    Pembungkus asyncpg.Pool (hanya API publik): metrics waktu tunggu acquire & default acquire
+    timeout dari Settings. fetch/fetchrow/fetchval/execute juga lewat acquire() di sini supaya terukur.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, pool_name: str, acquire_timeout: float | None, release_timeout: float):
+        self._pool = pool
+        self.pool_name = pool_name
+        self.acquire_timeout = acquire_timeout
+        # Batas reset koneksi saat dikembalikan, terpisah dari acquire timeout (default asyncpg = timeout acquire)
+        self.release_timeout = release_timeout
+
+    @asynccontextmanager
+    async def acquire(self, timeout: float | None = None):
+        if timeout is None:
+            timeout = self.acquire_timeout
+        start = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            db_acquire_timeouts.inc(self.pool_name)
+            raise
+        finally:
+            db_acquire_wait.observe(time.perf_counter() - start, self.pool_name)
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn, timeout=self.release_timeout)
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: float | None = None) -> list:
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    def get_max_size(self) -> int:
+        return self._pool.get_max_size()
+
+    def get_size(self) -> int:
+        return self._pool.get_size()
+
+    def get_idle_size(self) -> int:
+        return self._pool.get_idle_size()
+
+    async def close(self):
+        await self._pool.close()
+
+class WriteTracker:
+    """
+    Waktu write terakhir per key (id user / nama tabel) untuk read-your-writes:
+    selama DB_READ_AFTER_WRITE_SECONDS setelah write, pembacaan key tsb diarahkan ke primary.
+    Per proses (seperti cache principal), cukup karena request lanjutan biasanya ke worker yang sama
+    dan lag replica normalnya jauh di bawah jendela ini.
+    """
+
+    PRUNE_THRESHOLD = 10_000
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._written_at: dict = {}
+
+    def mark(self, *keys):
+        now = time.monotonic()
+        for key in keys:
+            self._written_at[key] = now
+        if len(self._written_at) > self.PRUNE_THRESHOLD:
+            cutoff = now - self.window_seconds
+            self._written_at = {k: t for k, t in self._written_at.items() if t >= cutoff}
+
+    def is_fresh(self, *keys) -> bool:
+        cutoff = time.monotonic() - self.window_seconds
+        return any(self._written_at.get(key, -1.0) >= cutoff for key in keys)
+
+
+# Key tabel users: principal lookup (get_current_user) ke primary sesaat setelah user berubah
+USERS_TABLE = "users"
 
 # Global Variable untuk Pool
-db_pool: asyncpg.Pool | None = None
+db_pool: InstrumentedPool | None = None
+# Pool replica (None = tidak dikonfigurasi, semua baca ke primary)
+read_pool: InstrumentedPool | None = None
+
+@lru_cache(maxsize=1)
+def get_write_tracker() -> WriteTracker:
+    return WriteTracker(settings.DB_READ_AFTER_WRITE_SECONDS)
+
+async def _create_pool(dsn: str, pool_name: str, init, connection_class) -> InstrumentedPool:
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        max_queries=50000,
+        max_inactive_connection_lifetime=settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+        init=init,
+        connection_class=connection_class,
+        command_timeout=settings.DB_COMMAND_TIMEOUT,
+    )
+    return InstrumentedPool(
+        pool, pool_name,
+        acquire_timeout=settings.DB_ACQUIRE_TIMEOUT,
+        release_timeout=settings.DB_COMMAND_TIMEOUT,
+    )
 
-async def create_db_pool():
-    """Jalankan saat server start"""
-    global db_pool
+async def create_db_pool(init=None, connection_class=asyncpg.Connection, replica_init=None):
+    """
+    Jalankan saat server start. `init` dipanggil sekali untuk setiap koneksi baru (mis. prepare statement);
+    `replica_init` untuk koneksi replica (default sama dengan `init`)
+    """
+    global db_pool, read_pool
     print(f"🚀 Connecting to Database...")
-    try:
-        db_pool = await asyncpg.create_pool(
-            settings.DATABASE_URL,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
-        print("✅ DB Connected.")
-    except Exception as e:
-        print(f"❌ DB Connection Error: {e}")
-        raise e
-    
+    # Primary & replica dibuka bersamaan (koneksi min_size tiap pool juga dibuka paralel oleh asyncpg)
+    pending = [_create_pool(settings.DATABASE_URL, "primary", init, connection_class)]
+    if settings.REPLICA_DATABASE_URL:
+        pending.append(_create_pool(settings.REPLICA_DATABASE_URL, "replica", replica_init or init, connection_class))
+    primary, *replica = await asyncio.gather(*pending, return_exceptions=True)
+
+    if isinstance(primary, BaseException):
+        print(f"❌ DB Connection Error: {primary}")
+        for pool in replica:
+            if not isinstance(pool, BaseException):
+                await pool.close()
+        raise primary
+    db_pool = primary
+    print("✅ DB Connected.")
+
+    for pool in replica:
+        if isinstance(pool, BaseException):
+            # Replica tidak wajib: tanpa replica semua baca tetap jalan di primary
+            print(f"⚠️ Replica Connection Error, reads use primary: {pool}")
+            read_pool = None
+        else:
+            read_pool = pool
+            print("✅ Replica Connected.")
+    return db_pool
+
 async def close_db_pool():
     """Jalankan saat server stop"""
-    global db_pool
+    global db_pool, read_pool
+    if read_pool:
+        await read_pool.close()
+        read_pool = None
     if db_pool:
         await db_pool.close()
         print("🛑 DB Disconnected.")
@@ -33,3 +170,35 @@ async def get_db():
     if db_pool is None:
         raise HTTPException(status_code=503, detail="DB not initialized")
     return db_pool
+
+async def get_read_db():
+    """Pool untuk query read-only: replica jika ada, selain itu primary"""
+    if read_pool is not None:
+        return read_pool
+    return await get_db()
+
+async def get_users_read_db(
+    primary: Annotated[asyncpg.Pool, Depends(get_db)],
+    replica: Annotated[asyncpg.Pool, Depends(get_read_db)]
+):
+    """Baca tabel users: ke primary sesaat setelah ada user dibuat/diubah/dihapus"""
+    return primary if get_write_tracker().is_fresh(USERS_TABLE) else replica
+
+@register_collector
+def _pool_metrics():
+    pools = [p for p in (db_pool, read_pool) if p is not None]
+    if not pools:
+        return []
+    max_size, size, idle, in_use = {}, {}, {}, {}
+    for pool in pools:
+        name = (pool.pool_name,)
+        max_size[name] = pool.get_max_size()
+        size[name] = pool.get_size()
+        idle[name] = pool.get_idle_size()
+        in_use[name] = size[name] - idle[name]
+    return (
+        gauge_lines("db_pool_max_size", "Batas koneksi pool", max_size, ("pool",))
+        + gauge_lines("db_pool_size", "Koneksi terbuka", size, ("pool",))
+        + gauge_lines("db_pool_idle", "Koneksi idle", idle, ("pool",))
+        + gauge_lines("db_pool_in_use", "Koneksi sedang dipakai", in_use, ("pool",))
+    )
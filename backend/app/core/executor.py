@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Literal
+
+from fastapi import HTTPException, status
+
+
+class ExecutorSaturated(HTTPException):
+    """Pool penuh: caller langsung dapat 503, bukan ikut antre tanpa batas"""
+
+    def __init__(self, name: str, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy ({name}), please retry",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class BoundedExecutor:
+    """
+    Thread/process pool untuk pekerjaan CPU-bound (hashing, simulasi) agar event loop tidak ter-blok.
+    - max `workers` pekerjaan berjalan bersamaan
+    - max `max_queue` pekerjaan menunggu; lebih dari itu langsung ditolak (503)
+    - menunggu slot lebih dari `queue_timeout` detik juga ditolak (503)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        max_queue: int,
+        queue_timeout: float,
+        kind: Literal["thread", "process"] = "thread",
+        latency_window: int = 1024,
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._waiting = 0
+        self._running = 0
+
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._latency_sum = 0.0
+        self._wait_sum = 0.0
+        self._latencies = deque(maxlen=latency_window)
+
+    def _get_executor(self) -> Executor:
+        # Dibuat saat pertama dipakai (di dalam event loop yang sedang berjalan)
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: aman dipakai dari proses uvicorn yang sudah punya thread & event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        executor = self._get_executor()
+
+        # Admission control: antrean penuh -> tolak tanpa menunggu
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name)
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name)
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - start
+        self._running += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Worker mati (OOM, dll): buang pool, panggilan berikutnya membuat pool baru
+            self.failed += 1
+            if self._executor is executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self._wait_sum += waited
+        self._latency_sum += elapsed
+        self._latencies.append(elapsed)
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+    def stats(self) -> dict:
+        recent = sorted(self._latencies)
+
+        def pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else 0.0
+
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "waiting": self._waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "avg_wait_ms": round(self._wait_sum / self.completed * 1000, 3) if self.completed else 0.0,
+            "avg_latency_ms": round(self._latency_sum / self.completed * 1000, 3) if self.completed else 0.0,
+            "p50_latency_ms": pct(0.50),
+            "p99_latency_ms": pct(0.99),
+        }
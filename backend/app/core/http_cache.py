@@ -0,0 +1,38 @@
+"""
+Conditional GET (ETag / If-None-Match) untuk data yang jarang berubah.
+Body & ETag di-render sekali saat cache di-load, jadi request 304 tidak menyentuh DB
+dan request 200 tidak perlu serialisasi ulang.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag dari hash isi body (sama di semua worker untuk data yang sama)"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match memakai weak comparison (RFC 9110): prefix W/ diabaikan"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cached_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """304 jika ETag klien masih sama, selain itu body JSON yang sudah di-render"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MASTER_DATA_MAX_AGE_SECONDS}, must-revalidate",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
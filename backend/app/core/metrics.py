@@ -0,0 +1,176 @@
+"""
+Metrics sederhana format Prometheus (text exposition 0.0.4) tanpa dependency tambahan.
+"""
+import functools
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.core.config import settings
+
+# Bucket latency (detik) untuk query & acquire pool
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., +Inf], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str):
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {self._sums[labels]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def gauge_lines(name: str, help: str, samples: Dict[LabelValues, float], labelnames: Tuple[str, ...] = ()) -> List[str]:
+    """Gauge yang nilainya dihitung saat scrape (pool size, ukuran cache, dll)"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples.items():
+        lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+    return lines
+
+
+# --- METRICS DATABASE ---
+db_acquire_wait = Histogram(
+    "db_pool_acquire_wait_seconds", "Waktu menunggu koneksi dari pool", ("pool",)
+)
+db_acquire_timeouts = Counter(
+    "db_pool_acquire_timeouts_total", "Acquire koneksi yang timeout", ("pool",)
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Latency per query repository (nama query)", ("query",)
+)
+db_query_errors = Counter(
+    "db_query_errors_total", "Query repository yang gagal", ("query",)
+)
+db_slow_queries = Counter(
+    "db_slow_queries_total", "Query di atas DB_SLOW_QUERY_MS", ("query",)
+)
+
+# --- METRICS ADMISSION CONTROL ---
+admission_rejected = Counter(
+    "admission_rejected_total", "Request ditolak admission control (user_limit / queue_full / queue_timeout)",
+    ("controller", "reason")
+)
+request_timeouts = Counter(
+    "request_timeouts_total", "Request yang gagal karena timeout acquire / query DB", ("endpoint",)
+)
+
+# Sumber gauge tambahan (dipanggil saat scrape): fungsi tanpa argumen -> list baris
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]):
+    _collectors.append(collector)
+    return collector
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in (
+        db_acquire_wait, db_acquire_timeouts, db_query_duration, db_query_errors, db_slow_queries,
+        admission_rejected, request_timeouts,
+    ):
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+def _record_query(name: str, elapsed: float, slow_log: bool = True):
+    db_query_duration.observe(elapsed, name)
+    if slow_log and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        db_slow_queries.inc(name)
+        print(f"🐢 Slow query {name}: {elapsed * 1000:.1f} ms")
+
+
+def timed_query(name: str):
+    """Decorator method repository: catat latency + slow query log dengan nama `name`"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                db_query_errors.inc(name)
+                raise
+            finally:
+                _record_query(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def timed_stream(name: str):
+    """Seperti timed_query untuk async generator (durasi = sampai stream selesai, tanpa slow log)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                async for item in fn(*args, **kwargs):
+                    yield item
+            except Exception:
+                db_query_errors.inc(name)
+                raise
+            finally:
+                _record_query(name, time.perf_counter() - start, slow_log=False)
+        return wrapper
+    return decorator
@@ -0,0 +1,217 @@
+"""
+Runner migrasi skema berversi: file sql/NNN_nama.sql dijalankan urut nomor, yang sudah diterapkan
+dicatat di tabel schema_migrations (beserta checksum isi file). Jalankan dari folder backend:
+
+    python -m app.core.migrations                 # terapkan migrasi yang belum
+    python -m app.core.migrations --status        # daftar migrasi & statusnya
+    python -m app.core.migrations --baseline 7    # database lama yang 000-007-nya dijalankan manual
+
+- 000_base_schema.sql hanya untuk bootstrap database kosong (ditambahkan setelah 001-011). Database
+  yang sudah punya riwayat migrasi tidak pernah menjalankannya: 000 cukup dicatat sebagai applied.
+  Database lama yang dibuat manual di-baseline dulu (--baseline N juga mencatat 000). Perubahan skema
+  selalu lewat file bernomor baru, file yang sudah diterapkan tidak diedit (checksum berubah).
+- Advisory lock sesi: deploy / worker yang jalan bersamaan tidak menerapkan migrasi yang sama dua kali.
+- 1 file = 1 transaksi bersama pencatatannya. File berisi baris `-- migrate: no-transaction`
+  (mis. CREATE INDEX CONCURRENTLY) dijalankan per statement di luar transaksi, jadi statement-nya
+  harus idempotent (IF NOT EXISTS) supaya aman diulang setelah gagal di tengah.
+"""
+import argparse
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import asyncpg
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "sql"
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+# Kunci advisory lock runner (sama di semua proses)
+LOCK_KEY = "schema_migrations"
+# Skema dasar: hanya dijalankan di database yang belum punya migrasi tercatat
+BOOTSTRAP_VERSION = 0
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return NO_TRANSACTION_MARKER not in self.sql
+
+    @property
+    def label(self) -> str:
+        return f"{self.version:03d}_{self.name}"
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path.read_text())
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def split_statements(sql: str) -> List[str]:
+    """Pecah file no-transaction per `;` di akhir baris (file jenis ini tidak boleh berisi fungsi $$)"""
+    statements = []
+    for chunk in re.split(r";\s*$", sql, flags=re.MULTILINE):
+        code = "\n".join(line for line in chunk.splitlines() if not line.strip().startswith("--")).strip()
+        if code:
+            statements.append(code)
+    return statements
+
+
+async def _ensure_table(conn: asyncpg.Connection):
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     INTEGER PRIMARY KEY,
+            name        TEXT NOT NULL,
+            checksum    TEXT NOT NULL,
+            applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+
+async def _applied(conn: asyncpg.Connection) -> Dict[int, asyncpg.Record]:
+    rows = await conn.fetch("SELECT version, name, checksum, applied_at FROM schema_migrations")
+    return {r['version']: r for r in rows}
+
+
+async def _record(conn: asyncpg.Connection, migration: Migration):
+    await conn.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+        migration.version, migration.name, migration.checksum
+    )
+
+
+async def _locked(conn: asyncpg.Connection, work):
+    await conn.execute("SELECT pg_advisory_lock(hashtext($1))", LOCK_KEY)
+    try:
+        await _ensure_table(conn)
+        return await work()
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", LOCK_KEY)
+
+
+async def migrate(conn: asyncpg.Connection, migrations: Optional[List[Migration]] = None,
+                  target: Optional[int] = None) -> List[Migration]:
+    """Terapkan migrasi yang belum (sampai `target` jika diisi). Return: migrasi yang baru diterapkan."""
+    migrations = discover() if migrations is None else migrations
+
+    async def work():
+        applied = await _applied(conn)
+        done = []
+        for migration in migrations:
+            if target is not None and migration.version > target:
+                break
+            if migration.version == BOOTSTRAP_VERSION and migration.version not in applied and applied:
+                # Database sudah dimigrasi sebelum 000 ada: skema dasarnya sudah ada, jangan dijalankan
+                print(f"⏭️ Skipping {migration.label} (bootstrap only), marked as applied")
+                await _record(conn, migration)
+                continue
+            row = applied.get(migration.version)
+            if row is not None:
+                if row['checksum'] != migration.checksum:
+                    print(f"⚠️ Migration {migration.label} changed after it was applied")
+                continue
+            print(f"⬆️ Applying {migration.label}")
+            if migration.transactional:
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await _record(conn, migration)
+            else:
+                for statement in split_statements(migration.sql):
+                    await conn.execute(statement)
+                await _record(conn, migration)
+            done.append(migration)
+        return done
+
+    return await _locked(conn, work)
+
+
+async def baseline(conn: asyncpg.Connection, version: int, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """Tandai migrasi <= `version` sudah diterapkan tanpa menjalankannya (skema dibuat manual)"""
+    migrations = discover() if migrations is None else migrations
+
+    async def work():
+        applied = await _applied(conn)
+        marked = [m for m in migrations if m.version <= version and m.version not in applied]
+        for migration in marked:
+            await _record(conn, migration)
+        return marked
+
+    return await _locked(conn, work)
+
+
+async def status(conn: asyncpg.Connection, migrations: Optional[List[Migration]] = None) -> List[dict]:
+    migrations = discover() if migrations is None else migrations
+    await _ensure_table(conn)
+    applied = await _applied(conn)
+    result = []
+    for migration in migrations:
+        row = applied.get(migration.version)
+        if row is None:
+            state = "pending"
+        elif row['checksum'] != migration.checksum:
+            state = "modified"
+        else:
+            state = "applied"
+        result.append({
+            "version": migration.version,
+            "name": migration.name,
+            "state": state,
+            "applied_at": row['applied_at'] if row else None,
+        })
+    return result
+
+
+async def _main(args):
+    if args.dsn:
+        dsn = args.dsn
+    else:
+        from app.core.config import settings
+        dsn = settings.DATABASE_URL
+    conn = await asyncpg.connect(dsn)
+    try:
+        if args.status:
+            for row in await status(conn):
+                applied_at = row['applied_at'].isoformat() if row['applied_at'] else "-"
+                print(f"{row['version']:03d}_{row['name']:<32} {row['state']:<9} {applied_at}")
+        elif args.baseline is not None:
+            marked = await baseline(conn, args.baseline)
+            print(f"✅ Marked {len(marked)} migration(s) as applied")
+        else:
+            done = await migrate(conn, target=args.target)
+            print(f"✅ Applied {len(done)} migration(s)")
+    finally:
+        await conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.core.migrations", description="Schema migrations (sql/NNN_*.sql)")
+    parser.add_argument("--dsn", help="Postgres DSN; default dari Settings (DB_*)")
+    parser.add_argument("--target", type=int, help="terapkan sampai versi ini saja")
+    parser.add_argument("--status", action="store_true", help="tampilkan status tanpa menerapkan")
+    parser.add_argument("--baseline", type=int, metavar="VERSION",
+                        help="tandai migrasi <= VERSION sudah diterapkan tanpa menjalankannya")
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
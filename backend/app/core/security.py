@@ -1,19 +1,42 @@
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
+from functools import lru_cache
 import jwt
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+
+# Setup Argon2: passlib + backend argon2 di-load saat pertama dipakai (atau di-warm-up di lifespan)
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2"], deprecated=["auto"])
 
-# Setup Argon2
-pwd_context = CryptContext(schemes=["argon2"], deprecated=["auto"])
 # Setup URL Token untuk Swagger UI
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+# Argon2 makan puluhan ms CPU per panggilan: jalankan di pool terbatas, bukan di event loop.
+# Dibuat saat pertama dipakai: import modul tidak memaksa settings di-load
+@lru_cache(maxsize=1)
+def get_hashing_pool() -> BoundedExecutor:
+    return BoundedExecutor(
+        name="password-hashing",
+        workers=settings.HASH_POOL_WORKERS,
+        max_queue=settings.HASH_POOL_MAX_QUEUE,
+        queue_timeout=settings.HASH_POOL_QUEUE_TIMEOUT_SECONDS,
+        kind=settings.HASH_POOL_KIND,
+    )
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await get_hashing_pool().run(verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    return await get_hashing_pool().run(get_password_hash, password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
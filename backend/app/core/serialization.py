@@ -0,0 +1,36 @@
+"""
+Jalur serialisasi cepat (opt-in lewat FAST_JSON_RESPONSES).
+
+Endpoint mengembalikan `RecordJSONResponse(...)` langsung: asyncpg.Record / dict di-encode oleh orjson
+tanpa `dict(row)` di repository, tanpa validasi ulang response_model, tanpa jsonable_encoder.
+Hanya untuk data internal yang bentuknya sudah dijamin (hasil query / hasil hitung sendiri).
+Output JSON sama dengan jalur default (datetime UTC -> "Z", Decimal -> angka).
+"""
+from decimal import Decimal
+from typing import Any
+
+import asyncpg
+import orjson
+from fastapi.encoders import decimal_encoder
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any):
+    if isinstance(value, asyncpg.Record):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any, utc_z: bool = True) -> bytes:
+    # utc_z=False: "+00:00" seperti datetime.isoformat() (format NDJSON /users?stream=true)
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z if utc_z else None)
+
+
+class RecordJSONResponse(JSONResponse):
+    """JSONResponse berbasis orjson yang mengerti asyncpg.Record & Decimal"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
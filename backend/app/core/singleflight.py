@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Penggabungan request identik yang sedang berjalan (per proses): panggilan dengan key yang sama
+    selama pekerjaan pertama belum selesai ikut menunggu hasil/exception yang sama, tanpa kerja ulang.
+    Pekerjaan jalan sebagai task sendiri, jadi request pemicu yang dibatalkan (klien putus)
+    tidak ikut membatalkan request lain yang menunggu.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "in_flight": len(self._tasks),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+# Submission identik (user + isi sama) ke /assessment/calculate
+calculate_flight = SingleFlight("calculate")
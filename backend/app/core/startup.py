@@ -0,0 +1,61 @@
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict
+
+# Titik nol profil: modul ini di-import paling awal oleh app.main
+_T0 = time.perf_counter()
+
+
+class StartupProfile:
+    """
+    Catatan durasi tiap fase cold start (import router, build app, pool DB, warm-up cache, ...)
+    untuk memantau time-to-first-request. Fase yang jalan bersamaan (asyncio.gather) dicatat
+    masing-masing, jadi jumlahnya bisa lebih besar dari total wall time.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: float | None = None
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def aphase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    async def timed(self, name: str, awaitable):
+        """Bungkus coroutine supaya durasinya tercatat walau dijalankan lewat gather"""
+        async with self.aphase(name):
+            return await awaitable
+
+    def mark_ready(self):
+        """Dipanggil di akhir startup lifespan: detik sejak app.main di-import sampai siap menerima request"""
+        self.ready_seconds = time.perf_counter() - _T0
+
+    def report(self) -> dict:
+        return {
+            "ready_seconds": round(self.ready_seconds, 4) if self.ready_seconds is not None else None,
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+        }
+
+    def summary(self) -> str:
+        slowest = sorted(self.phases.items(), key=lambda item: item[1], reverse=True)
+        parts = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in slowest)
+        ready = f"{self.ready_seconds * 1000:.0f}ms" if self.ready_seconds is not None else "-"
+        return f"⏱️ Startup ready in {ready} ({parts})"
+
+
+startup_profile = StartupProfile()
@@ -1,25 +1,72 @@
+import asyncio
+import importlib
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.core.config import settings
-from app.core.db import create_db_pool, close_db_pool
-from app.api import auth, users, assessment
+
+from app.core.startup import startup_profile
+
+with startup_profile.phase("import.fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+# Router di-import di create_app(), urut sesuai include_router
+ROUTERS = ["auth", "users", "assessment", "ops", "analytics", "metrics", "master_data"]
 
 # --- LIFESPAN (Connection Management) ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Buat koneksi database
-    await create_db_pool()
+    # Modul sudah ter-load lewat router saat create_app(), import di sini tidak menambah waktu
+    from app.core.cache import USERS_CHANNEL, get_principal_cache
+    from app.core.db import create_db_pool, close_db_pool
+    from app.core.security import get_pwd_context, get_hashing_pool
+    from app.repository.statements import PreparedConnection, prepare_replica_statements, prepare_statements
+    from app.services.analytics_rebuild import analytics_rebuild_runner
+    from app.services.assessment_feed import assessment_feed
+    from app.services.notify_listener import notify_listener
+    from app.services.periods import period_cache
+    from app.services.recompute import recompute_runner
+    from app.services.risk_rules import get_risk_rule_cache
+    from app.services.risk_weights import risk_weight_cache
+    from app.services.simulation import get_simulation_pool
+
+    timed = startup_profile.timed
+    # Singleton yang membaca settings dibuat saat start (get_*), bukan saat modul di-import
+    risk_rule_cache, principal_cache = get_risk_rule_cache(), get_principal_cache()
+    async with startup_profile.aphase("lifespan"):
+        # Startup: Buat koneksi database (statement repository di-prepare di setiap koneksi baru),
+        # bersamaan dengan load passlib/argon2 di thread supaya login pertama tidak menanggungnya
+        pool, _ = await asyncio.gather(
+            timed("db.pool", create_db_pool(
+                init=prepare_statements, connection_class=PreparedConnection, replica_init=prepare_replica_statements)),
+            timed("security.pwd_context", asyncio.to_thread(get_pwd_context)),
+        )
+        # Warm-up bersamaan: cache bobot risiko, aturan penilaian (versi aktif dikompilasi) & periode
+        # + LISTEN invalidation (termasuk cache principal), dan LISTEN feed SSE (semua di 1 koneksi LISTEN, notify_listener)
+        await asyncio.gather(
+            timed("cache.risk_weights", risk_weight_cache.start(pool)),
+            timed("cache.risk_rules", risk_rule_cache.start(pool)),
+            timed("cache.periods", period_cache.start(pool)),
+            timed("feed.listen", assessment_feed.start()),
+            # Reconnect: NOTIFY users_changed bisa terlewat, kosongkan cache principal
+            timed("cache.principal.listen", notify_listener.listen(
+                USERS_CHANNEL, principal_cache.on_notify, on_reconnect=principal_cache.clear)),
+        )
+        # Job recompute yang terputus dilanjutkan SETELAH cache bobot ter-load: versi bobot yang
+        # dicatat job harus versi yang sudah ada, kalau tidak job langsung di-restart dari nol
+        await timed("recompute.resume", recompute_runner.resume_interrupted(pool))
+    startup_profile.mark_ready()
+    print(startup_profile.summary())
     yield
     # Shutdown: Tutup koneksi
+    await recompute_runner.stop()
+    await analytics_rebuild_runner.stop()
+    await assessment_feed.stop()
+    await risk_weight_cache.stop()
+    await risk_rule_cache.stop()
+    await period_cache.stop()
+    await notify_listener.stop()
     await close_db_pool()
-
-# --- INITIALIZE APP ---
-app = FastAPI(
-    title="FastAPI Modular Auth",
-    version="1.0.0",
-    lifespan=lifespan
-)
+    get_hashing_pool().shutdown()
+    get_simulation_pool().shutdown()
 
 # --- KONFIGURASI CORS ---
 # Tentukan domain mana saja yang boleh mengakses API ini
@@ -32,24 +79,52 @@ origins = [
     # "*", # Gunakan bintang (*) jika ingin membolehkan semua (tidak aman untuk produksi)
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,   
-    allow_credentials=True,  
-    allow_methods=["*"],     
-    allow_headers=["*"],     
-)
-
-# --- REGISTER ROUTER ---
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(assessment.router)
-
-# Import master_data router
-from app.api import master_data
-app.include_router(master_data.router)
-
-# --- ROOT ENDPOINT (Optional) ---
-@app.get("/")
-def read_root():
-    return {"message": "Server is running!", "docs": "/docs"}
+# --- APP FACTORY ---
+def create_app() -> FastAPI:
+    """
+    Rakit app FastAPI. Jalankan dengan `uvicorn app.main:create_app --factory`
+    (atau `app.main:app`, dibuat saat pertama diakses). Pool DB, cache & passlib diinisialisasi di lifespan.
+    """
+    routers = []
+    for name in ROUTERS:
+        with startup_profile.phase(f"import.api.{name}"):
+            routers.append(importlib.import_module(f"app.api.{name}").router)
+
+    with startup_profile.phase("app.build"):
+        app = FastAPI(
+            title="FastAPI Modular Auth",
+            version="1.0.0",
+            lifespan=lifespan
+        )
+
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+            # Cursor halaman berikutnya GET /users/
+            expose_headers=["X-Next-After-Id"],
+        )
+
+        # --- REGISTER ROUTER ---
+        for router in routers:
+            app.include_router(router)
+
+        # --- ROOT ENDPOINT (Optional) ---
+        @app.get("/")
+        def read_root():
+            return {"message": "Server is running!", "docs": "/docs"}
+
+    return app
+
+_app: FastAPI | None = None
+
+def __getattr__(name: str):
+    # `from app.main import app` / `uvicorn app.main:app`: app dibuat saat pertama diakses, bukan saat import
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
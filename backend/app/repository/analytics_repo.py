@@ -0,0 +1,46 @@
+import asyncpg
+from typing import List, Optional
+from app.core.metrics import timed_query
+from app.repository import statements
+from app.repository.statements import STATEMENTS
+from app.services.risk_rules import get_risk_rule_cache
+
+class AnalyticsRepository:
+    @staticmethod
+    async def apply(conn: asyncpg.Connection, assessment_ids: List[int], sign: int):
+        """
+        Delta agregat untuk writer selain calculate, di dalam transaksi writer tsb:
+        sign=-1 sebelum assessment diubah/dihapus, sign=1 setelah disimpan.
+        """
+        if assessment_ids:
+            await conn.execute(STATEMENTS["analytics.apply"], assessment_ids, sign)
+
+    @staticmethod
+    async def try_lock_rebuild(conn: asyncpg.Connection) -> bool:
+        """Advisory lock sesi rebuild di `conn`; lepas saat koneksi kembali ke pool"""
+        return await conn.fetchval(STATEMENTS["analytics.try_rebuild_lock"])
+
+    @staticmethod
+    @timed_query("analytics.rebuild")
+    async def rebuild(conn: asyncpg.Connection):
+        """Hitung ulang semua agregat dari assessments/assessment_details"""
+        await conn.execute(STATEMENTS["analytics.rebuild"])
+
+    @staticmethod
+    @timed_query("analytics.trend")
+    async def trend(pool: asyncpg.Pool, unit_type: Optional[str] = None) -> List[dict]:
+        return [dict(r) for r in await statements.fetch(pool, "analytics.trend", unit_type)]
+
+    @staticmethod
+    @timed_query("analytics.labels")
+    async def labels(pool: asyncpg.Pool, period_id: Optional[int] = None, unit_type: Optional[str] = None) -> List[dict]:
+        rows = [dict(r) for r in await statements.fetch(pool, "analytics.labels", period_id, unit_type)]
+        # Urutan label versi aturan aktif, dari rendah ke tinggi (bukan alfabet); label versi lama di belakang
+        order = {label: i for i, label in enumerate((await get_risk_rule_cache().active(pool)).labels)}
+        rows.sort(key=lambda r: (r['unit_type'], order.get(r['final_rating'], len(order)), r['final_rating']))
+        return rows
+
+    @staticmethod
+    @timed_query("analytics.risk_types")
+    async def risk_types(pool: asyncpg.Pool, period_id: Optional[int] = None, unit_type: Optional[str] = None) -> List[dict]:
+        return [dict(r) for r in await statements.fetch(pool, "analytics.risk_types", period_id, unit_type)]
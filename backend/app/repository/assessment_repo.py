@@ -1,90 +1,184 @@
 import asyncpg
+import json
+from typing import AsyncIterator, List, Optional
+from app.core.db import get_write_tracker
+from app.core.metrics import timed_query, timed_stream
+from app.repository import statements
+from app.repository.analytics_repo import AnalyticsRepository
+from app.repository.statements import BULK_STATEMENTS, STATEMENTS
 from app.schemas.assessment import AssessmentSubmit
 from app.services.calculation import RiskCalculationService
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import risk_weight_cache
+
+# Batas atas id (int4) saat riwayat dibaca dari halaman pertama
+MAX_ID = 2**31 - 1
 
 class AssessmentRepository:
     @staticmethod
-    async def calculate(pool: asyncpg.Pool, user_id: int, data: AssessmentSubmit):
+    @timed_query("assessment.calculate")
+    async def calculate(
+        pool: asyncpg.Pool, user_id: int, data: AssessmentSubmit,
+        acquire_timeout: Optional[float] = None, query_timeout: Optional[float] = None
+    ):
+        # 1. Ambil bobot & nama risiko dari cache sesuai Unit Type (LPEI/UUS)
+        # mapping: risk_id -> {weight, name}
+        risk_map = (await risk_weight_cache.get(pool, data.unit_type)).risk_map
+        # Versi aturan aktif (matriks & batas label sudah dikompilasi jadi lookup)
+        rules = await get_risk_rule_cache().active(pool)
+
+        # 2. Calculating
+        total_composite = 0
+        result_details = []
+        response_table = []
+
+        for item in data.details:
+            if item.risk_type_id not in risk_map:
+                continue
+
+            risk_info = risk_map[item.risk_type_id]
+            weight = risk_info['w']
+
+            calc = RiskCalculationService.calculate_row(
+                rules,
+                inherent_origin=item.inherent,
+                kpmr=item.kpmr,
+                weight=weight
+            )
+
+            total_composite += calc['composite']
+
+            # Siapkan data insert DB
+            result_details.append((
+                item.risk_type_id,
+                item.inherent,
+                calc['inherent_round'],
+                item.kpmr,
+                calc['risk_rating'],
+                calc['composite'],
+                weight
+            ))
+
+            # Siapkan data JSON response (sekaligus snapshot yang disimpan)
+            response_table.append(RiskCalculationService.table_row(
+                risk_info['name'], weight, item.inherent,
+                calc['inherent_round'], item.kpmr, calc['risk_rating'], calc['composite']
+            ))
+
+        final_label = RiskCalculationService.get_final_label(rules, total_composite)
+
+        risk_ids, inherent_orig, inherent_round, kpmr, rating, composite, weights = (
+            list(col) for col in zip(*result_details)
+        ) if result_details else ([], [], [], [], [], [], [])
+
+        # 3. Simpan header + detail dalam SATU statement autocommit = 1 round-trip (fungsi save_assessment,
+        #    sql/011): advisory lock submission yang sama dulu (worker lain menunggu sampai COMMIT), baru CTE save.
+        # timeout: batas tunggu koneksi pool & durasi statement (None = default pool)
+        async with pool.acquire(timeout=acquire_timeout) as conn:
+            saved = await conn.fetchrow(
+                STATEMENTS["assessment.save"],
+                user_id, data.period_id, data.unit_type,
+                round(total_composite, 2), final_label,
+                risk_ids, inherent_orig, inherent_round, kpmr, rating, composite,
+                json.dumps(response_table), rules.version_id, weights,
+                timeout=query_timeout
+            )
+        # Setelah COMMIT: baca berikutnya dari user ini ke primary (read-your-writes)
+        get_write_tracker().mark(user_id)
+
+        changed_ids = set(saved['changed_ids'])
+        for risk_id, row in zip(risk_ids, response_table):
+            row["changed"] = risk_id in changed_ids
+
+        # 4. Return response
+        return {
+            "id": saved['id'],
+            "final_score": round(total_composite, 2),
+            "final_rating": final_label,
+            "rule_version_id": rules.version_id,
+            "table_data": response_table,
+            "is_new": saved['is_new'],
+            "removed_risk_type_ids": list(saved['removed_ids'])
+        }
+
+    @staticmethod
+    @timed_query("assessment.get_snapshot")
+    async def get_snapshot(pool: asyncpg.Pool, assessment_id: int) -> Optional[dict]:
+        """Assessment + table_data dari result_snapshot (tanpa join / hitung ulang)"""
+        row = await statements.fetchrow(pool, "assessment.get_snapshot", assessment_id)
+        if row is None:
+            return None
+        result = dict(row)
+        result['table_data'] = json.loads(row['table_data']) if row['table_data'] else []
+        return result
+
+    @staticmethod
+    @timed_query("assessment.history")
+    async def history(pool: asyncpg.Pool, user_id: int, before_id: Optional[int] = None, limit: int = 50) -> List[asyncpg.Record]:
+        # Keyset pagination: lanjut dari id terakhir halaman sebelumnya (terbaru dulu)
+        return await statements.fetch(pool, "assessment.history", user_id, before_id or MAX_ID, limit)
+
+    @staticmethod
+    @timed_stream("assessment.export")
+    async def stream_export(
+        pool: asyncpg.Pool, period_id: int, unit_type: Optional[str] = None, batch_size: int = 1000
+    ) -> AsyncIterator[List[asyncpg.Record]]:
+        """Baris export per batch lewat server-side cursor (1 snapshot, memori sebesar 1 batch)"""
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                cursor = await conn.cursor(STATEMENTS["assessment.export"], period_id, unit_type)
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        return
+                    yield rows
+
+    @staticmethod
+    @timed_query("assessment.bulk_save")
+    async def bulk_save(pool: asyncpg.Pool, user_id: int, submissions: List[AssessmentSubmit], scored: List[dict]) -> List[int]:
+        """
+        Simpan satu batch submission (sudah dihitung) dalam 1 transaksi: COPY ke tabel temp, lalu upsert
+        (resubmission mempertahankan id lama, sama seperti calculate). Submission harus unik per
+        (period_id, unit_type) di dalam batch.
+        Return: id assessment, urut sesuai submissions.
+        """
         async with pool.acquire() as conn:
             async with conn.transaction():
-                # 1. Ambil bobot & nama risiko dari DB sesuai Unit Type (LPEI/UUS)
-                # mapping: risk_id -> {weight, name}
-                if data.unit_type == "UUS":
-                    rows = await conn.fetch("SELECT id, name, weight_uus as weight FROM risk_types WHERE is_uus = TRUE")
-                else:
-                    rows = await conn.fetch("SELECT id, name, weight_lpei as weight FROM risk_types WHERE is_lpei = TRUE")
-
-                risk_map = {r['id']: {'w': float(r['weight']), 'name': r['name']} for r in rows}
-
-                # 2. Calculating
-                total_composite = 0
-                result_details = []
-                response_table = []
-
-                for item in data.details:
-                    if item.risk_type_id not in risk_map:
-                        continue
-
-                    risk_info = risk_map[item.risk_type_id]
-                    weight = risk_info['w']
-
-                    calc = RiskCalculationService.calculate_row(
-                        inherent_origin=item.inherent,
-                        kpmr=item.kpmr,
-                        weight=weight
-                    )
+                # 0. Advisory lock semua key batch (sama dengan calculate): calculate untuk key yang sama
+                #    menunggu COMMIT batch ini, bukan menabrak unique key COPY / menyisakan detail lama
+                period_ids = [s.period_id for s in submissions]
+                unit_types = [s.unit_type for s in submissions]
+                await conn.execute(STATEMENTS["assessment.lock_many"], [user_id] * len(submissions), period_ids, unit_types)
 
-                    total_composite += calc['composite']
-
-                    # Siapkan data insert DB
-                    result_details.append((
-                        item.risk_type_id,
-                        item.inherent,
-                        calc['inherent_round'],
-                        item.kpmr,
-                        calc['risk_rating'],
-                        calc['composite']
-                    ))
-
-                    # Siapkan data JSON response
-                    response_table.append({
-                        "risk_name": risk_info['name'],
-                        "weight_percent": f"{weight*100:.2f}%",
-                        "inherent_origin": item.inherent,
-                        "inherent_round": calc['inherent_round'],
-                        "kpmr": item.kpmr,
-                        "risk_rating": calc['risk_rating'],
-                        "composite": round(calc['composite'], 2)
-                    })
-
-                # 3. Simpan header + detail ke DB
-                final_label = RiskCalculationService.get_final_label(total_composite)
-
-                await conn.execute(
-                    "DELETE FROM assessments WHERE user_id=$1 AND period_id=$2 AND unit_type=$3",
-                    user_id, data.period_id, data.unit_type
-                )
+                # 1. Kurangi assessment lama untuk semua (period, unit) di batch ini dari agregat
+                old_ids = [r['id'] for r in await conn.fetch(STATEMENTS["assessment.ids_by_keys"], user_id, period_ids, unit_types)]
+                await AnalyticsRepository.apply(conn, old_ids, -1)
 
-                header_id = await conn.fetchval("""
-                        INSERT INTO assessments (user_id, period_id, unit_type, total_composite_score, final_rating_label, status)
-                        VALUES ($1, $2, $3, $4, $5, 'SUBMITTED')
-                        RETURNING id
-                    """,
-                    user_id, data.period_id, data.unit_type,
-                    round(total_composite, 2), final_label
+                # 2. COPY header + detail ke tabel temp
+                await conn.execute(BULK_STATEMENTS["bulk.stage"])
+                await conn.copy_records_to_table(
+                    "bulk_assessments",
+                    columns=["ord", "period_id", "unit_type", "total_composite_score", "final_rating_label",
+                             "result_snapshot", "rule_version_id"],
+                    records=[
+                        (position, s.period_id, s.unit_type, round(calc['total_composite'], 2), calc['final_label'],
+                         json.dumps(calc['table_data']), calc['rule_version_id'])
+                        for position, (s, calc) in enumerate(zip(submissions, scored))
+                    ]
+                )
+                await conn.copy_records_to_table(
+                    "bulk_details",
+                    columns=["ord", "risk_type_id", "inherent_original", "inherent_rounded", "kpmr_score", "risk_rating",
+                             "composite_score", "weight"],
+                    records=(
+                        (position, *detail)
+                        for position, calc in enumerate(scored)
+                        for detail in calc['details']
+                    )
                 )
 
-                # 4. Simpan Details
-                await conn.executemany("""
-                    INSERT INTO assessment_details 
-                    (assessment_id, risk_type_id, inherent_original, inherent_rounded, kpmr_score, risk_rating, composite_score)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """, [(header_id, *detail) for detail in result_details])
-
-                # 5. Return response
-                return {
-                    "id": header_id,
-                    "final_score": round(total_composite, 2),
-                    "final_rating": final_label,
-                    "table_data": response_table
-                }
\ No newline at end of file
+                # 3. Upsert ke tabel asli (+ NOTIFY per header), tambahkan ke agregat
+                header_ids = [r['id'] for r in await conn.fetch(BULK_STATEMENTS["bulk.upsert"], user_id)]
+                await AnalyticsRepository.apply(conn, header_ids, 1)
+        get_write_tracker().mark(user_id)
+        return header_ids
\ No newline at end of file
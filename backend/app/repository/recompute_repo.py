@@ -0,0 +1,145 @@
+import asyncpg
+import json
+from typing import List, Optional
+from app.core.metrics import timed_query
+from app.repository import statements
+from app.repository.analytics_repo import AnalyticsRepository
+from app.repository.statements import STATEMENTS
+from app.services.calculation import RiskCalculationService
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import weight_unit
+
+class RecomputeRepository:
+    @staticmethod
+    @timed_query("recompute.create_job")
+    async def create_job(pool: asyncpg.Pool, user_id: int) -> Optional[dict]:
+        """Job baru; None jika masih ada job RUNNING"""
+        try:
+            row = await statements.fetchrow(pool, "recompute.create_job", user_id)
+        except asyncpg.UniqueViolationError:
+            return None
+        return dict(row)
+
+    @staticmethod
+    @timed_query("recompute.get_job")
+    async def get_job(pool: asyncpg.Pool, job_id: int) -> Optional[dict]:
+        row = await statements.fetchrow(pool, "recompute.get_job", job_id)
+        return dict(row) if row else None
+
+    @staticmethod
+    @timed_query("recompute.running_ids")
+    async def running_ids(pool: asyncpg.Pool) -> List[int]:
+        return [r['id'] for r in await statements.fetch(pool, "recompute.running_ids")]
+
+    @staticmethod
+    @timed_query("recompute.resume_job")
+    async def resume_job(pool: asyncpg.Pool, job_id: int) -> Optional[dict]:
+        """FAILED -> RUNNING (lanjut dari checkpoint); None jika job tidak ada / tidak FAILED"""
+        try:
+            row = await statements.fetchrow(pool, "recompute.resume_job", job_id)
+        except asyncpg.UniqueViolationError:
+            return None
+        return dict(row) if row else None
+
+    @staticmethod
+    async def own_job(conn: asyncpg.Connection, job_id: int) -> bool:
+        """
+        Klaim job untuk worker ini (advisory lock sesi pada `conn`). Koneksi dipegang selama job
+        berjalan; lock lepas saat koneksi kembali ke pool atau putus (worker mati -> job bisa di-resume).
+        """
+        return await conn.fetchval(STATEMENTS["recompute.own_job"], job_id)
+
+    @staticmethod
+    @timed_query("recompute.restart_job")
+    async def restart_job(pool: asyncpg.Pool, job_id: int):
+        await pool.execute(STATEMENTS["recompute.restart_job"], job_id)
+
+    @staticmethod
+    @timed_query("recompute.finish_job")
+    async def finish_job(pool: asyncpg.Pool, job_id: int, status: str, error: Optional[str] = None):
+        await pool.execute(STATEMENTS["recompute.finish_job"], job_id, status, error)
+
+    @staticmethod
+    @timed_query("recompute.process_chunk")
+    async def process_chunk(pool: asyncpg.Pool, job_id: int, risk_maps: dict, chunk_size: int) -> bool:
+        """
+        Hitung ulang 1 chunk assessment (urut id, mulai setelah checkpoint job) dalam 1 transaksi.
+        Return: True jika chunk diproses, False jika sudah habis / job tidak RUNNING lagi.
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # 1. Lock job & ambil checkpoint
+                job = await conn.fetchrow(STATEMENTS["recompute.lock_job"], job_id)
+                if job is None or job['status'] != 'RUNNING':
+                    return False
+
+                # 2. Advisory lock key chunk berikutnya (urutan lock sama dengan calculate & bulk import),
+                #    baru lock header-nya. Header yang terhapus di antara keduanya dilewati.
+                keys = await conn.fetch(STATEMENTS["recompute.chunk_keys"], job['last_assessment_id'], chunk_size)
+                if not keys:
+                    return False
+                await conn.execute(
+                    STATEMENTS["assessment.lock_many"],
+                    [k['user_id'] for k in keys], [k['period_id'] for k in keys], [k['unit_type'] for k in keys]
+                )
+                headers = await conn.fetch(STATEMENTS["recompute.lock_chunk"], [k['id'] for k in keys])
+                if not headers:
+                    # Seluruh chunk terhapus (hapus user / bulk import): majukan checkpoint saja
+                    await conn.execute(
+                        STATEMENTS["recompute.apply_chunk"], [], [], [], [], [], [], [], job_id, keys[-1]['id'], [], []
+                    )
+                    return True
+                details = await conn.fetch(STATEMENTS["recompute.chunk_details"], [h['id'] for h in headers])
+
+                # 3. Hitung ulang sekaligus dengan bobot terbaru; matriks & label tetap versi aturan
+                #    yang dipakai saat assessment disubmit (rule_version_id)
+                rules_by_version = await get_risk_rule_cache().get_many(conn, (h['rule_version_id'] for h in headers))
+                position = {h['id']: i for i, h in enumerate(headers)}
+                unit_maps = [risk_maps[weight_unit(h['unit_type'])] for h in headers]
+                owner = [position[d['assessment_id']] for d in details]
+                # Risk type yang sudah tidak aktif untuk unit tsb tetap memakai bobot tersimpan di detail
+                # (bukan 0: menonaktifkan risk type tidak boleh mengubah skor historis)
+                weight = [
+                    unit_maps[i][d['risk_type_id']]['w'] if d['risk_type_id'] in unit_maps[i] else d['weight']
+                    for i, d in zip(owner, details)
+                ]
+                scored = RiskCalculationService.score_assessments_by_version(
+                    rules_by_version,
+                    [h['rule_version_id'] for h in headers],
+                    [float(d['inherent_original']) for d in details],
+                    [d['kpmr_score'] for d in details],
+                    weight,
+                    owner,
+                    n_assessments=len(headers)
+                )
+
+                # 4. Snapshot table_data per assessment (urutan detail = urutan submission)
+                snapshots = [[] for _ in headers]
+                for d, i, w, inherent_round, rating, composite in zip(
+                    details, owner, weight, scored["inherent_round"].tolist(),
+                    scored["risk_rating"].tolist(), scored["composite"].tolist()
+                ):
+                    snapshots[i].append(RiskCalculationService.table_row(
+                        d['risk_name'], w, float(d['inherent_original']),
+                        inherent_round, d['kpmr_score'], rating, composite
+                    ))
+
+                # 5. Tulis yang berubah + checkpoint (commit bersama chunk), agregat analytics ikut di-update
+                header_ids = [h['id'] for h in headers]
+                await AnalyticsRepository.apply(conn, header_ids, -1)
+                await conn.execute(
+                    STATEMENTS["recompute.apply_chunk"],
+                    [d['id'] for d in details],
+                    scored["inherent_round"].tolist(),
+                    scored["risk_rating"].tolist(),
+                    scored["composite"].tolist(),
+                    header_ids,
+                    [round(total, 2) for total in scored["total_composite"].tolist()],
+                    scored["final_label"].tolist(),
+                    job_id,
+                    keys[-1]['id'],
+                    [json.dumps(snapshot) for snapshot in snapshots],
+                    weight
+                )
+                await AnalyticsRepository.apply(conn, header_ids, 1)
+                return True
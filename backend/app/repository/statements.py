@@ -0,0 +1,394 @@
+"""
+Registry statement SQL bernama untuk repository.
+
+Statement di-prepare di setiap koneksi baru lewat hook `init` pool (lihat lifespan di main.py):
+primary seluruh registry, replica hanya REPLICA_STATEMENTS. Request pertama setelah start / failover
+tidak lagi membayar load katalog di backend Postgres yang baru.
+Repository memanggil statement lewat nama: `await statements.fetchrow(pool, "user.get_by_id", user_id)`,
+di dalam transaksi pakai teks-nya langsung: `conn.fetch(STATEMENTS["assessment.ids_by_keys"], ...)`.
+Statement di atas tabel temp bulk import ada di BULK_STATEMENTS (tabelnya baru ada di dalam transaksi,
+jadi tidak di-prepare saat koneksi dibuat).
+"""
+from typing import Dict, List, Optional
+
+import asyncpg
+
+USER_COLUMNS = "id, email, full_name, role, created_at"
+
+STATEMENTS: Dict[str, str] = {
+    # --- USERS ---
+    # Keyset pagination: lanjut dari id terakhir halaman sebelumnya (LIMIT NULL = semua)
+    "user.get_all": f"SELECT {USER_COLUMNS} FROM users WHERE id > $1 ORDER BY id ASC LIMIT $2",
+    "user.stream_all": f"SELECT {USER_COLUMNS} FROM users WHERE id > $1 ORDER BY id ASC",
+    "user.get_by_id": f"SELECT {USER_COLUMNS} FROM users WHERE id = $1",
+    "user.get_by_email": "SELECT * FROM users WHERE email = $1",
+    "user.get_principal_by_email": f"SELECT {USER_COLUMNS} FROM users WHERE email = $1",
+    "user.create": f"""
+        INSERT INTO users (email, password, full_name, role)
+        VALUES ($1, $2, $3, $4)
+        RETURNING {USER_COLUMNS}
+    """,
+    # Satu bentuk untuk semua kombinasi field: NULL = kolom tidak diubah
+    "user.update": f"""
+        UPDATE users SET
+            full_name = COALESCE($2, full_name),
+            email = COALESCE($3, email),
+            role = COALESCE($4, role)
+        WHERE id = $1
+        RETURNING {USER_COLUMNS}
+    """,
+    "user.delete": "DELETE FROM users WHERE id = $1 RETURNING id",
+
+    # --- ASSESSMENTS ---
+    # Lock submission (user, periode, unit) antar worker, dilepas saat COMMIT. Untuk banyak key sekaligus
+    # (bulk import, recompute), urut key lock supaya writer multi-key tidak saling deadlock. Fungsi volatile
+    # di SELECT list dievaluasi SETELAH sort (Postgres >= 9.6). Kunci sama dengan save_assessment (sql/011).
+    "assessment.lock_many": """
+        SELECT pg_advisory_xact_lock(k.user_id, hashtext(k.period_id || ':' || k.unit_type))
+        FROM unnest($1::int[], $2::int[], $3::text[]) AS k(user_id, period_id, unit_type)
+        ORDER BY k.user_id, hashtext(k.period_id || ':' || k.unit_type)
+    """,
+    # Advisory lock + upsert header & detail (diff) + delta agregat + NOTIFY dalam 1 round-trip
+    # (statement autocommit, tanpa BEGIN/COMMIT). Isi & alasan lock di fungsi: sql/011_save_assessment_fn.sql
+    "assessment.save": """
+        SELECT id, is_new, changed_ids, removed_ids
+        FROM save_assessment($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+    """,
+    # Baca assessment dari snapshot: 1 lookup index, tanpa join detail / risk_types
+    "assessment.get_snapshot": """
+        SELECT id, user_id, period_id, unit_type, status, created_at AS submitted_at,
+               total_composite_score::float8 AS final_score, final_rating_label AS final_rating,
+               rule_version_id, result_snapshot AS table_data
+        FROM assessments
+        WHERE id = $1
+    """,
+    # Riwayat per user, terbaru dulu (keyset: id < $2, index assessments_user_history)
+    "assessment.history": """
+        SELECT id, period_id, unit_type, status, created_at AS submitted_at,
+               total_composite_score::float8 AS final_score, final_rating_label AS final_rating,
+               rule_version_id
+        FROM assessments
+        WHERE user_id = $1 AND id < $2
+        ORDER BY id DESC
+        LIMIT $3
+    """,
+    # Lock header dulu, baru agregat analytics (urutan sama dengan "assessment.save")
+    "assessment.ids_by_keys": """
+        SELECT id FROM assessments
+        WHERE user_id = $1
+          AND (period_id, unit_type) IN (
+              SELECT * FROM unnest($2::int[], $3::text[])
+          )
+        ORDER BY id
+        FOR UPDATE
+    """,
+    "assessment.ids_by_user": "SELECT id FROM assessments WHERE user_id = $1 ORDER BY id FOR UPDATE",
+    # Reservasi id header agar detail bisa di-COPY tanpa RETURNING
+    # Export per periode: 1 baris per detail (assessment tanpa detail tetap muncul 1 baris)
+    # Bobot = bobot yang tersimpan di detail saat terakhir dihitung (submit / recompute), bukan bobot risk_types saat ini.
+    # Detail sebelum sql/010 (weight NULL): dihitung balik composite / rating (bobot 4 desimal x rating bulat)
+    "assessment.export": """
+        SELECT a.id AS assessment_id, u.email, u.full_name, p.name AS period_name, a.unit_type, a.status,
+               a.created_at, a.total_composite_score, a.final_rating_label,
+               d.risk_type_id, rt.name AS risk_name,
+               coalesce(d.weight, round(d.composite_score / nullif(d.risk_rating, 0), 4)) AS weight,
+               d.inherent_original, d.inherent_rounded, d.kpmr_score, d.risk_rating, d.composite_score
+        FROM assessments a
+        JOIN users u ON u.id = a.user_id
+        JOIN periods p ON p.id = a.period_id
+        LEFT JOIN assessment_details d ON d.assessment_id = a.id
+        LEFT JOIN risk_types rt ON rt.id = d.risk_type_id
+        WHERE a.period_id = $1
+          AND ($2::text IS NULL OR a.unit_type = $2)
+        ORDER BY a.id, d.id
+    """,
+
+    # --- ANALYTICS (sql/006_analytics_stats.sql) ---
+    # Tambah ($2 = 1) / kurangi ($2 = -1) kontribusi assessment $1 ke agregat. Dipakai writer selain
+    # calculate (bulk import, recompute, hapus user): kurangi sebelum berubah, tambah sesudahnya.
+    "analytics.apply": """
+        WITH a AS (
+            SELECT id, period_id, unit_type, final_rating_label, total_composite_score
+            FROM assessments
+            WHERE id = ANY($1::int[])
+        ),
+        label_stats AS (
+            INSERT INTO assessment_label_stats AS s (period_id, unit_type, final_rating_label, assessments, total_score)
+            SELECT period_id, unit_type, final_rating_label, $2 * count(*), $2 * coalesce(sum(total_composite_score), 0)
+            FROM a
+            WHERE final_rating_label IS NOT NULL
+            GROUP BY period_id, unit_type, final_rating_label
+            ORDER BY period_id, unit_type, final_rating_label
+            ON CONFLICT (period_id, unit_type, final_rating_label) DO UPDATE SET
+                assessments = s.assessments + EXCLUDED.assessments,
+                total_score = s.total_score + EXCLUDED.total_score
+        )
+        INSERT INTO risk_type_stats AS s (period_id, unit_type, risk_type_id, details, total_rating, total_composite)
+        SELECT a.period_id, a.unit_type, d.risk_type_id,
+               $2 * count(*), $2 * coalesce(sum(d.risk_rating), 0), $2 * coalesce(sum(d.composite_score), 0)
+        FROM a
+        JOIN assessment_details d ON d.assessment_id = a.id
+        GROUP BY a.period_id, a.unit_type, d.risk_type_id
+        ORDER BY a.period_id, a.unit_type, d.risk_type_id
+        ON CONFLICT (period_id, unit_type, risk_type_id) DO UPDATE SET
+            details = s.details + EXCLUDED.details,
+            total_rating = s.total_rating + EXCLUDED.total_rating,
+            total_composite = s.total_composite + EXCLUDED.total_composite
+    """,
+    "analytics.rebuild": "SELECT rebuild_assessment_stats()",
+    # Satu rebuild sekaligus di semua worker (advisory lock sesi, ruang kunci bigint 1 argumen)
+    "analytics.try_rebuild_lock": "SELECT pg_try_advisory_lock(hashtext('rebuild_assessment_stats'))",
+    # Query dashboard: hanya membaca tabel agregat (ukuran tidak tumbuh dengan jumlah assessment)
+    "analytics.trend": """
+        SELECT s.period_id, p.name AS period_name, p.year, p.quarter, s.unit_type,
+               sum(s.assessments)::int AS assessments,
+               round(sum(s.total_score) / sum(s.assessments), 2)::float8 AS avg_score
+        FROM assessment_label_stats s
+        JOIN periods p ON p.id = s.period_id
+        WHERE ($1::text IS NULL OR s.unit_type = $1)
+        GROUP BY s.period_id, p.name, p.year, p.quarter, s.unit_type
+        HAVING sum(s.assessments) > 0
+        ORDER BY p.year, p.quarter, s.unit_type
+    """,
+    "analytics.labels": """
+        SELECT unit_type, final_rating_label AS final_rating, sum(assessments)::int AS assessments
+        FROM assessment_label_stats
+        WHERE ($1::int IS NULL OR period_id = $1)
+          AND ($2::text IS NULL OR unit_type = $2)
+        GROUP BY unit_type, final_rating_label
+        HAVING sum(assessments) > 0
+        ORDER BY unit_type
+    """,
+    "analytics.risk_types": """
+        SELECT s.unit_type, s.risk_type_id, rt.name AS risk_name, sum(s.details)::int AS details,
+               round(sum(s.total_rating)::numeric / sum(s.details), 2)::float8 AS avg_rating,
+               round(sum(s.total_composite) / sum(s.details), 4)::float8 AS avg_composite
+        FROM risk_type_stats s
+        JOIN risk_types rt ON rt.id = s.risk_type_id
+        WHERE ($1::int IS NULL OR s.period_id = $1)
+          AND ($2::text IS NULL OR s.unit_type = $2)
+        GROUP BY s.unit_type, s.risk_type_id, rt.name
+        HAVING sum(s.details) > 0
+        ORDER BY s.unit_type, s.risk_type_id
+    """,
+
+    # --- RECOMPUTE JOBS ---
+    # Gagal (UniqueViolation) jika masih ada job RUNNING
+    "recompute.create_job": """
+        INSERT INTO recompute_jobs (started_by, total_assessments)
+        SELECT $1, count(*) FROM assessments
+        RETURNING *
+    """,
+    "recompute.get_job": "SELECT * FROM recompute_jobs WHERE id = $1",
+    "recompute.running_ids": "SELECT id FROM recompute_jobs WHERE status = 'RUNNING' ORDER BY id",
+    "recompute.resume_job": """
+        UPDATE recompute_jobs SET status = 'RUNNING', error = NULL, finished_at = NULL, updated_at = now()
+        WHERE id = $1 AND status = 'FAILED'
+        RETURNING *
+    """,
+    # Bobot berubah lagi di tengah job: mulai dari awal dengan bobot terbaru
+    "recompute.restart_job": """
+        UPDATE recompute_jobs SET
+            last_assessment_id = 0,
+            processed_assessments = 0,
+            total_assessments = (SELECT count(*) FROM assessments),
+            updated_at = now()
+        WHERE id = $1 AND status = 'RUNNING'
+    """,
+    "recompute.finish_job": """
+        UPDATE recompute_jobs SET status = $2, error = $3, finished_at = now(), updated_at = now()
+        WHERE id = $1 AND status = 'RUNNING'
+    """,
+    # Pemilik job: advisory lock sesi per job (ruang kunci bigint, terpisah dari lock (int, int) assessment).
+    # Hanya 1 worker yang menjalankan job; dilepas saat koneksi kembali ke pool (reset asyncpg) / putus
+    "recompute.own_job": "SELECT pg_try_advisory_lock((hashtext('recompute_jobs')::bigint << 32) | $1::bigint)",
+    # Lock baris job dulu: worker lain yang menjalankan job yang sama menunggu, lalu lanjut dari checkpoint baru
+    "recompute.lock_job": "SELECT status, last_assessment_id FROM recompute_jobs WHERE id = $1 FOR UPDATE",
+    # Key chunk berikutnya (tanpa lock): advisory lock key-key ini ("assessment.lock_many") diambil
+    # sebelum row lock header, sama seperti calculate & bulk import
+    "recompute.chunk_keys": """
+        SELECT id, user_id, period_id, unit_type FROM assessments
+        WHERE id > $1
+        ORDER BY id
+        LIMIT $2
+    """,
+    # Row lock hanya untuk header di chunk ini (submission ke assessment lain tetap jalan)
+    "recompute.lock_chunk": """
+        SELECT id, unit_type, rule_version_id FROM assessments
+        WHERE id = ANY($1::int[])
+        ORDER BY id
+        FOR UPDATE
+    """,
+    # Bobot tersimpan: dipakai untuk risk type yang sudah tidak aktif di unit tsb. Detail sebelum sql/010
+    # (weight NULL) dihitung balik dari composite / rating. JOIN: FK menjamin risk type selalu ada
+    "recompute.chunk_details": """
+        SELECT d.id, d.assessment_id, d.risk_type_id, d.inherent_original, d.kpmr_score, rt.name AS risk_name,
+               coalesce(d.weight, round(d.composite_score / nullif(d.risk_rating, 0), 4), 0)::float8 AS weight
+        FROM assessment_details d
+        JOIN risk_types rt ON rt.id = d.risk_type_id
+        WHERE d.assessment_id = ANY($1::int[])
+        ORDER BY d.assessment_id, d.id
+    """,
+    # Tulis hanya baris yang nilainya berubah + checkpoint job, dalam 1 statement
+    "recompute.apply_chunk": """
+        WITH details AS (
+            UPDATE assessment_details d SET
+                inherent_rounded = u.inherent_rounded,
+                risk_rating = u.risk_rating,
+                composite_score = u.composite_score,
+                weight = u.weight
+            FROM unnest($1::int[], $2::int[], $3::int[], $4::float8[], $11::float8[])
+                AS u(id, inherent_rounded, risk_rating, composite_score, weight)
+            WHERE d.id = u.id
+              AND (d.inherent_rounded, d.risk_rating, d.composite_score, d.weight)
+                  IS DISTINCT FROM (u.inherent_rounded, u.risk_rating, u.composite_score::numeric(10, 4), u.weight::numeric(5, 4))
+            RETURNING d.id
+        ),
+        headers AS (
+            UPDATE assessments a SET
+                total_composite_score = u.total_composite_score,
+                final_rating_label = u.final_rating_label,
+                result_snapshot = u.result_snapshot
+            FROM unnest($5::int[], $6::float8[], $7::text[], $10::jsonb[])
+                AS u(id, total_composite_score, final_rating_label, result_snapshot)
+            WHERE a.id = u.id
+              AND (a.total_composite_score, a.final_rating_label, a.result_snapshot)
+                  IS DISTINCT FROM (u.total_composite_score::numeric(10, 2), u.final_rating_label, u.result_snapshot)
+            RETURNING a.id
+        )
+        UPDATE recompute_jobs SET
+            last_assessment_id = $9,
+            processed_assessments = processed_assessments + cardinality($5::int[]),
+            changed_assessments = changed_assessments + (SELECT count(*) FROM headers),
+            changed_details = changed_details + (SELECT count(*) FROM details),
+            updated_at = now()
+        WHERE id = $8
+    """,
+}
+
+
+# Bulk import: batch di-COPY ke tabel temp (hilang saat COMMIT), lalu di-upsert dengan aturan yang sama
+# dengan save_assessment (sql/011): header mempertahankan id lama, hanya detail yang berubah yang ditulis
+# ulang, risk type yang tidak ada lagi dihapus. `ord` = posisi submission di batch.
+BULK_STATEMENTS: Dict[str, str] = {
+    "bulk.stage": """
+        CREATE TEMP TABLE bulk_assessments (
+            ord                    INTEGER PRIMARY KEY,
+            period_id              INTEGER NOT NULL,
+            unit_type              VARCHAR(10) NOT NULL,
+            total_composite_score  NUMERIC(10, 2),
+            final_rating_label     VARCHAR(50),
+            result_snapshot        JSONB,
+            rule_version_id        INTEGER NOT NULL
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE bulk_details (
+            ord                INTEGER NOT NULL,
+            risk_type_id       INTEGER NOT NULL,
+            inherent_original  NUMERIC(5, 2),
+            inherent_rounded   INTEGER,
+            kpmr_score         INTEGER,
+            risk_rating        INTEGER,
+            composite_score    NUMERIC(10, 4),
+            weight             NUMERIC(5, 4)
+        ) ON COMMIT DROP
+    """,
+    # Upsert header + detail (diff) + NOTIFY assessment_saved per header (feed SSE), urut key
+    # (urutan lock row sama dengan writer lain). Return: id per submission, urut `ord`
+    "bulk.upsert": """
+        WITH header AS (
+            INSERT INTO assessments AS a
+            (user_id, period_id, unit_type, total_composite_score, final_rating_label, status, result_snapshot, rule_version_id)
+            SELECT $1, period_id, unit_type, total_composite_score, final_rating_label, 'SUBMITTED', result_snapshot, rule_version_id
+            FROM bulk_assessments
+            ORDER BY period_id, unit_type
+            ON CONFLICT (user_id, period_id, unit_type) DO UPDATE SET
+                total_composite_score = EXCLUDED.total_composite_score,
+                final_rating_label = EXCLUDED.final_rating_label,
+                status = EXCLUDED.status,
+                result_snapshot = EXCLUDED.result_snapshot,
+                rule_version_id = EXCLUDED.rule_version_id
+            RETURNING a.id, a.period_id, a.unit_type, (a.xmax = 0) AS is_new
+        ),
+        keyed AS (
+            SELECT b.ord, header.id, header.is_new, b.period_id, b.unit_type, b.total_composite_score, b.final_rating_label
+            FROM header JOIN bulk_assessments b USING (period_id, unit_type)
+        ),
+        upserted AS (
+            INSERT INTO assessment_details AS d
+            (assessment_id, risk_type_id, inherent_original, inherent_rounded, kpmr_score, risk_rating, composite_score, weight)
+            SELECT keyed.id, s.risk_type_id, s.inherent_original, s.inherent_rounded, s.kpmr_score, s.risk_rating,
+                   s.composite_score, s.weight
+            FROM bulk_details s JOIN keyed USING (ord)
+            ORDER BY keyed.id, s.risk_type_id
+            ON CONFLICT (assessment_id, risk_type_id) DO UPDATE SET
+                inherent_original = EXCLUDED.inherent_original,
+                inherent_rounded = EXCLUDED.inherent_rounded,
+                kpmr_score = EXCLUDED.kpmr_score,
+                risk_rating = EXCLUDED.risk_rating,
+                composite_score = EXCLUDED.composite_score,
+                weight = EXCLUDED.weight
+            WHERE (d.inherent_original, d.inherent_rounded, d.kpmr_score, d.risk_rating, d.composite_score, d.weight)
+                IS DISTINCT FROM
+                  (EXCLUDED.inherent_original, EXCLUDED.inherent_rounded,
+                   EXCLUDED.kpmr_score, EXCLUDED.risk_rating, EXCLUDED.composite_score, EXCLUDED.weight)
+        ),
+        removed AS (
+            DELETE FROM assessment_details d
+            USING keyed
+            WHERE d.assessment_id = keyed.id
+              AND NOT EXISTS (SELECT 1 FROM bulk_details s WHERE s.ord = keyed.ord AND s.risk_type_id = d.risk_type_id)
+        )
+        SELECT keyed.id, pg_notify('assessment_saved', json_build_object(
+            'id', keyed.id, 'user_id', $1::int, 'period_id', keyed.period_id, 'unit_type', keyed.unit_type,
+            'final_score', keyed.total_composite_score, 'final_rating', keyed.final_rating_label, 'is_new', keyed.is_new
+        )::text)
+        FROM keyed
+        ORDER BY keyed.ord
+    """,
+}
+
+
+# Statement yang dilayani pool replica (endpoint baca lewat get_read_db / get_users_read_db /
+# get_read_db_for_user). Pool primary mem-prepare seluruh STATEMENTS.
+REPLICA_STATEMENTS = (
+    "user.get_all", "user.stream_all", "user.get_by_id", "user.get_by_email", "user.get_principal_by_email",
+    "assessment.get_snapshot", "assessment.history", "assessment.export",
+    "analytics.trend", "analytics.labels", "analytics.risk_types",
+)
+
+
+class PreparedConnection(asyncpg.Connection):
+    """Koneksi yang mem-prepare statement registry saat dibuat, sebelum dipakai request"""
+
+    async def warm_statement(self, name: str, query: str):
+        # prepare() (API publik): backend baru me-load katalog tabel/index/fungsi statement ini sekarang,
+        # bukan saat request pertama, dan statement yang tidak valid ketahuan saat koneksi dibuat.
+        # Cache statement asyncpg sendiri baru terisi saat statement pertama kali dieksekusi.
+        # Gagal (mis. replica belum menerima migrasi terbaru) hanya dicatat, koneksi tetap dipakai.
+        try:
+            await self.prepare(query)
+        except asyncpg.PostgresError as e:
+            print(f"⚠️ Statement {name} not prepared: {e}")
+
+
+async def _warm(conn: PreparedConnection, names):
+    for name in names:
+        await conn.warm_statement(name, STATEMENTS[name])
+
+
+async def prepare_statements(conn: PreparedConnection):
+    """Hook `init` pool primary: prepare seluruh registry di koneksi baru"""
+    await _warm(conn, STATEMENTS)
+
+
+async def prepare_replica_statements(conn: PreparedConnection):
+    """Hook `init` pool replica: hanya statement baca yang dilayani replica"""
+    await _warm(conn, REPLICA_STATEMENTS)
+
+
+async def fetch(pool: asyncpg.Pool, name: str, *args) -> List[asyncpg.Record]:
+    return await pool.fetch(STATEMENTS[name], *args)
+
+
+async def fetchrow(pool: asyncpg.Pool, name: str, *args) -> Optional[asyncpg.Record]:
+    return await pool.fetchrow(STATEMENTS[name], *args)
@@ -1,71 +1,82 @@
 import asyncpg
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
+from app.core.cache import get_principal_cache
+from app.core.db import USERS_TABLE, get_write_tracker
+from app.core.metrics import timed_query, timed_stream
+from app.repository import statements
+from app.repository.analytics_repo import AnalyticsRepository
+from app.repository.statements import STATEMENTS
 from app.schemas.user import UserRegister, UserCreate, UserUpdate, UserRole
 
 class UserRepository:
     @staticmethod
-    async def get_all(pool: asyncpg.Pool) -> List[dict]:
-        query = "SELECT id, email, full_name, role, created_at FROM users ORDER BY id ASC"
-        rows = await pool.fetch(query)
-        return [dict(row) for row in rows]
+    @timed_query("user.get_all")
+    async def get_all(pool: asyncpg.Pool, after_id: int = 0, limit: int = 100) -> List[asyncpg.Record]:
+        # Keyset pagination: lanjut dari id terakhir halaman sebelumnya
+        # Record mentah: endpoint yang memutuskan perlu dict (response_model) atau langsung orjson
+        return await statements.fetch(pool, "user.get_all", after_id, limit)
+
+    @staticmethod
+    @timed_stream("user.stream_all")
+    async def stream_all(pool: asyncpg.Pool, after_id: int = 0, batch_size: int = 500) -> AsyncIterator[asyncpg.Record]:
+        """Baca users lewat server-side cursor, memori tetap datar berapa pun jumlah baris"""
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(STATEMENTS["user.stream_all"], after_id, prefetch=batch_size):
+                    yield row
     
     @staticmethod
+    @timed_query("user.get_by_id")
     async def get_by_id(pool: asyncpg.Pool, user_id: int) -> Optional[dict]:
-        query = "SELECT id, email, full_name, role, created_at FROM users WHERE id = $1"
-        row = await pool.fetchrow(query, user_id)
+        row = await statements.fetchrow(pool, "user.get_by_id", user_id)
         return dict(row) if row else None
 
     @staticmethod
+    @timed_query("user.get_by_email")
     async def get_by_email(pool: asyncpg.Pool, email: str) -> Optional[dict]:
-        query = "SELECT * FROM users WHERE email = $1"
-        row = await pool.fetchrow(query, email)
+        row = await statements.fetchrow(pool, "user.get_by_email", email)
         return dict(row) if row else None
 
     @staticmethod
+    @timed_query("user.get_principal_by_email")
+    async def get_principal_by_email(pool: asyncpg.Pool, email: str) -> Optional[dict]:
+        """Field yang dibutuhkan endpoint terproteksi saja (tanpa password hash)"""
+        row = await statements.fetchrow(pool, "user.get_principal_by_email", email)
+        return dict(row) if row else None
+
+    @staticmethod
+    @timed_query("user.create")
     async def create(pool: asyncpg.Pool, user: Union[UserRegister, UserCreate], hashed_password: str) -> Optional[dict]:
         role_to_save = getattr(user, "role", UserRole.USER)
-        
-        query = """
-            INSERT INTO users (email, password, full_name, role)
-            VALUES ($1, $2, $3, $4)
-            RETURNING id, email, full_name, role, created_at
-        """
 
         try:
-            row = await pool.fetchrow(query, user.email, hashed_password, user.full_name, role_to_save)
+            row = await statements.fetchrow(pool, "user.create", user.email, hashed_password, user.full_name, role_to_save)
+            get_write_tracker().mark(USERS_TABLE)
             return dict(row)
         except asyncpg.UniqueViolationError:
             return None
     
     @staticmethod
+    @timed_query("user.update")
     async def update(pool: asyncpg.Pool, user_id: int, user: UserUpdate) -> Optional[dict]:
-        fields = []
-        values = []
-        idx = 1
-
-        if user.full_name is not None:
-            fields.append(f"full_name = ${idx}")
-            values.append(user.full_name)
-            idx += 1
-        if user.email is not None:
-            fields.append(f"email = ${idx}")
-            values.append(user.email)
-            idx += 1
-        if user.role is not None:
-            fields.append(f"role = ${idx}")
-            values.append(user.role)
-            idx += 1
-        
-        if not fields:
+        if user.full_name is None and user.email is None and user.role is None:
             return await UserRepository.get_by_id(pool, user_id)
 
-        values.append(user_id)
-        query = f"UPDATE users SET {', '.join(fields)} WHERE id = ${idx} RETURNING id, email, full_name, role, created_at"
-
-        row = await pool.fetchrow(query, *values)
+        # Field None tidak diubah (COALESCE di statement)
+        row = await statements.fetchrow(pool, "user.update", user_id, user.full_name, user.email, user.role)
+        get_write_tracker().mark(USERS_TABLE)
+        get_principal_cache().invalidate_user(user_id)
         return dict(row) if row else None
     
     @staticmethod
+    @timed_query("user.delete")
     async def delete(pool: asyncpg.Pool, user_id: int) -> bool:
-        result = await pool.execute("DELETE FROM users WHERE id = $1", user_id)
-        return result != "DELETE 0"
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # Assessment user ikut terhapus (ON DELETE CASCADE): kurangi dulu dari agregat analytics
+                ids = [r['id'] for r in await conn.fetch(STATEMENTS["assessment.ids_by_user"], user_id)]
+                await AnalyticsRepository.apply(conn, ids, -1)
+                row = await conn.fetchrow(STATEMENTS["user.delete"], user_id)
+        get_write_tracker().mark(USERS_TABLE)
+        get_principal_cache().invalidate_user(user_id)
+        return row is not None
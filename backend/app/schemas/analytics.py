@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+class ScoreTrendPoint(BaseModel):
+    period_id: int
+    period_name: str
+    year: int
+    quarter: int
+    unit_type: str
+    assessments: int
+    avg_score: float
+
+class LabelCount(BaseModel):
+    unit_type: str
+    final_rating: str
+    assessments: int
+
+class RiskTypeAverage(BaseModel):
+    unit_type: str
+    risk_type_id: int
+    risk_name: str
+    details: int
+    avg_rating: float
+    avg_composite: float
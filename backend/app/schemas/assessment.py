@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
 from typing import List
 
 class AssessmentDetailRequest(BaseModel):
@@ -11,7 +12,13 @@ class AssessmentSubmit(BaseModel):
     unit_type: str # 'LPEI' atau 'UUS'
     details: List[AssessmentDetailRequest]
 
-class AssessmentDetailResponse(BaseModel):
+    # 1 baris per risk type (duplikat: yang terakhir dipakai)
+    @field_validator("details")
+    @classmethod
+    def unique_risk_types(cls, details: List[AssessmentDetailRequest]) -> List[AssessmentDetailRequest]:
+        return list({d.risk_type_id: d for d in details}.values())
+
+class AssessmentDetailSnapshot(BaseModel):
     risk_name: str
     weight_percent: str
     inherent_origin: float
@@ -20,8 +27,46 @@ class AssessmentDetailResponse(BaseModel):
     risk_rating: int
     composite: float
 
+class AssessmentDetailResponse(AssessmentDetailSnapshot):
+    changed: bool = True # False = baris tidak berubah dari submission sebelumnya
+
 class AssessmentResponse(BaseModel):
     id: int
     final_score: float
     final_rating: str
-    table_data: List[AssessmentDetailResponse]
\ No newline at end of file
+    rule_version_id: int # versi aturan penilaian yang dipakai
+    table_data: List[AssessmentDetailResponse]
+    is_new: bool = True # False = resubmission (header lama di-update)
+    removed_risk_type_ids: List[int] = []
+
+# GET /assessment/history: ringkasan per assessment (tanpa detail)
+class AssessmentSummary(BaseModel):
+    id: int
+    period_id: int
+    unit_type: str
+    status: str
+    submitted_at: datetime
+    final_score: float | None = None
+    final_rating: str | None = None
+    rule_version_id: int
+
+# GET /assessment/{id}: table_data dari snapshot yang disimpan saat calculate
+class AssessmentDetailView(AssessmentSummary):
+    user_id: int
+    table_data: List[AssessmentDetailSnapshot]
+
+class BulkImportRecordResult(BaseModel):
+    index: int
+    period_id: int | None = None
+    unit_type: str | None = None
+    status: str # 'OK', 'REPLACED' (tertimpa record setelahnya), 'ERROR'
+    id: int | None = None
+    final_score: float | None = None
+    final_rating: str | None = None
+    error: str | None = None
+
+class BulkImportResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkImportRecordResult]
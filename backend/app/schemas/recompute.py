@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel, computed_field
+
+class RecomputeJobResponse(BaseModel):
+    id: int
+    status: str # RUNNING / COMPLETED / FAILED
+    started_by: int | None
+    total_assessments: int
+    processed_assessments: int
+    changed_assessments: int
+    changed_details: int
+    last_assessment_id: int
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
+
+    @computed_field
+    @property
+    def progress_percent(self) -> float:
+        if self.status == "COMPLETED":
+            return 100.0
+        if not self.total_assessments:
+            return 0.0
+        return round(min(self.processed_assessments / self.total_assessments, 1.0) * 100, 2)
@@ -0,0 +1,57 @@
+from typing import Dict, List, Literal
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.assessment import AssessmentSubmit
+
+class Distribution(BaseModel):
+    # fixed: selalu `low`; uniform: [low, high]; triangular: [low, mode, high]
+    kind: Literal["fixed", "uniform", "triangular"] = "uniform"
+    low: float = Field(..., ge=1, le=5)
+    high: float | None = Field(None, ge=1, le=5)
+    mode: float | None = Field(None, ge=1, le=5)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.kind == "fixed":
+            return self
+        if self.high is None or self.high < self.low:
+            raise ValueError("high is required and must be >= low")
+        if self.kind == "triangular" and (self.mode is None or not self.low <= self.mode <= self.high):
+            raise ValueError("mode is required and must be within [low, high]")
+        return self
+
+class RiskDistribution(BaseModel):
+    risk_type_id: int
+    inherent: Distribution | None = None # None = pakai nilai draft
+    kpmr: Distribution | None = None # sampel dibulatkan ke integer 1-5
+
+class SimulationRequest(BaseModel):
+    submission: AssessmentSubmit
+    distributions: List[RiskDistribution] = []
+    n_scenarios: int = Field(10_000, ge=100)
+    seed: int | None = None # None = seed diturunkan dari hash input (hasil deterministik)
+
+class RiskSensitivity(BaseModel):
+    risk_type_id: int
+    risk_name: str
+    mean_rating: float
+    mean_composite: float
+    correlation: float # korelasi composite risiko ini vs total composite
+    variance_share: float # kontribusi ke varians total (jumlah semua = 1)
+
+class Histogram(BaseModel):
+    bin_edges: List[float]
+    counts: List[int]
+
+class SimulationResponse(BaseModel):
+    n_scenarios: int
+    seed: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: Dict[str, float]
+    histogram: Histogram
+    label_probabilities: Dict[str, float]
+    sensitivity: List[RiskSensitivity]
+    cached: bool = False
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+import asyncpg
+
+from app.repository.analytics_repo import AnalyticsRepository
+
+
+class AnalyticsRebuildRunner:
+    """
+    Rebuild agregat analytics (rebuild_assessment_stats, lock EXCLUSIVE tabel agregat) di background
+    task, bukan di dalam request. Hanya satu rebuild sekaligus di semua worker: advisory lock sesi
+    pada koneksi yang menjalankannya. Status yang dilaporkan = rebuild terakhir di worker ini.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._status: dict = {"status": "IDLE"}
+
+    def status(self) -> dict:
+        return dict(self._status)
+
+    async def start(self, pool: asyncpg.Pool) -> bool:
+        """Mulai rebuild; False jika rebuild lain (worker mana pun) masih berjalan"""
+        if self._task is not None and not self._task.done():
+            return False
+        claimed = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(pool, claimed))
+        return await claimed
+
+    async def stop(self):
+        # Rebuild yang dibatalkan di-rollback Postgres, agregat lama tetap utuh
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self, pool: asyncpg.Pool, claimed: asyncio.Future):
+        try:
+            async with pool.acquire() as conn:
+                if not await AnalyticsRepository.try_lock_rebuild(conn):
+                    claimed.set_result(False)
+                    return
+                self._status = {"status": "RUNNING", "started_at": datetime.now(timezone.utc)}
+                claimed.set_result(True)
+                await AnalyticsRepository.rebuild(conn)
+        except asyncio.CancelledError:
+            if claimed.done():
+                self._status.update(status="CANCELLED", finished_at=datetime.now(timezone.utc))
+            else:
+                claimed.cancel()
+            raise
+        except Exception as e:
+            if not claimed.done():
+                # Gagal sebelum rebuild mulai (mis. pool habis): error dikembalikan ke request
+                claimed.set_exception(e)
+                return
+            print(f"❌ Analytics rebuild failed: {e}")
+            self._status.update(status="FAILED", error=str(e), finished_at=datetime.now(timezone.utc))
+            return
+        if self._status.get("status") == "RUNNING":
+            self._status.update(status="COMPLETED", finished_at=datetime.now(timezone.utc))
+            print("✅ Analytics rebuild completed")
+
+
+analytics_rebuild_runner = AnalyticsRebuildRunner()
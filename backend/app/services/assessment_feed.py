@@ -0,0 +1,98 @@
+import asyncio
+import json
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.services.notify_listener import notify_listener
+
+# Channel NOTIFY dari "assessment.save" (app/repository/statements.py)
+ASSESSMENT_SAVED_CHANNEL = "assessment_saved"
+
+
+class FeedSubscriber:
+    """Satu klien SSE: antrean terbatas + filter opsional (periode / unit type)"""
+
+    def __init__(self, queue_size: int, period_id: Optional[int] = None, unit_type: Optional[str] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.period_id = period_id
+        self.unit_type = unit_type
+
+    def wants(self, event: dict) -> bool:
+        return (
+            (self.period_id is None or event.get("period_id") == self.period_id)
+            and (self.unit_type is None or event.get("unit_type") == self.unit_type)
+        )
+
+    def close(self):
+        # Kosongkan antrean lalu kirim sentinel: stream klien selesai
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class AssessmentFeed:
+    """
+    Fan-out NOTIFY assessment_saved ke semua klien SSE di worker ini.
+    Memakai koneksi LISTEN bersama per worker (notify_listener), berapa pun jumlah klien;
+    klien idle tidak menyentuh DB sama sekali. Pesan di-encode sekali lalu dibagikan.
+    Klien lambat (antrean penuh) diputus supaya tidak menahan memori / klien lain.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[FeedSubscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    # --- SUBSCRIBER ---
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= settings.FEED_MAX_SUBSCRIBERS
+
+    def subscribe(self, period_id: Optional[int] = None, unit_type: Optional[str] = None) -> Optional[FeedSubscriber]:
+        """None jika worker ini sudah mencapai FEED_MAX_SUBSCRIBERS"""
+        if self.full:
+            return None
+        subscriber = FeedSubscriber(settings.FEED_CLIENT_QUEUE_SIZE, period_id, unit_type)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FeedSubscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, payload: str):
+        event = json.loads(payload)
+        message = f"event: assessment\nid: {event['id']}\ndata: {payload}\n\n".encode()
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self.unsubscribe(subscriber)
+                subscriber.close()
+
+    # --- LISTEN ---
+
+    async def start(self):
+        """Jalankan saat server start. NOTIFY selama LISTEN terputus hilang (feed best-effort)."""
+        await notify_listener.listen(ASSESSMENT_SAVED_CHANNEL, self.publish)
+
+    async def stop(self):
+        """Jalankan saat server stop: putus semua klien"""
+        await notify_listener.unlisten(ASSESSMENT_SAVED_CHANNEL, self.publish)
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+assessment_feed = AssessmentFeed()
@@ -0,0 +1,166 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Iterable, List, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.schemas.assessment import AssessmentSubmit, AssessmentDetailRequest
+from app.services.calculation import CompiledRules, RiskCalculationService
+from app.services.risk_weights import weight_unit
+
+# Kolom wajib untuk upload CSV (1 baris = 1 detail risiko)
+CSV_COLUMNS = ["period_id", "unit_type", "risk_type_id", "inherent", "kpmr"]
+
+# (index record, submission valid) atau (index record, pesan error)
+ParsedRecord = Tuple[int, Union[AssessmentSubmit, str]]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Pecah body request (stream bytes) menjadi baris tanpa membaca semuanya ke memori"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """NDJSON: 1 baris = 1 AssessmentSubmit"""
+    index = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield index, AssessmentSubmit.model_validate(json.loads(line))
+        except (ValueError, ValidationError) as e:
+            yield index, _error_message(e)
+        index += 1
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """
+    CSV: 1 baris = 1 detail. Baris berurutan dengan (period_id, unit_type) yang sama
+    digabung menjadi satu submission.
+    """
+    lines = _iter_lines(chunks)
+    header = None
+    async for line in lines:
+        if line.strip():
+            header = next(csv.reader([line]))
+            break
+    if header is None:
+        return
+
+    header = [h.strip() for h in header]
+    missing = [c for c in CSV_COLUMNS if c not in header]
+    if missing:
+        yield 0, f"Missing CSV columns: {', '.join(missing)}"
+        return
+    pos = {c: header.index(c) for c in CSV_COLUMNS}
+
+    index = 0
+    started = False
+    current_key = None
+    current_details: List[AssessmentDetailRequest] = []
+    current_error = None
+
+    def flush():
+        if current_error:
+            return index, current_error
+        try:
+            return index, AssessmentSubmit(
+                period_id=current_key[0], unit_type=current_key[1], details=current_details
+            )
+        except ValidationError as e:
+            return index, _error_message(e)
+
+    async for line in lines:
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        key = (row[pos["period_id"]].strip(), row[pos["unit_type"]].strip()) if len(row) >= len(header) else None
+
+        if started and key != current_key:
+            yield flush()
+            index += 1
+            current_details, current_error = [], None
+
+        started, current_key = True, key
+        if key is None:
+            current_error = current_error or f"Malformed CSV row: {line!r}"
+            continue
+        try:
+            current_details.append(AssessmentDetailRequest(
+                risk_type_id=row[pos["risk_type_id"]],
+                inherent=row[pos["inherent"]],
+                kpmr=row[pos["kpmr"]],
+            ))
+        except ValidationError as e:
+            current_error = current_error or _error_message(e)
+
+    if started:
+        yield flush()
+
+
+def score_submissions(submissions: Iterable[AssessmentSubmit], risk_maps: dict, rules: CompiledRules) -> List[dict]:
+    """
+    Hitung banyak submission sekaligus via RiskCalculationService.score_assessments.
+    risk_maps: unit_type -> {risk_id: {'w': bobot, 'name': nama}} (RiskWeightCache.get_risk_maps);
+    unit type selain 'UUS' memakai bobot LPEI, sama dengan /assessment/calculate
+    Output: per submission {total_composite, final_label, rule_version_id,
+            details: [(risk_type_id, inherent, inherent_round, kpmr, rating, composite, weight)],
+            table_data: baris snapshot (format response calculate)}
+    """
+    submissions = list(submissions)
+    risk_ids, names, inherent, kpmr, weight, owner = [], [], [], [], [], []
+
+    for i, sub in enumerate(submissions):
+        risk_map = risk_maps[weight_unit(sub.unit_type)]
+        for item in sub.details:
+            if item.risk_type_id not in risk_map:
+                continue
+            risk_ids.append(item.risk_type_id)
+            names.append(risk_map[item.risk_type_id]['name'])
+            inherent.append(item.inherent)
+            kpmr.append(item.kpmr)
+            weight.append(risk_map[item.risk_type_id]['w'])
+            owner.append(i)
+
+    scored = RiskCalculationService.score_assessments(
+        rules, inherent, kpmr, weight, owner, n_assessments=len(submissions)
+    )
+
+    results = [
+        {
+            "total_composite": float(scored["total_composite"][i]),
+            "final_label": str(scored["final_label"][i]),
+            "rule_version_id": rules.version_id,
+            "details": [],
+            "table_data": [],
+        }
+        for i in range(len(submissions))
+    ]
+    inherent_round = scored["inherent_round"].tolist()
+    risk_rating = scored["risk_rating"].tolist()
+    composite = scored["composite"].tolist()
+    for j, i in enumerate(owner):
+        results[i]["details"].append((
+            risk_ids[j], inherent[j], inherent_round[j], kpmr[j], risk_rating[j], composite[j], weight[j]
+        ))
+        results[i]["table_data"].append(RiskCalculationService.table_row(
+            names[j], weight[j],
+            inherent[j], inherent_round[j], kpmr[j], risk_rating[j], composite[j]
+        ))
+    return results
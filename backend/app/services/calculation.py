@@ -1,36 +1,94 @@
 import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+import numpy as np
+
+# Skala inheren (hasil pembulatan) & KPMR di matriks aturan
+SCALE = 5
+
+
+class RuleCompileError(ValueError):
+    """Baris aturan di DB tidak lengkap / tidak konsisten"""
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    Satu versi aturan (tabel risk_rule_*) yang sudah dikompilasi jadi lookup datar:
+    - rating_flat[(inherent-1)*SCALE + (kpmr-1)] -> peringkat risiko (tuple untuk jalur per-row,
+      rating_lookup array 2D untuk jalur batch)
+    - thresholds urut naik + labels (len = thresholds + 1): skor <= thresholds[i] -> labels[i]
+    Picklable, jadi bisa dikirim ke process pool simulasi.
+    """
+    version_id: int
+    rating_flat: Tuple[int, ...]
+    rating_lookup: np.ndarray
+    thresholds: Tuple[float, ...]
+    threshold_array: np.ndarray
+    labels: Tuple[str, ...]
+    label_array: np.ndarray
+
+
+def compile_rules(version_id: int, matrix: Iterable[tuple], labels: Iterable[tuple]) -> CompiledRules:
+    """
+    matrix: (inherent, kpmr, rating) untuk semua SCALE x SCALE sel
+    labels: (position, upper_bound | None, label); hanya label terakhir tanpa batas atas
+    """
+    lookup = np.zeros((SCALE, SCALE), dtype=np.int64)
+    for inherent, kpmr, rating in matrix:
+        lookup[inherent - 1, kpmr - 1] = rating
+    if (lookup == 0).any():
+        missing = [(int(i) + 1, int(k) + 1) for i, k in zip(*np.nonzero(lookup == 0))]
+        raise RuleCompileError(f"Rule version {version_id}: matrix missing (inherent, kpmr) {missing}")
+
+    ordered = sorted(labels, key=lambda row: row[0])
+    if not ordered or ordered[-1][1] is not None:
+        raise RuleCompileError(f"Rule version {version_id}: last label must have no upper bound")
+    thresholds = tuple(float(bound) for _, bound, _ in ordered[:-1] if bound is not None)
+    if len(thresholds) != len(ordered) - 1 or any(a >= b for a, b in zip(thresholds, thresholds[1:])):
+        raise RuleCompileError(f"Rule version {version_id}: label bounds must be set and strictly increasing")
+    names = tuple(label for _, _, label in ordered)
+
+    return CompiledRules(
+        version_id=version_id,
+        rating_flat=tuple(lookup.ravel().tolist()),
+        rating_lookup=lookup,
+        thresholds=thresholds,
+        threshold_array=np.array(thresholds, dtype=np.float64),
+        labels=names,
+        label_array=np.array(names, dtype=object),
+    )
+
 
 class RiskCalculationService:
-    # 1. MATRIKS RISIKO (Inheren Pembulatan vs KPMR -> Peringkat Risiko)
-    RISK_MATRIX = {
-        1: {1: 1, 2: 1, 3: 2, 4: 2, 5: 3},
-        2: {1: 1, 2: 2, 3: 2, 4: 3, 5: 3},
-        3: {1: 2, 2: 2, 3: 3, 4: 3, 5: 4},
-        4: {1: 2, 2: 3, 3: 3, 4: 4, 5: 5},
-        5: {1: 3, 2: 4, 3: 4, 4: 5, 5: 5},
-    }
-
-    # 2. RANGE PENENTUAN PERINGKAT (Total Composite -> Label)
-    @staticmethod
-    def get_final_label(score: float) -> str:
-        if score <= 1.8: return "Rendah (1)"
-        if score <= 2.6: return "Sedang Rendah (2)"
-        if score <= 3.4: return "Sedang (3)"
-        if score <= 4.2: return "Sedang Tinggi (4)"
-        return "Tinggi (5)"
-    
-    @staticmethod
-    def calculate_row(inherent_origin: float, kpmr: int, weight: float):
+    # Matriks peringkat & batas label per versi aturan: lihat CompiledRules / app/services/risk_rules.py
+
+    @staticmethod
+    def rating(rules: CompiledRules, inherent_rounded: int, kpmr: int) -> int:
+        """Lookup matriks; KPMR di luar skala adalah error (bukan fallback diam-diam)"""
+        if not 1 <= kpmr <= SCALE:
+            raise ValueError(f"KPMR {kpmr} outside rule matrix 1..{SCALE}")
+        return rules.rating_flat[(inherent_rounded - 1) * SCALE + kpmr - 1]
+
+    @staticmethod
+    def get_final_label(rules: CompiledRules, score: float) -> str:
+        # bisect_left == perbandingan '<=' terhadap batas atas tiap label
+        return rules.labels[bisect_left(rules.thresholds, score)]
+
+    @staticmethod
+    def calculate_row(rules: CompiledRules, inherent_origin: float, kpmr: int, weight: float):
         """
         Input: Angka Inheren (2.32), KPMR (3), Bobot (0.30)
         Output: Semua angka untuk baris tabel
         """
         # A. Pembulatan (round-up)
         inherent_rounded = math.floor(inherent_origin + 0.5)
-        inherent_rounded = max(1, min(5, inherent_rounded))
+        inherent_rounded = max(1, min(SCALE, inherent_rounded))
 
         # B. Lookup Matriks (Cari peringkat risiko)
-        risk_rating = RiskCalculationService.RISK_MATRIX.get(inherent_rounded, {}).get(kpmr, 3)
+        risk_rating = RiskCalculationService.rating(rules, inherent_rounded, kpmr)
 
         # C. Complete...
         composite = risk_rating * weight
@@ -41,3 +99,116 @@ class RiskCalculationService:
             "composite": composite
         }
 
+    @staticmethod
+    def table_row(risk_name: str, weight: float, inherent_origin: float, inherent_round: int,
+                  kpmr: int, risk_rating: int, composite: float) -> dict:
+        """Satu baris table_data (response calculate & result_snapshot yang disimpan)"""
+        return {
+            "risk_name": risk_name,
+            "weight_percent": f"{weight*100:.2f}%",
+            "inherent_origin": inherent_origin,
+            "inherent_round": inherent_round,
+            "kpmr": kpmr,
+            "risk_rating": risk_rating,
+            "composite": round(composite, 2)
+        }
+
+    # --- BATCH (VECTORIZED) ---
+    # Hasil harus identik dengan calculate_row / get_final_label di atas.
+
+    @staticmethod
+    def get_final_labels(rules: CompiledRules, scores) -> np.ndarray:
+        """
+        Input: Array total composite
+        Output: Array label (searchsorted side='left' == perbandingan '<=')
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        idx = np.searchsorted(rules.threshold_array, scores, side="left")
+        return rules.label_array[idx]
+
+    @staticmethod
+    def calculate_batch(rules: CompiledRules, inherent_origin, kpmr, weight) -> dict:
+        """
+        Input: Array inheren, KPMR, bobot (panjang sama, satu elemen per baris detail)
+        Output: Dict array inherent_round, risk_rating, composite
+        """
+        inherent_origin = np.asarray(inherent_origin, dtype=np.float64)
+        kpmr = np.asarray(kpmr, dtype=np.int64)
+        weight = np.asarray(weight, dtype=np.float64)
+
+        # A. Pembulatan (round-up) + clamp 1..5
+        inherent_rounded = np.clip(np.floor(inherent_origin + 0.5), 1, SCALE).astype(np.int64)
+
+        # B. Lookup Matriks, KPMR di luar skala -> error (sama dengan jalur per-row)
+        if kpmr.size and (kpmr.min() < 1 or kpmr.max() > SCALE):
+            raise ValueError(f"KPMR outside rule matrix 1..{SCALE}")
+        risk_rating = rules.rating_lookup[inherent_rounded - 1, kpmr - 1]
+
+        # C. Composite
+        composite = risk_rating * weight
+
+        return {
+            "inherent_round": inherent_rounded,
+            "risk_rating": risk_rating,
+            "composite": composite
+        }
+
+    @staticmethod
+    def score_assessments(rules: CompiledRules, inherent_origin, kpmr, weight, assessment_index, n_assessments: int) -> dict:
+        """
+        Skor banyak assessment sekaligus.
+        assessment_index: nomor assessment (0..n_assessments-1) untuk setiap baris detail.
+        Output: hasil calculate_batch + total_composite & final_label per assessment.
+        """
+        rows = RiskCalculationService.calculate_batch(rules, inherent_origin, kpmr, weight)
+
+        # bincount menjumlah berurutan (sama seperti loop `total += composite`),
+        # jadi hasilnya bit-identik dengan jalur per-row.
+        totals = np.bincount(
+            np.asarray(assessment_index, dtype=np.int64),
+            weights=rows["composite"],
+            minlength=n_assessments,
+        )
+
+        rows["total_composite"] = totals
+        rows["final_label"] = RiskCalculationService.get_final_labels(rules, totals)
+        return rows
+
+    @staticmethod
+    def score_assessments_by_version(
+        rules_by_version: dict, assessment_versions, inherent_origin, kpmr, weight, assessment_index, n_assessments: int
+    ) -> dict:
+        """
+        Seperti score_assessments, tapi tiap assessment dihitung dengan versi aturannya sendiri
+        (recompute: assessment lama tetap memakai aturan saat disubmit).
+        assessment_versions: rule_version_id per assessment; rules_by_version: id -> CompiledRules.
+        """
+        versions = np.asarray(assessment_versions, dtype=np.int64)
+        owner = np.asarray(assessment_index, dtype=np.int64)
+        inherent_origin = np.asarray(inherent_origin, dtype=np.float64)
+        kpmr = np.asarray(kpmr, dtype=np.int64)
+        weight = np.asarray(weight, dtype=np.float64)
+
+        out = {
+            "inherent_round": np.zeros(len(owner), dtype=np.int64),
+            "risk_rating": np.zeros(len(owner), dtype=np.int64),
+            "composite": np.zeros(len(owner), dtype=np.float64),
+            "total_composite": np.zeros(n_assessments, dtype=np.float64),
+            "final_label": np.empty(n_assessments, dtype=object),
+        }
+        for version_id, rules in rules_by_version.items():
+            in_version = versions == version_id
+            if not in_version.any():
+                continue
+            rows_mask = in_version[owner]
+            # Nomor assessment lokal (0..k-1), urutan baris tetap -> total bit-identik
+            local_index = (np.cumsum(in_version) - 1)[owner[rows_mask]]
+            part = RiskCalculationService.score_assessments(
+                rules, inherent_origin[rows_mask], kpmr[rows_mask], weight[rows_mask],
+                local_index, n_assessments=int(in_version.sum())
+            )
+            for key in ("inherent_round", "risk_rating", "composite"):
+                out[key][rows_mask] = part[key]
+            out["total_composite"][in_version] = part["total_composite"]
+            out["final_label"][in_version] = part["final_label"]
+        return out
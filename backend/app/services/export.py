@@ -0,0 +1,107 @@
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from typing import AsyncIterator, List
+
+import asyncpg
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse
+
+# Header file export (1 baris = 1 detail risiko), format nilai sama dengan response /assessment/calculate
+EXPORT_COLUMNS = [
+    "assessment_id", "email", "full_name", "period", "unit_type", "status", "submitted_at",
+    "final_score", "final_rating",
+    "risk_type_id", "risk_name", "weight_percent", "inherent_origin", "inherent_round",
+    "kpmr", "risk_rating", "composite",
+]
+
+
+def export_row(row: asyncpg.Record) -> list:
+    has_detail = row['risk_type_id'] is not None
+    return [
+        row['assessment_id'],
+        row['email'],
+        row['full_name'],
+        row['period_name'],
+        row['unit_type'],
+        row['status'],
+        row['created_at'].isoformat(),
+        round(float(row['total_composite_score'] or 0), 2),
+        row['final_rating_label'],
+        row['risk_type_id'],
+        row['risk_name'],
+        f"{float(row['weight'])*100:.2f}%" if has_detail and row['weight'] is not None else None,
+        float(row['inherent_original']) if has_detail else None,
+        row['inherent_rounded'],
+        row['kpmr_score'],
+        row['risk_rating'],
+        round(float(row['composite_score']), 2) if has_detail else None,
+    ]
+
+
+async def csv_chunks(batches: AsyncIterator[List[asyncpg.Record]]) -> AsyncIterator[bytes]:
+    """CSV dikirim per batch cursor: memori tetap sebesar 1 batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in batches:
+        writer.writerows(export_row(row) for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def write_xlsx(batches: AsyncIterator[List[asyncpg.Record]]) -> str:
+    """
+    Tulis XLSX ke file sementara (XlsxWriter constant_memory: baris langsung di-flush ke disk).
+    Format zip XLSX baru valid setelah close, jadi file dikirim setelah selesai ditulis.
+    Return: path file (hapus setelah dikirim).
+    """
+    # Import di sini: xlsxwriter hanya dibutuhkan export XLSX, tidak perlu memperlambat startup
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "tmpdir": tempfile.gettempdir()})
+        sheet = workbook.add_worksheet("Assessments")
+        sheet.write_row(0, 0, EXPORT_COLUMNS)
+        row_index = 1
+        async for rows in batches:
+            for row in rows:
+                sheet.write_row(row_index, 0, export_row(row))
+                row_index += 1
+        # Kompresi zip bisa lama untuk periode besar: jangan blok event loop
+        await asyncio.to_thread(workbook.close)
+        return path
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class TempFileResponse(FileResponse):
+    """
+    Kirim file sementara (hasil write_xlsx) lalu hapus lewat BackgroundTask. Starlette melewati
+    background task jika pengiriman gagal (klien putus), jadi di jalur itu file dihapus langsung.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, background=BackgroundTask(_remove, path), **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        except BaseException:
+            await self.background()
+            raise
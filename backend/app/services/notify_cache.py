@@ -0,0 +1,92 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+import asyncpg
+
+from app.services.notify_listener import notify_listener
+
+
+class NotifyCache(ABC):
+    """
+    Dasar cache in-process yang di-load dari Postgres dan di-reload otomatis saat ada NOTIFY
+    di `channel` (dikirim trigger tabel sumbernya), sehingga semua worker uvicorn tetap
+    konsisten tanpa polling. LISTEN lewat koneksi bersama per worker (notify_listener).
+    Subclass mengisi `_load(pool)`; `version` naik setiap reload.
+    """
+
+    channel: str = ""
+    name: str = "cache"
+
+    def __init__(self):
+        self.version = 0
+        self._pool: asyncpg.Pool | None = None
+        self._reload_task: asyncio.Task | None = None
+        self._dirty = False
+        self._starting = False
+
+    @abstractmethod
+    async def _load(self, pool: asyncpg.Pool):
+        """Baca data dari DB lalu ganti isi cache sekaligus"""
+
+    async def load(self, pool: asyncpg.Pool):
+        """Ambil ulang data dari DB; pembaca tidak pernah melihat data setengah jadi"""
+        await self._load(pool)
+        self.version += 1
+
+    @property
+    def loaded(self) -> bool:
+        return self.version > 0
+
+    async def ensure_loaded(self, pool: asyncpg.Pool):
+        if not self.loaded:
+            await self.load(pool)
+
+    # --- INVALIDATION (LISTEN/NOTIFY) ---
+
+    async def start(self, pool: asyncpg.Pool):
+        """Jalankan saat server start: daftar ke koneksi LISTEN worker + load awal"""
+        self._pool = pool
+        self._starting = True
+        try:
+            # LISTEN dulu baru load: NOTIFY dari commit selama load awal tidak terlewat.
+            # Reconnect LISTEN: NOTIFY selama terputus bisa terlewat, jadi reload
+            await notify_listener.listen(self.channel, self._on_notify, on_reconnect=self._schedule_reload)
+            self._dirty = False
+            await self.load(pool)
+        finally:
+            self._starting = False
+        # Ada NOTIFY selama load awal: snapshot load bisa lebih lama dari commit tsb
+        if self._dirty:
+            self._schedule_reload()
+
+    async def stop(self):
+        """Jalankan saat server stop"""
+        self._pool = None
+        if self._reload_task:
+            self._reload_task.cancel()
+        await notify_listener.unlisten(self.channel, self._on_notify, on_reconnect=self._schedule_reload)
+
+    def _on_notify(self, payload: str):
+        self._schedule_reload()
+
+    def _schedule_reload(self):
+        if self._pool is None:
+            return
+        self._dirty = True
+        if self._starting:
+            return
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.get_running_loop().create_task(self._reload())
+
+    async def _reload(self):
+        delay = 1
+        while self._dirty and self._pool is not None:
+            try:
+                self._dirty = False
+                await self.load(self._pool)
+                delay = 1
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError) as e:
+                print(f"❌ {self.name} reload error: {e}")
+                self._dirty = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
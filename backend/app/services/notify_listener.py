@@ -0,0 +1,110 @@
+import asyncio
+from typing import Callable, Dict, List, Set
+
+import asyncpg
+
+from app.core.config import settings
+
+
+class NotifyListener:
+    """
+    Satu koneksi LISTEN khusus per worker (bukan dari pool) untuk semua channel NOTIFY:
+    cache master data (NotifyCache) & feed SSE mendaftarkan callback per channel di sini.
+    Koneksi dibuka saat callback pertama didaftarkan. Jika putus, reconnect dengan backoff lalu
+    semua callback `on_reconnect` dipanggil (NOTIFY selama terputus hilang, cache perlu reload).
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_callbacks: List[Callable[[], None]] = []
+        self._conn: asyncpg.Connection | None = None
+        self._listening: Set[str] = set()
+        self._lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+        self._running = False
+        self.reconnects = 0
+
+    async def listen(self, channel: str, callback: Callable[[str], None], on_reconnect: Callable[[], None] | None = None):
+        """`callback(payload)` untuk setiap NOTIFY di `channel`"""
+        self._running = True
+        self._handlers.setdefault(channel, []).append(callback)
+        if on_reconnect is not None:
+            self._reconnect_callbacks.append(on_reconnect)
+        await self._sync()
+
+    async def unlisten(self, channel: str, callback: Callable[[str], None], on_reconnect: Callable[[], None] | None = None):
+        handlers = self._handlers.get(channel, [])
+        if callback in handlers:
+            handlers.remove(callback)
+        if on_reconnect in self._reconnect_callbacks:
+            self._reconnect_callbacks.remove(on_reconnect)
+        if handlers:
+            return
+        self._handlers.pop(channel, None)
+        if channel in self._listening and self._conn is not None and not self._conn.is_closed():
+            self._listening.discard(channel)
+            await self._conn.remove_listener(channel, self._dispatch)
+
+    async def stop(self):
+        """Jalankan saat server stop (setelah semua pendaftar berhenti)"""
+        self._running = False
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+        self._listening.clear()
+        self._handlers.clear()
+        self._reconnect_callbacks.clear()
+
+    async def _sync(self):
+        # Buka koneksi bila perlu, lalu LISTEN channel yang belum
+        async with self._lock:
+            if self._conn is None or self._conn.is_closed():
+                self._conn = await asyncpg.connect(settings.DATABASE_URL)
+                self._conn.add_termination_listener(self._on_lost)
+                self._listening = set()
+            for channel in list(self._handlers):
+                if channel not in self._listening:
+                    await self._conn.add_listener(channel, self._dispatch)
+                    self._listening.add(channel)
+
+    def _dispatch(self, conn, pid, channel, payload):
+        for callback in list(self._handlers.get(channel, [])):
+            try:
+                callback(payload)
+            except Exception as e:
+                # Satu pendaftar gagal tidak boleh menghentikan yang lain
+                print(f"❌ NOTIFY {channel} handler error: {e}")
+
+    def _on_lost(self, conn):
+        if not self._running or conn is not self._conn:
+            return
+        self._conn = None
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1
+        while self._running:
+            try:
+                await self._sync()
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError) as e:
+                print(f"❌ NOTIFY listener reconnect error: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+            self.reconnects += 1
+            for callback in list(self._reconnect_callbacks):
+                callback()
+            return
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._conn is not None and not self._conn.is_closed(),
+            "channels": sorted(self._listening),
+            "reconnects": self.reconnects,
+        }
+
+
+notify_listener = NotifyListener()
@@ -0,0 +1,40 @@
+from typing import List
+
+import asyncpg
+
+from app.core import serialization
+from app.core.http_cache import make_etag
+from app.services.notify_cache import NotifyCache
+
+# Channel NOTIFY dari trigger di sql/004_periods_notify.sql
+PERIODS_CHANNEL = "periods_changed"
+
+
+class PeriodCache(NotifyCache):
+    """
+    Cache in-process daftar periode untuk GET /master/periods.
+    Body JSON & ETag di-render sekali per reload.
+    """
+
+    channel = PERIODS_CHANNEL
+    name = "Period cache"
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[dict] = []
+        self.body = b""
+        self.etag = ""
+
+    async def _load(self, pool: asyncpg.Pool):
+        rows = await pool.fetch("""
+            SELECT id, name, year, quarter, start_date, end_date
+            FROM periods
+            ORDER BY year DESC, quarter DESC
+        """)
+        rows = [dict(r) for r in rows]
+        body = serialization.dumps(rows)
+        # Swap sekaligus
+        self.rows, self.body, self.etag = rows, body, make_etag(body)
+
+
+period_cache = PeriodCache()
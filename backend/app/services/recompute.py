@@ -0,0 +1,103 @@
+import asyncio
+from typing import Dict, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.repository.recompute_repo import RecomputeRepository
+from app.services.risk_weights import risk_weight_cache
+
+
+class RecomputeRunner:
+    """
+    Menjalankan job hitung ulang skor assessment (tabel recompute_jobs) di background task.
+    Tiap chunk = 1 transaksi pendek (lock job + header chunk saja), jeda antar chunk
+    memberi ruang untuk traffic submission biasa. Job RUNNING yang terputus (crash / restart)
+    dilanjutkan saat startup dari checkpoint terakhir. Satu job hanya dijalankan oleh satu
+    worker (advisory lock per job, lihat RecomputeRepository.own_job); worker lain yang
+    mencoba resume job yang sama langsung berhenti.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def start_job(self, pool: asyncpg.Pool, user_id: int) -> Optional[dict]:
+        """Job baru; None jika masih ada job lain yang RUNNING"""
+        job = await RecomputeRepository.create_job(pool, user_id)
+        if job is not None:
+            self._spawn(pool, job['id'])
+        return job
+
+    async def resume_job(self, pool: asyncpg.Pool, job_id: int) -> Optional[dict]:
+        job = await RecomputeRepository.resume_job(pool, job_id)
+        if job is not None:
+            self._spawn(pool, job_id)
+        return job
+
+    async def resume_interrupted(self, pool: asyncpg.Pool):
+        """Dipanggil saat startup: lanjutkan job yang masih RUNNING"""
+        for job_id in await RecomputeRepository.running_ids(pool):
+            print(f"🔁 Resuming recompute job {job_id}")
+            self._spawn(pool, job_id)
+
+    async def stop(self):
+        # Job tetap RUNNING di DB, dilanjutkan saat startup berikutnya
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def _spawn(self, pool: asyncpg.Pool, job_id: int):
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            self._tasks[job_id] = asyncio.create_task(self._run(pool, job_id))
+
+    async def _run(self, pool: asyncpg.Pool, job_id: int):
+        async with pool.acquire() as owner:
+            if not await RecomputeRepository.own_job(owner, job_id):
+                print(f"⏭️ Recompute job {job_id} is owned by another worker")
+                return
+            await self._run_owned(pool, job_id)
+
+    async def _run_owned(self, pool: asyncpg.Pool, job_id: int):
+        # Acuan = isi bobot yang sudah ter-load; reload yang menghasilkan bobot sama (mis. setelah
+        # reconnect LISTEN) tidak me-restart job
+        await risk_weight_cache.ensure_loaded(pool)
+        weights_hash = risk_weight_cache.weights_hash
+        deadlocks = 0
+        try:
+            while True:
+                risk_maps = await risk_weight_cache.get_risk_maps(pool)
+                if risk_weight_cache.weights_hash != weights_hash:
+                    # Bobot berubah lagi: chunk yang sudah lewat memakai bobot lama
+                    weights_hash = risk_weight_cache.weights_hash
+                    await RecomputeRepository.restart_job(pool, job_id)
+
+                try:
+                    processed = await RecomputeRepository.process_chunk(
+                        pool, job_id, risk_maps, settings.RECOMPUTE_CHUNK_SIZE
+                    )
+                except asyncpg.DeadlockDetectedError:
+                    # Bentrok dengan writer lain (mis. hapus user yang tidak memakai advisory lock):
+                    # ulangi chunk dengan jeda naik, batas percobaan habis -> job FAILED
+                    deadlocks += 1
+                    if deadlocks > settings.RECOMPUTE_DEADLOCK_RETRIES:
+                        raise
+                    await asyncio.sleep(settings.RECOMPUTE_CHUNK_PAUSE_SECONDS * 2 ** deadlocks)
+                    continue
+                deadlocks = 0
+
+                if not processed:
+                    await RecomputeRepository.finish_job(pool, job_id, "COMPLETED")
+                    print(f"✅ Recompute job {job_id} completed")
+                    return
+                await asyncio.sleep(settings.RECOMPUTE_CHUNK_PAUSE_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Recompute job {job_id} failed: {e}")
+            await RecomputeRepository.finish_job(pool, job_id, "FAILED", str(e))
+
+
+recompute_runner = RecomputeRunner()
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable
+
+import asyncpg
+
+from app.core.config import settings
+from app.services.calculation import CompiledRules, RuleCompileError, compile_rules
+from app.services.notify_cache import NotifyCache
+
+# Channel NOTIFY dari trigger di sql/007_risk_rules.sql
+RISK_RULES_CHANNEL = "risk_rules_changed"
+
+
+class RiskRuleCache(NotifyCache):
+    """
+    Versi aturan penilaian (tabel risk_rule_*): id versi aktif di-load saat startup & di-reload
+    saat ada NOTIFY (lihat NotifyCache). Tiap versi dikompilasi sekali saat pertama dipakai
+    (CompiledRules) dan disimpan di LRU; versi yang pernah aktif read-only di DB, jadi hasil
+    kompilasi tidak perlu di-invalidate. Versi aktif tidak pernah di-evict.
+    """
+
+    channel = RISK_RULES_CHANNEL
+    name = "Risk rule cache"
+
+    def __init__(self, max_versions: int):
+        super().__init__()
+        self.max_versions = max_versions
+        self._compiled: "OrderedDict[int, CompiledRules]" = OrderedDict()
+        self._active: CompiledRules | None = None
+        self.compilations = 0
+
+    async def _load(self, pool: asyncpg.Pool):
+        version_id = await pool.fetchval("SELECT id FROM risk_rule_versions WHERE is_active")
+        if self._active is not None and self._active.version_id == version_id:
+            # NOTIFY dari versi lain (draft): versi aktif sudah read-only, tidak perlu kompilasi ulang
+            return
+        try:
+            if version_id is None:
+                raise RuleCompileError("No active risk rule version")
+            rules = await self.get(pool, version_id)
+        except RuleCompileError as e:
+            # Versi baru rusak: tetap pakai versi aktif sebelumnya daripada menolak semua submission
+            if self._active is None:
+                raise
+            print(f"❌ {self.name}: {e}; keeping version {self._active.version_id}")
+            return
+        self._active = rules
+
+    async def _compile(self, conn, version_id: int) -> CompiledRules:
+        matrix = await conn.fetch(
+            "SELECT inherent, kpmr, rating FROM risk_rule_matrix WHERE version_id = $1", version_id
+        )
+        labels = await conn.fetch(
+            "SELECT position, upper_bound, label FROM risk_rule_labels WHERE version_id = $1", version_id
+        )
+        rules = compile_rules(
+            version_id,
+            [(r['inherent'], r['kpmr'], r['rating']) for r in matrix],
+            [(r['position'], r['upper_bound'], r['label']) for r in labels],
+        )
+        self.compilations += 1
+        self._put(rules)
+        return rules
+
+    def _put(self, rules: CompiledRules):
+        self._compiled[rules.version_id] = rules
+        self._compiled.move_to_end(rules.version_id)
+        while len(self._compiled) > self.max_versions:
+            self._compiled.popitem(last=False)
+
+    async def active(self, pool: asyncpg.Pool) -> CompiledRules:
+        """Aturan untuk submission baru"""
+        await self.ensure_loaded(pool)
+        return self._active
+
+    async def get(self, conn, version_id: int) -> CompiledRules:
+        """Aturan versi tertentu (assessment lama); `conn` = pool atau koneksi transaksi berjalan"""
+        rules = self._compiled.get(version_id)
+        if rules is not None:
+            self._compiled.move_to_end(version_id)
+            return rules
+        if self._active is not None and self._active.version_id == version_id:
+            self._put(self._active)
+            return self._active
+        return await self._compile(conn, version_id)
+
+    async def get_many(self, conn, version_ids: Iterable[int]) -> Dict[int, CompiledRules]:
+        return {version_id: await self.get(conn, version_id) for version_id in set(version_ids)}
+
+    def stats(self) -> dict:
+        return {
+            "active_version": self._active.version_id if self._active else None,
+            "compiled_versions": list(self._compiled),
+            "max_versions": self.max_versions,
+            "compilations": self.compilations,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_risk_rule_cache() -> RiskRuleCache:
+    return RiskRuleCache(settings.RISK_RULE_CACHE_SIZE)
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import asyncpg
+
+from app.core import serialization
+from app.core.http_cache import make_etag
+from app.services.notify_cache import NotifyCache
+
+# Channel NOTIFY dari trigger di sql/001_risk_types_notify.sql
+RISK_TYPES_CHANNEL = "risk_types_changed"
+
+
+def weight_unit(unit_type: str) -> str:
+    """Unit type tabel bobot: 'UUS' atau selain itu -> 'LPEI'"""
+    return "UUS" if unit_type == "UUS" else "LPEI"
+
+
+@dataclass
+class RiskWeightTable:
+    """Bobot risiko untuk satu unit type"""
+    unit_type: str
+    # Format response /master/risk-types: {id, name, weight, is_uus|is_lpei}
+    rows: List[dict] = field(default_factory=list)
+    # Dipakai perhitungan: risk_id -> {'w': bobot float, 'name': nama}
+    risk_map: Dict[int, dict] = field(default_factory=dict)
+    # Body JSON `rows` yang sudah di-render + ETag-nya (conditional GET tanpa query DB)
+    body: bytes = b""
+    etag: str = ""
+
+    def render(self):
+        self.body = serialization.dumps(self.rows)
+        self.etag = make_etag(self.body)
+
+
+class RiskWeightCache(NotifyCache):
+    """
+    Cache in-process tabel risk_types per unit type (LPEI/UUS).
+    Di-load saat startup, di-reload otomatis saat ada NOTIFY dari Postgres (lihat NotifyCache).
+    `weights_hash` = hash isi bobot (sama di semua worker untuk bobot yang sama); berbeda dengan
+    `version`, tidak berubah bila reload (mis. setelah reconnect LISTEN) menghasilkan bobot yang sama.
+    """
+
+    channel = RISK_TYPES_CHANNEL
+    name = "Risk weight cache"
+
+    def __init__(self):
+        super().__init__()
+        self._tables: Dict[str, RiskWeightTable] = {}
+        self.weights_hash = ""
+
+    async def _load(self, pool: asyncpg.Pool):
+        """Ambil ulang semua risk_types (satu query untuk kedua unit type)"""
+        rows = await pool.fetch("""
+            SELECT id, name, weight_lpei, weight_uus, is_lpei, is_uus
+            FROM risk_types
+            ORDER BY id
+        """)
+
+        lpei = RiskWeightTable("LPEI")
+        uus = RiskWeightTable("UUS")
+        for r in rows:
+            if r['is_lpei']:
+                lpei.rows.append({"id": r['id'], "name": r['name'], "weight": r['weight_lpei'], "is_lpei": True})
+                lpei.risk_map[r['id']] = {'w': float(r['weight_lpei']), 'name': r['name']}
+            if r['is_uus']:
+                uus.rows.append({"id": r['id'], "name": r['name'], "weight": r['weight_uus'], "is_uus": True})
+                uus.risk_map[r['id']] = {'w': float(r['weight_uus']), 'name': r['name']}
+        lpei.render()
+        uus.render()
+
+        weights_hash = make_etag(serialization.dumps({
+            table.unit_type: [[risk_id, info['w']] for risk_id, info in table.risk_map.items()]
+            for table in (lpei, uus)
+        }))
+        # Swap sekaligus, pembaca tidak pernah melihat tabel setengah jadi
+        self._tables, self.weights_hash = {"LPEI": lpei, "UUS": uus}, weights_hash
+
+    async def get(self, pool: asyncpg.Pool, unit_type: str) -> RiskWeightTable:
+        """Tabel bobot untuk unit type ('UUS' atau selain itu -> 'LPEI')"""
+        await self.ensure_loaded(pool)
+        return self._tables[weight_unit(unit_type)]
+
+    async def get_risk_maps(self, pool: asyncpg.Pool) -> Dict[str, dict]:
+        """unit_type -> {risk_id: {'w', 'name'}} untuk semua unit type"""
+        await self.ensure_loaded(pool)
+        return {unit: table.risk_map for unit, table in self._tables.items()}
+
+
+risk_weight_cache = RiskWeightCache()
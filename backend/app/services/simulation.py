@@ -0,0 +1,138 @@
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.schemas.simulation import Distribution, SimulationRequest
+from app.services.calculation import SCALE, CompiledRules, RiskCalculationService
+
+# Simulasi besar jalan di process pool terpisah, event loop API tidak ikut sibuk
+@lru_cache(maxsize=1)
+def get_simulation_pool() -> BoundedExecutor:
+    return BoundedExecutor(
+        name="simulation",
+        workers=settings.SIMULATION_POOL_WORKERS,
+        max_queue=settings.SIMULATION_MAX_QUEUE,
+        queue_timeout=settings.SIMULATION_QUEUE_TIMEOUT_SECONDS,
+        kind="process",
+    )
+
+
+# Hasil per hash input (request + versi bobot + versi aturan)
+@lru_cache(maxsize=1)
+def get_simulation_cache() -> TTLCache:
+    return TTLCache(
+        max_size=settings.SIMULATION_CACHE_SIZE,
+        ttl_seconds=settings.SIMULATION_CACHE_TTL_SECONDS,
+    )
+
+PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 20
+
+
+def cache_key(request: SimulationRequest, weights_version: int, rule_version_id: int) -> str:
+    payload = json.dumps(
+        {"request": request.model_dump(mode="json"), "weights_version": weights_version, "rule_version_id": rule_version_id},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_spec(request: SimulationRequest, risk_map: dict, rules: CompiledRules, seed: int) -> dict:
+    """
+    Ubah request menjadi input murni (picklable) untuk run_simulation.
+    Risk type yang tidak ada di tabel bobot dilewati, sama seperti calculate.
+    """
+    overrides = {d.risk_type_id: d for d in request.distributions}
+    risks = []
+    for item in request.submission.details:
+        if item.risk_type_id not in risk_map:
+            continue
+        dist = overrides.get(item.risk_type_id)
+        fixed_inherent = Distribution(kind="fixed", low=item.inherent)
+        fixed_kpmr = Distribution(kind="fixed", low=item.kpmr)
+        risks.append({
+            "risk_type_id": item.risk_type_id,
+            "risk_name": risk_map[item.risk_type_id]['name'],
+            "weight": risk_map[item.risk_type_id]['w'],
+            "inherent": ((dist and dist.inherent) or fixed_inherent).model_dump(),
+            "kpmr": ((dist and dist.kpmr) or fixed_kpmr).model_dump(),
+        })
+    return {"n_scenarios": request.n_scenarios, "seed": seed, "risks": risks, "rules": rules}
+
+
+def _sample(rng: np.random.Generator, dist: dict, n: int) -> np.ndarray:
+    if dist["kind"] == "fixed" or dist["high"] == dist["low"]:
+        return np.full(n, dist["low"], dtype=np.float64)
+    if dist["kind"] == "uniform":
+        return rng.uniform(dist["low"], dist["high"], n)
+    return rng.triangular(dist["low"], dist["mode"], dist["high"], n)
+
+
+def run_simulation(spec: dict) -> dict:
+    """Jalan di process pool: semua skenario dihitung sekaligus via RiskCalculationService.calculate_batch"""
+    n = spec["n_scenarios"]
+    risks = spec["risks"]
+    k = len(risks)
+    rules = spec["rules"]
+    rng = np.random.default_rng(spec["seed"])
+
+    inherent = np.empty((n, k), dtype=np.float64)
+    kpmr = np.empty((n, k), dtype=np.int64)
+    for j, risk in enumerate(risks):
+        inherent[:, j] = _sample(rng, risk["inherent"], n)
+        kpmr[:, j] = np.clip(np.floor(_sample(rng, risk["kpmr"], n) + 0.5), 1, SCALE)
+    weight = np.broadcast_to(np.array([r["weight"] for r in risks], dtype=np.float64), (n, k))
+
+    rows = RiskCalculationService.calculate_batch(rules, inherent.ravel(), kpmr.ravel(), weight.ravel())
+    rating = rows["risk_rating"].reshape(n, k)
+    composite = rows["composite"].reshape(n, k)
+
+    # Jumlah berurutan per kolom = urutan penjumlahan di calculate (label di batas threshold identik)
+    total = np.zeros(n, dtype=np.float64)
+    for j in range(k):
+        total += composite[:, j]
+
+    labels, counts = np.unique(RiskCalculationService.get_final_labels(rules, total), return_counts=True)
+    hist_counts, bin_edges = np.histogram(total, bins=HISTOGRAM_BINS)
+
+    total_mean = total.mean()
+    total_var = total.var()
+    sensitivity = []
+    for j, risk in enumerate(risks):
+        col = composite[:, j]
+        cov = float(np.mean((col - col.mean()) * (total - total_mean)))
+        denom = float(col.std() * np.sqrt(total_var))
+        sensitivity.append({
+            "risk_type_id": risk["risk_type_id"],
+            "risk_name": risk["risk_name"],
+            "mean_rating": round(float(rating[:, j].mean()), 4),
+            "mean_composite": round(float(col.mean()), 4),
+            "correlation": round(cov / denom, 4) if denom > 0 else 0.0,
+            "variance_share": round(cov / total_var, 4) if total_var > 0 else 0.0,
+        })
+    sensitivity.sort(key=lambda s: s["variance_share"], reverse=True)
+
+    return {
+        "n_scenarios": n,
+        "seed": spec["seed"],
+        "mean": round(float(total_mean), 4),
+        "std": round(float(np.sqrt(total_var)), 4),
+        "min": round(float(total.min()), 4) if n else 0.0,
+        "max": round(float(total.max()), 4) if n else 0.0,
+        "percentiles": {
+            f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, np.percentile(total, PERCENTILES))
+        },
+        "histogram": {
+            "bin_edges": [round(float(e), 4) for e in bin_edges],
+            "counts": [int(c) for c in hist_counts],
+        },
+        "label_probabilities": {
+            str(label): round(int(count) / n, 6) for label, count in zip(labels, counts)
+        },
+        "sensitivity": sensitivity,
+    }
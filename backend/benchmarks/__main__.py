@@ -0,0 +1,97 @@
+"""
+Jalankan dari folder backend:
+
+    python -m benchmarks                          # FakePool in-memory, tanpa Postgres
+    python -m benchmarks --dsn postgresql://...   # Postgres lokal
+    python -m benchmarks --output before.json     # simpan untuk dibandingkan antar commit
+    python -m benchmarks --fast-json              # load test dengan FAST_JSON_RESPONSES=true
+
+Regression rencana query (EXPLAIN semua STATEMENTS di data sintetis): python -m benchmarks.plans
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+# Settings wajib ada walau tidak pakai DB sungguhan
+for key, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_NAME": "bench", "SECRET_KEY": "bench-secret"}.items():
+    os.environ.setdefault(key, value)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _load(args) -> dict:
+    import asyncpg
+    from app.repository.statements import PreparedConnection, prepare_statements
+    from benchmarks.load import make_fake_pool, run_load, seed_postgres
+
+    if args.dsn:
+        pool = await asyncpg.create_pool(
+            args.dsn, min_size=1, max_size=args.pool_size,
+            init=prepare_statements, connection_class=PreparedConnection,
+        )
+        await seed_postgres(pool)
+    else:
+        pool = make_fake_pool(latency=args.latency_ms / 1000)
+    try:
+        return await run_load(pool, args.requests, args.concurrency, args.scenario)
+    finally:
+        await pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Risk profile benchmark suite")
+    parser.add_argument("--dsn", help="Postgres DSN; default pakai FakePool in-memory")
+    parser.add_argument("--requests", type=int, default=500, help="request per skenario load")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="jeda per round-trip FakePool (simulasi jaringan)")
+    parser.add_argument("--scenario", action="append", help="hanya jalankan skenario ini (bisa diulang)")
+    parser.add_argument("--micro-n", type=int, default=100_000)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--fast-json", action="store_true", help="aktifkan FAST_JSON_RESPONSES saat load test")
+    parser.add_argument("--output", help="tulis JSON ke file (default stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "backend": "postgres" if args.dsn else "fake",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "fast_json": args.fast_json,
+        }
+    }
+    if not args.skip_micro:
+        from benchmarks.micro import run_micro, run_serialization
+        report["micro"] = run_micro(args.micro_n)
+        report["serialization"] = run_serialization()
+    if not args.skip_load:
+        from app.core.config import settings
+        settings.FAST_JSON_RESPONSES = args.fast_json
+        report["load"] = asyncio.run(_load(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Pengganti asyncpg.Pool in-memory untuk benchmark tanpa Postgres.
+
+Hanya mengimplementasikan method & statement SQL yang dipakai repository/endpoint
+(fetch, fetchrow, fetchval, execute, executemany, acquire, transaction, cursor,
+copy_records_to_table, warm_statement). Statement yang tidak dikenal langsung error, supaya
+benchmark tidak diam-diam mengukur hal yang salah setelah SQL di repo berubah.
+"""
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.services.calculation import CompiledRules, compile_rules
+
+# Aturan penilaian versi 1 (sama dengan seed sql/007_risk_rules.sql)
+SEED_RISK_MATRIX = [
+    [1, 1, 2, 2, 3],
+    [1, 2, 2, 3, 3],
+    [2, 2, 3, 3, 4],
+    [2, 3, 3, 4, 5],
+    [3, 4, 4, 5, 5],
+]
+SEED_RULE_LABELS = [
+    (1, Decimal("1.80"), "Rendah (1)"),
+    (2, Decimal("2.60"), "Sedang Rendah (2)"),
+    (3, Decimal("3.40"), "Sedang (3)"),
+    (4, Decimal("4.20"), "Sedang Tinggi (4)"),
+    (5, None, "Tinggi (5)"),
+]
+
+
+def seed_rules() -> CompiledRules:
+    """Versi 1 yang sudah dikompilasi (microbenchmark tanpa DB)"""
+    matrix = [(i + 1, k + 1, rating) for i, row in enumerate(SEED_RISK_MATRIX) for k, rating in enumerate(row)]
+    return compile_rules(1, matrix, SEED_RULE_LABELS)
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class FakeDatabase:
+    """Tabel in-memory + handler per bentuk statement SQL"""
+
+    def __init__(self):
+        self.users: Dict[int, dict] = {}
+        self.periods: Dict[int, dict] = {}
+        self.risk_types: Dict[int, dict] = {}
+        self.assessments: Dict[int, dict] = {}
+        self.assessment_details: Dict[Tuple[int, int], dict] = {}
+        # (user_id, period_id, unit_type) -> id, pengganti unique index
+        self.assessment_keys: Dict[Tuple[int, int, str], int] = {}
+        self._seq: Dict[str, int] = {}
+        # Tabel temp koneksi yang sedang menjalankan statement (lihat run)
+        self.temp: Dict[str, List[dict]] = {}
+
+        # (token yang harus ada di SQL, handler) -- dicek berurutan
+        self.handlers: List[Tuple[Tuple[str, ...], Callable]] = [
+            (("FROM risk_types",), self._select_risk_types),
+            (("FROM risk_rule_versions WHERE is_active",), self._active_rule_version),
+            (("FROM risk_rule_matrix",), self._select_rule_matrix),
+            (("FROM risk_rule_labels",), self._select_rule_labels),
+            (("FROM periods",), self._select_periods),
+            (("INSERT INTO users",), self._insert_user),
+            (("UPDATE users SET",), self._update_user),
+            (("DELETE FROM users",), self._delete_user),
+            (("FROM users WHERE email",), self._user_by_email),
+            (("FROM users WHERE id = $1",), self._user_by_id),
+            (("FROM users WHERE id > $1",), self._users_after),
+            (("pg_advisory_xact_lock",), self._advisory_lock),
+            (("FROM save_assessment(",), self._save_assessment),
+            (("CREATE TEMP TABLE bulk_assessments",), self._bulk_stage),
+            (("FROM bulk_assessments",), self._bulk_upsert),
+            (("SELECT id FROM assessments", "unnest", "FOR UPDATE"), self._assessment_ids_by_keys),
+            (("SELECT id FROM assessments WHERE user_id = $1", "FOR UPDATE"), self._assessment_ids_by_user),
+            (("INSERT INTO risk_type_stats",), self._apply_analytics),
+        ]
+
+    def next_id(self, table: str) -> int:
+        self._seq[table] = self._seq.get(table, 0) + 1
+        return self._seq[table]
+
+    # --- SEED ---
+
+    def seed(self, password_hash: str, n_users: int = 100, n_periods: int = 8):
+        now = datetime.now(timezone.utc)
+        roles = ["super_admin", "erm"] + ["user"] * max(0, n_users - 2)
+        for i, role in enumerate(roles[:n_users], start=1):
+            uid = self.next_id("users")
+            self.users[uid] = {
+                "id": uid, "email": f"bench{i}@example.com", "password": password_hash,
+                "full_name": f"Bench User {i}", "role": role, "created_at": now,
+            }
+        for i in range(n_periods):
+            pid = self.next_id("periods")
+            year, quarter = 2024 + i // 4, i % 4 + 1
+            self.periods[pid] = {
+                "id": pid, "name": f"Q{quarter} {year}", "year": year, "quarter": quarter,
+                "start_date": date(year, 3 * quarter - 2, 1), "end_date": date(year, 3 * quarter, 28),
+            }
+        weights = [
+            ("Risiko Kredit", "0.2500", "0.2000"), ("Risiko Pasar", "0.1000", "0.1000"),
+            ("Risiko Likuiditas", "0.1500", "0.2000"), ("Risiko Operasional", "0.1500", "0.1500"),
+            ("Risiko Hukum", "0.0500", "0.0500"), ("Risiko Stratejik", "0.1000", "0.1000"),
+            ("Risiko Kepatuhan", "0.1000", "0.1000"), ("Risiko Reputasi", "0.0500", "0.0500"),
+            ("Risiko Imbal Hasil", "0.0000", "0.0500"), ("Risiko Investasi", "0.0500", "0.0000"),
+        ]
+        for name, w_lpei, w_uus in weights:
+            rid = self.next_id("risk_types")
+            self.risk_types[rid] = {
+                "id": rid, "name": name,
+                "weight_lpei": Decimal(w_lpei), "weight_uus": Decimal(w_uus),
+                "is_lpei": w_lpei != "0.0000", "is_uus": w_uus != "0.0000",
+            }
+
+    # --- DISPATCH ---
+
+    def run(self, sql: str, args: tuple, temp: Dict[str, List[dict]] | None = None) -> Tuple[List[dict], str]:
+        norm = _normalize(sql)
+        self.temp = temp if temp is not None else {}
+        for tokens, handler in self.handlers:
+            if all(t in norm for t in tokens):
+                return handler(norm, *args)
+        raise NotImplementedError(f"FakePool does not understand: {norm}")
+
+    # --- HANDLERS: master data ---
+
+    def _select_risk_types(self, sql):
+        rows = [dict(r) for _, r in sorted(self.risk_types.items())]
+        return rows, f"SELECT {len(rows)}"
+
+    def _active_rule_version(self, sql):
+        return [{"id": 1}], "SELECT 1"
+
+    def _select_rule_matrix(self, sql, version_id):
+        rows = [
+            {"inherent": i + 1, "kpmr": k + 1, "rating": rating}
+            for i, row in enumerate(SEED_RISK_MATRIX) for k, rating in enumerate(row)
+        ] if version_id == 1 else []
+        return rows, f"SELECT {len(rows)}"
+
+    def _select_rule_labels(self, sql, version_id):
+        rows = [
+            {"position": position, "upper_bound": bound, "label": label}
+            for position, bound, label in SEED_RULE_LABELS
+        ] if version_id == 1 else []
+        return rows, f"SELECT {len(rows)}"
+
+    def _select_periods(self, sql):
+        rows = sorted(self.periods.values(), key=lambda p: (p["year"], p["quarter"]), reverse=True)
+        return [dict(r) for r in rows], f"SELECT {len(rows)}"
+
+    # --- HANDLERS: users ---
+
+    @staticmethod
+    def _public(user: dict, sql: str) -> dict:
+        if "SELECT *" in sql:
+            return dict(user)
+        return {k: user[k] for k in ("id", "email", "full_name", "role", "created_at")}
+
+    def _user_by_email(self, sql, email):
+        rows = [self._public(u, sql) for u in self.users.values() if u["email"] == email]
+        return rows, f"SELECT {len(rows)}"
+
+    def _user_by_id(self, sql, user_id):
+        user = self.users.get(user_id)
+        return ([self._public(user, sql)] if user else []), "SELECT"
+
+    def _users_after(self, sql, after_id, limit=None):
+        rows = [self._public(u, sql) for uid, u in sorted(self.users.items()) if uid > after_id]
+        rows = rows if limit is None else rows[:limit]
+        return rows, f"SELECT {len(rows)}"
+
+    def _insert_user(self, sql, email, password, full_name, role):
+        if any(u["email"] == email for u in self.users.values()):
+            import asyncpg
+            raise asyncpg.UniqueViolationError("duplicate key value violates unique constraint")
+        uid = self.next_id("users")
+        self.users[uid] = {
+            "id": uid, "email": email, "password": password, "full_name": full_name,
+            "role": getattr(role, "value", role), "created_at": datetime.now(timezone.utc),
+        }
+        return [self._public(self.users[uid], sql)], "INSERT 0 1"
+
+    def _update_user(self, sql, user_id, full_name, email, role):
+        user = self.users.get(user_id)
+        if user is None:
+            return [], "UPDATE 0"
+        # COALESCE($n, kolom): None = tidak diubah
+        for column, value in (("full_name", full_name), ("email", email), ("role", role)):
+            if value is not None:
+                user[column] = getattr(value, "value", value)
+        return [self._public(user, sql)], "UPDATE 1"
+
+    def _delete_user(self, sql, user_id):
+        if self.users.pop(user_id, None) is None:
+            return [], "DELETE 0"
+        return [{"id": user_id}], "DELETE 1"
+
+    # --- HANDLERS: assessments ---
+
+    def _advisory_lock(self, sql, *args):
+        # In-memory & single-thread: tidak ada yang perlu diserialisasi
+        return [{"pg_advisory_xact_lock": None}], "SELECT 1"
+
+    def _find_assessment(self, user_id, period_id, unit_type):
+        aid = self.assessment_keys.get((user_id, period_id, unit_type))
+        return self.assessments.get(aid)
+
+    def _add_assessment(self, row: dict):
+        self.assessments[row["id"]] = row
+        self.assessment_keys[(row["user_id"], row["period_id"], row["unit_type"])] = row["id"]
+
+    def _save_assessment(self, sql, user_id, period_id, unit_type, total, label,
+                         risk_ids, inherent, inherent_round, kpmr, rating, composite, snapshot, rule_version_id, weight):
+        # save_assessment (sql/011): upsert header -> upsert detail yang berubah -> hapus detail yang hilang
+        existing = self._find_assessment(user_id, period_id, unit_type)
+        if existing:
+            existing.update(
+                total_composite_score=total, final_rating_label=label, status="SUBMITTED",
+                result_snapshot=snapshot, rule_version_id=rule_version_id,
+            )
+            aid, is_new = existing["id"], False
+        else:
+            aid, is_new = self.next_id("assessments"), True
+            self._add_assessment({
+                "id": aid, "user_id": user_id, "period_id": period_id, "unit_type": unit_type,
+                "total_composite_score": total, "final_rating_label": label, "status": "SUBMITTED",
+                "result_snapshot": snapshot, "rule_version_id": rule_version_id,
+            })
+
+        changed = []
+        for row in zip(risk_ids, inherent, inherent_round, kpmr, rating, composite, weight):
+            values = dict(zip(
+                ("risk_type_id", "inherent_original", "inherent_rounded", "kpmr_score", "risk_rating", "composite_score", "weight"), row
+            ))
+            key = (aid, row[0])
+            if self.assessment_details.get(key) != values:
+                self.assessment_details[key] = values
+                changed.append(row[0])
+
+        keep = set(risk_ids)
+        removed = sorted(k for k in self.assessment_details if k[0] == aid and k[1] not in keep)
+        for k in removed:
+            del self.assessment_details[k]
+
+        return [{
+            "id": aid, "is_new": is_new,
+            "changed_ids": changed, "removed_ids": [k[1] for k in removed],
+        }], "SELECT 1"
+
+    def _bulk_stage(self, sql):
+        # Tabel temp per koneksi, kosong lagi tiap transaksi (ON COMMIT DROP)
+        self.temp["bulk_assessments"], self.temp["bulk_details"] = [], []
+        return [], "CREATE TABLE"
+
+    def _bulk_upsert(self, sql, user_id):
+        # bulk.upsert: per submission sama dengan save_assessment (upsert header, diff detail)
+        details: Dict[int, List[dict]] = {}
+        for d in self.temp["bulk_details"]:
+            details.setdefault(d["ord"], []).append(d)
+        rows = []
+        for h in sorted(self.temp["bulk_assessments"], key=lambda h: h["ord"]):
+            items = details.get(h["ord"], [])
+            saved = self._save_assessment(
+                sql, user_id, h["period_id"], h["unit_type"], h["total_composite_score"], h["final_rating_label"],
+                *([d[c] for d in items] for c in ("risk_type_id", "inherent_original", "inherent_rounded",
+                                                   "kpmr_score", "risk_rating", "composite_score")),
+                h["result_snapshot"], h["rule_version_id"], [d["weight"] for d in items]
+            )[0][0]
+            rows.append({"id": saved["id"], "pg_notify": None})
+        return rows, f"SELECT {len(rows)}"
+
+    def _assessment_ids_by_keys(self, sql, user_id, period_ids, unit_types):
+        ids = [self.assessment_keys[(user_id, *key)] for key in zip(period_ids, unit_types)
+               if (user_id, *key) in self.assessment_keys]
+        return [{"id": aid} for aid in sorted(set(ids))], f"SELECT {len(set(ids))}"
+
+    def _assessment_ids_by_user(self, sql, user_id):
+        ids = sorted(aid for (uid, _, _), aid in self.assessment_keys.items() if uid == user_id)
+        return [{"id": aid} for aid in ids], f"SELECT {len(ids)}"
+
+    def _apply_analytics(self, sql, ids, sign):
+        # Agregat analytics tidak disimulasikan
+        return [], "INSERT 0 0"
+
+    def copy(self, table: str, columns: List[str], records, temp: Dict[str, List[dict]]) -> str:
+        if table not in temp:
+            raise NotImplementedError(f"FakePool cannot COPY into {table}")
+        rows = [dict(zip(columns, record)) for record in records]
+        temp[table].extend(rows)
+        return f"COPY {len(rows)}"
+
+
+class FakeTransaction:
+    """BEGIN & COMMIT/ROLLBACK masing-masing 1 round-trip, seperti asyncpg"""
+
+    def __init__(self, latency: float = 0.0):
+        self._latency = latency
+
+    async def __aenter__(self):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return False
+
+
+class FakeConnection:
+    """Meniru asyncpg.Connection; `latency` = jeda per round-trip (simulasi jaringan)"""
+
+    def __init__(self, db: FakeDatabase, latency: float = 0.0):
+        self._db = db
+        self._latency = latency
+        self._temp: Dict[str, List[dict]] = {}
+
+    async def warm_statement(self, name: str, sql: str):
+        # Seperti PreparedConnection: 1 round-trip parse per statement
+        # (SQL yang tidak dikenal baru error saat dieksekusi)
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+    async def _roundtrip(self, sql: str, args: tuple) -> Tuple[List[dict], str]:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        else:
+            await asyncio.sleep(0)
+        return self._db.run(sql, args, self._temp)
+
+    async def fetch(self, sql: str, *args, timeout=None) -> List[dict]:
+        return (await self._roundtrip(sql, args))[0]
+
+    async def fetchrow(self, sql: str, *args, timeout=None) -> dict | None:
+        rows = (await self._roundtrip(sql, args))[0]
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql: str, *args, column: int = 0, timeout=None) -> Any:
+        row = await self.fetchrow(sql, *args)
+        return list(row.values())[column] if row else None
+
+    async def execute(self, sql: str, *args, timeout=None) -> str:
+        return (await self._roundtrip(sql, args))[1]
+
+    async def executemany(self, sql: str, args, timeout=None):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        for a in args:
+            self._db.run(sql, tuple(a), self._temp)
+
+    async def copy_records_to_table(self, table_name, *, records, columns=None, schema_name=None, timeout=None, where=None):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self._db.copy(table_name, columns, records, self._temp)
+
+    def transaction(self, **kwargs) -> FakeTransaction:
+        return FakeTransaction(self._latency)
+
+    async def cursor(self, sql: str, *args, prefetch=None, timeout=None):
+        for row in (await self._roundtrip(sql, args))[0]:
+            yield row
+
+
+class FakePool:
+    """Meniru asyncpg.Pool di atas satu FakeDatabase bersama"""
+
+    def __init__(self, db: FakeDatabase | None = None, latency: float = 0.0, max_size: int = 10, init=None):
+        self.db = db or FakeDatabase()
+        self._latency = latency
+        self._slots = asyncio.Semaphore(max_size)
+        self._init = init
+        self._idle: List[FakeConnection] = []
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        async with self._slots:
+            # Koneksi dipakai ulang seperti pool sungguhan; `init` hanya untuk koneksi baru
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                conn = FakeConnection(self.db, self._latency)
+                if self._init is not None:
+                    await self._init(conn)
+            try:
+                yield conn
+            finally:
+                self._idle.append(conn)
+
+    async def fetch(self, sql: str, *args, timeout=None):
+        async with self.acquire() as conn:
+            return await conn.fetch(sql, *args)
+
+    async def fetchrow(self, sql: str, *args, timeout=None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(sql, *args)
+
+    async def fetchval(self, sql: str, *args, column: int = 0, timeout=None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(sql, *args, column=column)
+
+    async def execute(self, sql: str, *args, timeout=None):
+        async with self.acquire() as conn:
+            return await conn.execute(sql, *args)
+
+    async def executemany(self, sql: str, args, timeout=None):
+        async with self.acquire() as conn:
+            return await conn.executemany(sql, args)
+
+    async def close(self):
+        pass
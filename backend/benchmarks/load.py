@@ -0,0 +1,172 @@
+"""
+Load test end-to-end: request HTTP ke app ASGI in-process lewat httpx (tanpa uvicorn).
+Database: FakePool in-memory (default) atau Postgres lokal (--dsn).
+"""
+import asyncio
+import random
+import time
+from typing import Callable, Dict
+
+import httpx
+
+from app.core.admission import get_calculate_admission
+from app.core.cache import get_principal_cache
+from app.core.db import get_db, get_read_db
+from app.core.security import create_access_token, get_password_hash
+from app.main import create_app
+from app.repository.statements import prepare_statements
+from app.services.periods import period_cache
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import risk_weight_cache
+from benchmarks.fake_pool import FakeDatabase, FakePool
+
+BENCH_EMAIL = "bench1@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+def make_fake_pool(latency: float = 0.0) -> FakePool:
+    db = FakeDatabase()
+    db.seed(get_password_hash(BENCH_PASSWORD))
+    return FakePool(db, latency=latency, init=prepare_statements)
+
+
+async def seed_postgres(pool):
+    """Data minimal untuk benchmark di Postgres lokal (idempotent)"""
+    await pool.execute("""
+        INSERT INTO users (email, password, full_name, role)
+        VALUES ($1, $2, 'Bench User 1', 'super_admin')
+        ON CONFLICT (email) DO NOTHING
+    """, BENCH_EMAIL, get_password_hash(BENCH_PASSWORD))
+    if not await pool.fetchval("SELECT count(*) FROM periods"):
+        await pool.execute("""
+            INSERT INTO periods (name, year, quarter, start_date, end_date)
+            SELECT 'Q' || q || ' ' || y, y, q, make_date(y, 3 * q - 2, 1), make_date(y, 3 * q, 28)
+            FROM generate_series(2024, 2025) y, generate_series(1, 4) q
+        """)
+    if not await pool.fetchval("SELECT count(*) FROM risk_types"):
+        await pool.execute("""
+            INSERT INTO risk_types (name, weight_lpei, weight_uus, is_lpei, is_uus)
+            SELECT 'Risiko ' || i, 0.1, 0.1, TRUE, TRUE FROM generate_series(1, 10) i
+        """)
+
+
+def _percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+async def _run_scenario(client: httpx.AsyncClient, make_request: Callable, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        # CPU proses (app + client httpx in-process) per request
+        "cpu_ms_per_request": round(cpu / requests * 1000, 3),
+    }
+
+
+def build_scenarios(risk_ids: Dict[str, list], period_ids: list) -> Dict[str, Callable]:
+    rng = random.Random(7)
+
+    def calculate(client, i):
+        unit_type = "LPEI" if i % 2 else "UUS"
+        return client.post("/assessment/calculate", json={
+            "period_id": period_ids[i % len(period_ids)],
+            "unit_type": unit_type,
+            "details": [
+                {"risk_type_id": rid, "inherent": round(rng.uniform(1, 5), 2), "kpmr": rng.randint(1, 5)}
+                for rid in risk_ids[unit_type]
+            ],
+        })
+
+    return {
+        "auth_me": lambda client, i: client.get("/auth/me"),
+        "master_risk_types": lambda client, i: client.get(
+            "/master/risk-types", params={"unit_type": "LPEI" if i % 2 else "UUS"}
+        ),
+        "master_periods": lambda client, i: client.get("/master/periods"),
+        # Revalidasi browser: ETag masih sama -> 304 tanpa body
+        "master_periods_304": lambda client, i: client.get(
+            "/master/periods", headers={"If-None-Match": period_cache.etag}
+        ),
+        "users_page": lambda client, i: client.get("/users/", params={"limit": 100}),
+        "assessment_calculate": calculate,
+        "auth_token": lambda client, i: client.post(
+            "/auth/token", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD}
+        ),
+    }
+
+
+# Argon2 sengaja mahal: jumlah request /auth/token dibagi faktor ini
+SLOW_SCENARIOS = {"auth_token": 20}
+
+
+async def run_load(pool, requests: int = 500, concurrency: int = 10, scenarios=None) -> dict:
+    async def override_get_db():
+        return pool
+
+    # App baru per run (tanpa lifespan): pool & cache disiapkan di bawah
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    get_principal_cache().clear()
+    # Semua request memakai 1 user benchmark: batas per user dilonggarkan selama load test
+    per_user_limit = get_calculate_admission().per_user
+    get_calculate_admission().per_user = concurrency
+    await risk_weight_cache.load(pool)
+    await get_risk_rule_cache().load(pool)
+    await period_cache.load(pool)
+
+    risk_maps = await risk_weight_cache.get_risk_maps(pool)
+    risk_ids = {unit: sorted(risk_map) for unit, risk_map in risk_maps.items()}
+    period_ids = [p["id"] for p in period_cache.rows]
+
+    token = create_access_token(data={"sub": BENCH_EMAIL})
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=60,
+        ) as client:
+            for name, make_request in build_scenarios(risk_ids, period_ids).items():
+                if scenarios and name not in scenarios:
+                    continue
+                n = max(concurrency, requests // SLOW_SCENARIOS.get(name, 1))
+                # Warm-up (cache, statement, JIT import) tidak ikut diukur
+                await _run_scenario(client, make_request, concurrency, concurrency)
+                results[name] = await _run_scenario(client, make_request, n, concurrency)
+    finally:
+        get_calculate_admission().per_user = per_user_limit
+    return results
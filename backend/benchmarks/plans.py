@@ -0,0 +1,220 @@
+"""
+Regression test rencana query: EXPLAIN setiap statement di STATEMENTS (generic plan, sama seperti
+prepared statement repository setelah beberapa eksekusi) terhadap Postgres lokal berisi data
+sintetis skala produksi. Exit 1 jika ada Seq Scan di tabel besar atau cost melewati budget.
+Jalankan dari folder backend, HANYA ke database scratch (--seed menulis data sintetis):
+
+    python -m benchmarks.plans --dsn postgresql://.../scratch --seed    # migrasi + seed, lalu cek
+    python -m benchmarks.plans --dsn postgresql://.../scratch           # cek saja (data sudah ada)
+    python -m benchmarks.plans --dsn ... --output plans.json            # laporan JSON
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List
+
+import asyncpg
+
+from app.core import migrations
+from app.repository.statements import BULK_STATEMENTS, STATEMENTS
+
+# Master data / agregat (ukuran ~ periode x unit x label/risk type) / tabel kecil:
+# Seq Scan memang rencana termurah
+SMALL_TABLES = {
+    "periods", "risk_types", "risk_rule_versions", "risk_rule_matrix", "risk_rule_labels",
+    "assessment_label_stats", "risk_type_stats", "recompute_jobs", "schema_migrations",
+}
+
+# Full scan yang memang disengaja per statement: {statement: {tabel: alasan}}
+FULL_SCAN_ALLOWED = {
+    "user.stream_all": {"users": "streams every user (CSV/NDJSON export)"},
+    "assessment.export": {"users": "every user has an assessment in the exported period; hashed once"},
+    "recompute.create_job": {"assessments": "counts all assessments once per recompute job"},
+    "recompute.restart_job": {"assessments": "counts all assessments once per restart"},
+    "bulk.upsert": {
+        "bulk_assessments": "temp table holding one import batch",
+        "bulk_details": "temp table holding one import batch",
+    },
+}
+
+# Batas total cost planner per statement (default DEFAULT_COST_BUDGET)
+DEFAULT_COST_BUDGET = 1_000.0
+COST_BUDGETS = {
+    "user.stream_all": None,
+    "recompute.create_job": None,
+    "recompute.restart_job": None,
+    # 1 periode penuh (semua assessment + detail periode itu), dibaca lewat cursor
+    "assessment.export": 50_000.0,
+}
+
+# Skala default data sintetis: 10 tahun kuartal x 5k user = 200k assessment, 2 juta detail
+SEED_USERS = 5_000
+SEED_PERIODS = 40
+SEED_RISK_TYPES = 10
+
+
+async def seed_synthetic(conn: asyncpg.Connection, users: int, periods: int, risk_types: int):
+    """
+    Idempotent: hanya menambah yang kurang, lalu rebuild agregat & ANALYZE. Urutan insert meniru
+    produksi (assessment per periode, detail ditulis bersama assessment-nya) supaya korelasi fisik
+    yang dipakai planner realistis.
+    """
+    await conn.execute("""
+        INSERT INTO periods (name, year, quarter, start_date, end_date)
+        SELECT 'Q' || q || ' ' || y, y, q, make_date(y, 3 * q - 2, 1), make_date(y, 3 * q, 28)
+        FROM generate_series(0, $1 - 1 - (SELECT count(*)::int FROM periods)) i
+        CROSS JOIN LATERAL (SELECT 2000 + i / 4 AS y, i % 4 + 1 AS q) t
+    """, periods)
+    await conn.execute("""
+        INSERT INTO risk_types (name, weight_lpei, weight_uus, is_lpei, is_uus)
+        SELECT 'Synthetic risk ' || i, 0.1, 0.1, TRUE, TRUE
+        FROM generate_series(1, $1 - (SELECT count(*)::int FROM risk_types)) i
+    """, risk_types)
+    await conn.execute("""
+        INSERT INTO users (email, password, full_name, role)
+        SELECT 'synthetic' || i || '@example.com', 'x', 'Synthetic User ' || i, 'user'
+        FROM generate_series(1, $1) i
+        ON CONFLICT (email) DO NOTHING
+    """, users)
+    await conn.execute("""
+        INSERT INTO assessments
+            (user_id, period_id, unit_type, total_composite_score, final_rating_label, status, result_snapshot, rule_version_id)
+        SELECT u.id, p.id, CASE WHEN u.id % 5 = 0 THEN 'UUS' ELSE 'LPEI' END,
+               s.score, l.label, 'SUBMITTED', '[]', 1
+        FROM users u
+        CROSS JOIN periods p
+        CROSS JOIN LATERAL (SELECT round((1 + random() * 4)::numeric, 2) AS score) s
+        CROSS JOIN LATERAL (
+            SELECT label FROM risk_rule_labels
+            WHERE version_id = 1 AND (upper_bound IS NULL OR s.score <= upper_bound)
+            ORDER BY position LIMIT 1
+        ) l
+        WHERE u.email LIKE 'synthetic%@example.com'
+        ORDER BY p.id, u.id
+        ON CONFLICT (user_id, period_id, unit_type) DO NOTHING
+    """)
+    await conn.execute("""
+        INSERT INTO assessment_details
+            (assessment_id, risk_type_id, inherent_original, inherent_rounded, kpmr_score, risk_rating, composite_score, weight)
+        SELECT a.id, rt.id, 3, 3, 3, 3, 0.3, 0.1
+        FROM assessments a
+        JOIN users u ON u.id = a.user_id AND u.email LIKE 'synthetic%@example.com'
+        CROSS JOIN risk_types rt
+        ORDER BY a.id, rt.id
+        ON CONFLICT (assessment_id, risk_type_id) DO NOTHING
+    """)
+    await conn.execute("SELECT rebuild_assessment_stats()")
+    await conn.execute("ANALYZE")
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+async def explain(conn: asyncpg.Connection, sql: str) -> dict:
+    """Generic plan (parameter tidak diketahui) lewat PREPARE + EXPLAIN EXECUTE; tidak dieksekusi"""
+    n_params = len((await conn.prepare(sql)).get_parameters())
+    async with conn.transaction():
+        await conn.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+        await conn.execute(f"PREPARE plan_check AS {sql}")
+        try:
+            args = ", ".join(["NULL"] * n_params)
+            plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) EXECUTE plan_check{f'({args})' if n_params else ''}")
+        finally:
+            await conn.execute("DEALLOCATE plan_check")
+    return json.loads(plan)[0]["Plan"]
+
+
+def check(name: str, plan: dict) -> dict:
+    seq_scans = sorted({
+        node["Relation Name"] for node in _walk(plan)
+        if node["Node Type"].endswith("Seq Scan") and "Relation Name" in node
+    })
+    cost = plan["Total Cost"]
+    budget = COST_BUDGETS.get(name, DEFAULT_COST_BUDGET)
+    allowed = FULL_SCAN_ALLOWED.get(name, {})
+    problems = [
+        f"seq scan on {table}" for table in seq_scans
+        if table not in SMALL_TABLES and table not in allowed
+    ]
+    if budget is not None and cost > budget:
+        problems.append(f"cost {cost:.0f} > budget {budget:.0f}")
+    return {
+        "statement": name,
+        "cost": cost,
+        "budget": budget,
+        "seq_scans": seq_scans,
+        "allowed_full_scans": {table: allowed[table] for table in seq_scans if table in allowed},
+        "problems": problems,
+    }
+
+
+async def _check_all(conn: asyncpg.Connection, statements: Dict[str, str]) -> List[dict]:
+    results = []
+    for name, sql in statements.items():
+        try:
+            results.append(check(name, await explain(conn, sql)))
+        except asyncpg.PostgresError as e:
+            results.append({"statement": name, "problems": [f"EXPLAIN failed: {e}"]})
+    return results
+
+
+async def run_plans(conn: asyncpg.Connection) -> List[dict]:
+    results = await _check_all(conn, STATEMENTS)
+    # Statement bulk import butuh tabel temp-nya (kosong) di transaksi yang sama
+    async with conn.transaction():
+        await conn.execute(BULK_STATEMENTS["bulk.stage"])
+        results += await _check_all(conn, {name: sql for name, sql in BULK_STATEMENTS.items() if name != "bulk.stage"})
+    return results
+
+
+async def _main(args) -> int:
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        if args.seed:
+            await migrations.migrate(conn)
+            start = time.perf_counter()
+            await seed_synthetic(conn, args.users, args.periods, args.risk_types)
+            print(f"🌱 Seeded synthetic data in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        sizes: Dict[str, int] = {
+            r['relname']: r['reltuples'] for r in await conn.fetch("""
+                SELECT relname, reltuples::bigint AS reltuples FROM pg_class
+                WHERE relname IN ('users', 'assessments', 'assessment_details')
+            """)
+        }
+        results = await run_plans(conn)
+    finally:
+        await conn.close()
+
+    failed = [r for r in results if r["problems"]]
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"table_rows": sizes, "statements": results}, f, indent=2)
+    for r in results:
+        mark = "❌" if r["problems"] else "✅"
+        cost = f"{r['cost']:>12.1f}" if "cost" in r else " " * 12
+        note = "; ".join(r["problems"]) or "; ".join(
+            f"full scan {table}: {reason}" for table, reason in r.get("allowed_full_scans", {}).items()
+        )
+        print(f"{mark} {r['statement']:<32} {cost}  {note}")
+    print(f"{len(results) - len(failed)}/{len(results)} statements within plan budget (rows: {sizes})")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.plans", description="Query plan regression check")
+    parser.add_argument("--dsn", required=True, help="Postgres DSN database scratch")
+    parser.add_argument("--seed", action="store_true", help="jalankan migrasi & isi data sintetis dulu")
+    parser.add_argument("--users", type=int, default=SEED_USERS)
+    parser.add_argument("--periods", type=int, default=SEED_PERIODS)
+    parser.add_argument("--risk-types", type=int, default=SEED_RISK_TYPES)
+    parser.add_argument("--output", help="tulis laporan JSON ke file")
+    sys.exit(asyncio.run(_main(parser.parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
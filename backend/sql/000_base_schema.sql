@@ -0,0 +1,52 @@
+-- Skema dasar (tabel yang dipakai app sebelum migrasi 001). IF NOT EXISTS: database lama yang
+-- dibuat manual tidak berubah, database baru mendapat skema lengkap lewat runner migrasi
+-- (python -m app.core.migrations).
+
+CREATE TABLE IF NOT EXISTS users (
+    id          SERIAL PRIMARY KEY,
+    email       VARCHAR(255) NOT NULL UNIQUE, -- lookup principal di setiap request terautentikasi
+    password    VARCHAR(255) NOT NULL,
+    full_name   VARCHAR(255),
+    role        VARCHAR(20) NOT NULL DEFAULT 'user', -- super_admin / erm / user
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS periods (
+    id          SERIAL PRIMARY KEY,
+    name        VARCHAR(100) NOT NULL,
+    year        INTEGER NOT NULL,
+    quarter     INTEGER NOT NULL,
+    start_date  DATE,
+    end_date    DATE
+);
+
+CREATE TABLE IF NOT EXISTS risk_types (
+    id           SERIAL PRIMARY KEY,
+    name         VARCHAR(255) NOT NULL,
+    weight_lpei  NUMERIC(5, 4) NOT NULL DEFAULT 0,
+    weight_uus   NUMERIC(5, 4) NOT NULL DEFAULT 0,
+    is_lpei      BOOLEAN NOT NULL DEFAULT TRUE,
+    is_uus       BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS assessments (
+    id                     SERIAL PRIMARY KEY,
+    user_id                INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    period_id              INTEGER NOT NULL REFERENCES periods(id),
+    unit_type              VARCHAR(10) NOT NULL, -- LPEI / UUS
+    total_composite_score  NUMERIC(10, 2),
+    final_rating_label     VARCHAR(50),
+    status                 VARCHAR(20) NOT NULL DEFAULT 'DRAFT',
+    created_at             TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS assessment_details (
+    id                 SERIAL PRIMARY KEY,
+    assessment_id      INTEGER NOT NULL REFERENCES assessments(id) ON DELETE CASCADE,
+    risk_type_id       INTEGER NOT NULL REFERENCES risk_types(id),
+    inherent_original  NUMERIC(5, 2),
+    inherent_rounded   INTEGER,
+    kpmr_score         INTEGER,
+    risk_rating        INTEGER,
+    composite_score    NUMERIC(10, 4)
+);
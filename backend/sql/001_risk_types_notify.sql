@@ -0,0 +1,14 @@
+-- Invalidation cache bobot risiko (app/services/risk_weights.py)
+-- Setiap perubahan risk_types mengirim NOTIFY ke semua worker yang LISTEN.
+
+CREATE OR REPLACE FUNCTION notify_risk_types_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('risk_types_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS risk_types_changed ON risk_types;
+CREATE TRIGGER risk_types_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON risk_types
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_risk_types_changed();
@@ -0,0 +1,22 @@
+-- Kunci unik untuk upsert assessment (AssessmentRepository.calculate)
+-- 1 assessment per (user, period, unit_type) dan 1 detail per (assessment, risk_type)
+
+-- Bersihkan duplikat lama (sisa race DELETE+INSERT), simpan yang terbaru
+DELETE FROM assessments a
+USING assessments b
+WHERE a.user_id = b.user_id
+  AND a.period_id = b.period_id
+  AND a.unit_type = b.unit_type
+  AND a.id < b.id;
+
+DELETE FROM assessment_details a
+USING assessment_details b
+WHERE a.assessment_id = b.assessment_id
+  AND a.risk_type_id = b.risk_type_id
+  AND a.id < b.id;
+
+ALTER TABLE assessments
+    ADD CONSTRAINT assessments_user_period_unit_key UNIQUE (user_id, period_id, unit_type);
+
+ALTER TABLE assessment_details
+    ADD CONSTRAINT assessment_details_assessment_risk_key UNIQUE (assessment_id, risk_type_id);
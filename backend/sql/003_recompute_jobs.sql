@@ -0,0 +1,22 @@
+-- Job hitung ulang skor assessment setelah bobot risk_types berubah (app/services/recompute.py)
+-- Checkpoint (last_assessment_id) di-update dalam transaksi yang sama dengan chunk-nya,
+-- jadi setelah crash job dilanjutkan tepat setelah chunk terakhir yang sudah commit.
+
+CREATE TABLE IF NOT EXISTS recompute_jobs (
+    id                     SERIAL PRIMARY KEY,
+    status                 VARCHAR(20) NOT NULL DEFAULT 'RUNNING', -- RUNNING / COMPLETED / FAILED
+    started_by             INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    total_assessments      INTEGER NOT NULL DEFAULT 0,
+    processed_assessments  INTEGER NOT NULL DEFAULT 0,
+    changed_assessments    INTEGER NOT NULL DEFAULT 0,
+    changed_details        INTEGER NOT NULL DEFAULT 0,
+    last_assessment_id     INTEGER NOT NULL DEFAULT 0,
+    error                  TEXT,
+    created_at             TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at             TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at            TIMESTAMPTZ
+);
+
+-- Maksimal 1 job berjalan
+CREATE UNIQUE INDEX IF NOT EXISTS recompute_jobs_one_running
+    ON recompute_jobs ((true)) WHERE status = 'RUNNING';
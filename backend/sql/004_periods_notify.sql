@@ -0,0 +1,14 @@
+-- Invalidation cache periode (app/services/periods.py)
+-- Setiap perubahan periods mengirim NOTIFY ke semua worker yang LISTEN.
+
+CREATE OR REPLACE FUNCTION notify_periods_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('periods_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS periods_changed ON periods;
+CREATE TRIGGER periods_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON periods
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_periods_changed();
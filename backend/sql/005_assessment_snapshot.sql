@@ -0,0 +1,33 @@
+-- Snapshot hasil (table_data response /assessment/calculate) per assessment untuk
+-- GET /assessment/{id} & /assessment/history: dibaca tanpa join detail / risk_types.
+-- Ditulis di statement yang sama dengan detailnya (calculate, bulk import, recompute).
+
+ALTER TABLE assessments ADD COLUMN IF NOT EXISTS result_snapshot JSONB;
+
+-- Riwayat per user (keyset id DESC)
+CREATE INDEX IF NOT EXISTS assessments_user_history ON assessments (user_id, id);
+
+-- Isi snapshot assessment lama dari detail yang tersimpan (bobot = bobot saat ini)
+UPDATE assessments a SET result_snapshot = s.table_data
+FROM (
+    SELECT d.assessment_id,
+           jsonb_agg(jsonb_build_object(
+               'risk_name', rt.name,
+               'weight_percent', to_char(w.weight * 100, 'FM990.00') || '%',
+               'inherent_origin', d.inherent_original::float8,
+               'inherent_round', d.inherent_rounded,
+               'kpmr', d.kpmr_score,
+               'risk_rating', d.risk_rating,
+               'composite', round(d.composite_score, 2)::float8
+           ) ORDER BY d.id) AS table_data
+    FROM assessment_details d
+    JOIN assessments x ON x.id = d.assessment_id
+    JOIN risk_types rt ON rt.id = d.risk_type_id
+    CROSS JOIN LATERAL (
+        SELECT CASE WHEN x.unit_type = 'UUS' THEN rt.weight_uus ELSE rt.weight_lpei END AS weight
+    ) w
+    GROUP BY d.assessment_id
+) s
+WHERE a.id = s.assessment_id AND a.result_snapshot IS NULL;
+
+UPDATE assessments SET result_snapshot = '[]' WHERE result_snapshot IS NULL;
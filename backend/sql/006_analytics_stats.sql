@@ -0,0 +1,49 @@
+-- Agregat analytics (app/api/analytics.py) yang di-update per submission, bukan di-scan ulang:
+--   assessment_label_stats: jumlah assessment & total skor per (periode, unit, label akhir)
+--   risk_type_stats       : jumlah detail, total rating & composite per (periode, unit, risk type)
+-- Delta ditulis di transaksi yang sama dengan assessment-nya (calculate, bulk import, recompute,
+-- hapus user). rebuild_assessment_stats() menghitung ulang semuanya dari tabel sumber.
+
+CREATE TABLE IF NOT EXISTS assessment_label_stats (
+    period_id           INTEGER NOT NULL,
+    unit_type           VARCHAR(10) NOT NULL,
+    final_rating_label  VARCHAR(50) NOT NULL,
+    assessments         INTEGER NOT NULL DEFAULT 0,
+    total_score         NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (period_id, unit_type, final_rating_label)
+);
+
+CREATE TABLE IF NOT EXISTS risk_type_stats (
+    period_id        INTEGER NOT NULL,
+    unit_type        VARCHAR(10) NOT NULL,
+    risk_type_id     INTEGER NOT NULL,
+    details          INTEGER NOT NULL DEFAULT 0,
+    total_rating     BIGINT NOT NULL DEFAULT 0,
+    total_composite  NUMERIC(16, 4) NOT NULL DEFAULT 0,
+    PRIMARY KEY (period_id, unit_type, risk_type_id)
+);
+
+-- Fallback bila agregat diragukan (mis. data diubah manual): SELECT rebuild_assessment_stats();
+-- Lock EXCLUSIVE menahan writer (delta) selama rebuild, SELECT dashboard tetap jalan.
+CREATE OR REPLACE FUNCTION rebuild_assessment_stats() RETURNS void AS $$
+BEGIN
+    LOCK TABLE assessment_label_stats, risk_type_stats IN EXCLUSIVE MODE;
+
+    DELETE FROM assessment_label_stats;
+    INSERT INTO assessment_label_stats (period_id, unit_type, final_rating_label, assessments, total_score)
+    SELECT period_id, unit_type, final_rating_label, count(*), coalesce(sum(total_composite_score), 0)
+    FROM assessments
+    WHERE final_rating_label IS NOT NULL
+    GROUP BY period_id, unit_type, final_rating_label;
+
+    DELETE FROM risk_type_stats;
+    INSERT INTO risk_type_stats (period_id, unit_type, risk_type_id, details, total_rating, total_composite)
+    SELECT a.period_id, a.unit_type, d.risk_type_id,
+           count(*), coalesce(sum(d.risk_rating), 0), coalesce(sum(d.composite_score), 0)
+    FROM assessments a
+    JOIN assessment_details d ON d.assessment_id = a.id
+    GROUP BY a.period_id, a.unit_type, d.risk_type_id;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_assessment_stats();
@@ -0,0 +1,146 @@
+-- Aturan penilaian berversi (app/services/risk_rules.py): matriks inheren x KPMR -> peringkat risiko
+-- dan batas skor akhir -> label. Aturan baru = versi baru; assessment menyimpan rule_version_id
+-- yang dipakai saat dihitung, jadi versi yang pernah aktif tidak boleh diubah lagi.
+
+CREATE TABLE IF NOT EXISTS risk_rule_versions (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT FALSE,
+    activated_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Maksimal satu versi aktif
+CREATE UNIQUE INDEX IF NOT EXISTS risk_rule_versions_one_active ON risk_rule_versions ((true)) WHERE is_active;
+
+CREATE TABLE IF NOT EXISTS risk_rule_matrix (
+    version_id INT NOT NULL REFERENCES risk_rule_versions(id) ON DELETE CASCADE,
+    inherent SMALLINT NOT NULL CHECK (inherent BETWEEN 1 AND 5),
+    kpmr SMALLINT NOT NULL CHECK (kpmr BETWEEN 1 AND 5),
+    rating SMALLINT NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    PRIMARY KEY (version_id, inherent, kpmr)
+);
+
+-- Label untuk skor <= upper_bound, urut position; label terakhir tanpa batas atas (NULL)
+CREATE TABLE IF NOT EXISTS risk_rule_labels (
+    version_id INT NOT NULL REFERENCES risk_rule_versions(id) ON DELETE CASCADE,
+    position SMALLINT NOT NULL,
+    upper_bound NUMERIC(10, 2),
+    label VARCHAR(50) NOT NULL,
+    PRIMARY KEY (version_id, position)
+);
+
+-- Versi 1 = aturan yang sebelumnya hard-coded di RiskCalculationService (seed hanya sekali)
+INSERT INTO risk_rule_versions (id, name, is_active, activated_at)
+VALUES (1, 'Initial', TRUE, now())
+ON CONFLICT (id) DO NOTHING;
+SELECT setval(pg_get_serial_sequence('risk_rule_versions', 'id'), (SELECT max(id) FROM risk_rule_versions));
+
+INSERT INTO risk_rule_matrix (version_id, inherent, kpmr, rating)
+SELECT 1, i, k, (ARRAY[
+    [1, 1, 2, 2, 3],
+    [1, 2, 2, 3, 3],
+    [2, 2, 3, 3, 4],
+    [2, 3, 3, 4, 5],
+    [3, 4, 4, 5, 5]
+])[i][k]
+FROM generate_series(1, 5) AS i, generate_series(1, 5) AS k
+WHERE NOT EXISTS (SELECT 1 FROM risk_rule_matrix WHERE version_id = 1);
+
+INSERT INTO risk_rule_labels (version_id, position, upper_bound, label)
+SELECT 1, position, upper_bound, label
+FROM (VALUES
+    (1, 1.8, 'Rendah (1)'),
+    (2, 2.6, 'Sedang Rendah (2)'),
+    (3, 3.4, 'Sedang (3)'),
+    (4, 4.2, 'Sedang Tinggi (4)'),
+    (5, NULL, 'Tinggi (5)')
+) AS v(position, upper_bound, label)
+WHERE NOT EXISTS (SELECT 1 FROM risk_rule_labels WHERE version_id = 1);
+
+-- Assessment lama dihitung dengan aturan versi 1 (default hanya untuk backfill, tanpa rewrite tabel)
+ALTER TABLE assessments ADD COLUMN IF NOT EXISTS rule_version_id INT NOT NULL DEFAULT 1 REFERENCES risk_rule_versions(id);
+ALTER TABLE assessments ALTER COLUMN rule_version_id DROP DEFAULT;
+
+-- Ganti versi aktif: SELECT activate_risk_rule_version(<id>);
+CREATE OR REPLACE FUNCTION activate_risk_rule_version(p_version_id INT) RETURNS void AS $$
+BEGIN
+    IF (SELECT count(*) FROM risk_rule_matrix WHERE version_id = p_version_id) <> 25 THEN
+        RAISE EXCEPTION 'risk rule version % must define all 25 inherent x KPMR ratings', p_version_id;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM risk_rule_labels
+        WHERE version_id = p_version_id AND upper_bound IS NULL
+          AND position = (SELECT max(position) FROM risk_rule_labels WHERE version_id = p_version_id)
+    ) THEN
+        RAISE EXCEPTION 'risk rule version % must end with an unbounded label', p_version_id;
+    END IF;
+    UPDATE risk_rule_versions SET is_active = FALSE WHERE is_active AND id <> p_version_id;
+    UPDATE risk_rule_versions SET is_active = TRUE WHERE id = p_version_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- activated_at diisi saat versi pertama kali aktif (juga untuk UPDATE manual tanpa fungsi di atas)
+CREATE OR REPLACE FUNCTION stamp_risk_rule_activation() RETURNS trigger AS $$
+BEGIN
+    IF NEW.is_active AND NEW.activated_at IS NULL THEN
+        NEW.activated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS risk_rule_versions_activation ON risk_rule_versions;
+CREATE TRIGGER risk_rule_versions_activation
+    BEFORE INSERT OR UPDATE ON risk_rule_versions
+    FOR EACH ROW EXECUTE FUNCTION stamp_risk_rule_activation();
+
+-- Versi yang pernah aktif dibekukan (assessment lama merujuknya)
+CREATE OR REPLACE FUNCTION protect_activated_risk_rules() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM risk_rule_versions
+        WHERE id IN (OLD.version_id, NEW.version_id) AND activated_at IS NOT NULL
+    ) THEN
+        RAISE EXCEPTION 'risk rule version % was activated and is read-only; create a new version',
+            coalesce(OLD.version_id, NEW.version_id);
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS risk_rule_matrix_frozen ON risk_rule_matrix;
+CREATE TRIGGER risk_rule_matrix_frozen
+    BEFORE INSERT OR UPDATE OR DELETE ON risk_rule_matrix
+    FOR EACH ROW EXECUTE FUNCTION protect_activated_risk_rules();
+
+DROP TRIGGER IF EXISTS risk_rule_labels_frozen ON risk_rule_labels;
+CREATE TRIGGER risk_rule_labels_frozen
+    BEFORE INSERT OR UPDATE OR DELETE ON risk_rule_labels
+    FOR EACH ROW EXECUTE FUNCTION protect_activated_risk_rules();
+
+-- Invalidation cache aturan di semua worker yang LISTEN
+CREATE OR REPLACE FUNCTION notify_risk_rules_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('risk_rules_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS risk_rule_versions_changed ON risk_rule_versions;
+CREATE TRIGGER risk_rule_versions_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON risk_rule_versions
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_risk_rules_changed();
+
+DROP TRIGGER IF EXISTS risk_rule_matrix_changed ON risk_rule_matrix;
+CREATE TRIGGER risk_rule_matrix_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON risk_rule_matrix
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_risk_rules_changed();
+
+DROP TRIGGER IF EXISTS risk_rule_labels_changed ON risk_rule_labels;
+CREATE TRIGGER risk_rule_labels_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON risk_rule_labels
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_risk_rules_changed();
@@ -0,0 +1,8 @@
+-- migrate: no-transaction
+-- Index jalur panas yang belum dijamin constraint lain (dicek oleh python -m benchmarks.plans).
+-- Sudah ada: users(email) UNIQUE, assessments(user_id, period_id, unit_type) & assessment_details
+-- (assessment_id, risk_type_id) UNIQUE (002), assessments(user_id, id) (005).
+-- CONCURRENTLY: tidak mengunci tulis assessments selama build di database yang sudah berisi.
+
+-- Export per periode (assessment.export): baca assessment 1 periode urut id tanpa scan seluruh tabel
+CREATE INDEX CONCURRENTLY IF NOT EXISTS assessments_period ON assessments (period_id, id);
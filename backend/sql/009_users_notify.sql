@@ -0,0 +1,24 @@
+-- Invalidation cache principal (app/core/cache.py PrincipalCache)
+-- Update/delete user mengirim NOTIFY berisi id user ke semua worker yang LISTEN, supaya perubahan
+-- role / penghapusan user berlaku di semua worker tanpa menunggu TTL. TRUNCATE: payload kosong.
+
+CREATE OR REPLACE FUNCTION notify_users_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('users_changed', '');
+    ELSE
+        PERFORM pg_notify('users_changed', OLD.id::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_changed ON users;
+CREATE TRIGGER users_changed
+    AFTER UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_users_changed();
+
+DROP TRIGGER IF EXISTS users_truncated ON users;
+CREATE TRIGGER users_truncated
+    AFTER TRUNCATE ON users
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_users_changed();
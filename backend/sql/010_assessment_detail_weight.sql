@@ -0,0 +1,6 @@
+-- Bobot yang dipakai saat detail dihitung (calculate, bulk import, recompute), disimpan per detail:
+-- export & recompute tidak bergantung pada bobot risk_types saat ini.
+-- Hanya menambah kolom nullable (tanpa rewrite / UPDATE seluruh tabel): baris yang ditulis sebelum
+-- migrasi ini tetap NULL sampai disubmit ulang atau di-recompute (lihat "assessment.export").
+
+ALTER TABLE assessment_details ADD COLUMN IF NOT EXISTS weight NUMERIC(5, 4);
@@ -0,0 +1,126 @@
+-- Simpan submission /assessment/calculate dalam 1 round-trip: advisory lock + CTE save di satu fungsi
+-- (dipanggil sebagai 1 statement autocommit, tanpa BEGIN/COMMIT terpisah dari app).
+-- Lock harus statement TERPISAH sebelum CTE: snapshot statement diambil saat statement mulai, jadi lock
+-- di dalam CTE tidak membuat DELETE detail / nilai lama melihat baris dari pemenang lock. Di plpgsql
+-- (READ COMMITTED, fungsi VOLATILE) setiap statement mendapat snapshot baru, jadi CTE di bawah
+-- membaca data setelah pemegang lock sebelumnya COMMIT. Lock dilepas saat transaksi statement selesai.
+-- Kunci lock sama dengan "assessment.lock_many" (bulk import, recompute) di app/repository/statements.py.
+--
+-- Header + detail dalam SATU statement (atomic):
+-- - header: upsert, resubmission mempertahankan id lama
+-- - detail: upsert dari array (unnest), hanya baris yang berubah yang ditulis ulang
+-- - risk type yang tidak ada lagi di submission dihapus
+-- - result_snapshot (table_data response) ditulis di statement yang sama dengan detailnya
+-- - rule_version_id = versi aturan penilaian yang dipakai (sql/007_risk_rules.sql)
+-- - weight = bobot yang dipakai per detail (sql/010_assessment_detail_weight.sql)
+-- - agregat analytics di-update dengan delta (lihat sql/006_analytics_stats.sql)
+-- - NOTIFY assessment_saved untuk feed SSE (dikirim Postgres saat COMMIT)
+
+CREATE OR REPLACE FUNCTION save_assessment(
+    integer, integer, varchar, numeric, varchar,
+    integer[], float8[], integer[], integer[], integer[], float8[],
+    jsonb, integer, float8[]
+) RETURNS TABLE (id integer, is_new boolean, changed_ids integer[], removed_ids integer[]) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM pg_advisory_xact_lock($1, hashtext($2::int || ':' || $3::text));
+
+    WITH header AS (
+        INSERT INTO assessments
+        (user_id, period_id, unit_type, total_composite_score, final_rating_label, status, result_snapshot, rule_version_id)
+        VALUES ($1, $2, $3, $4, $5, 'SUBMITTED', $12, $13)
+        ON CONFLICT (user_id, period_id, unit_type) DO UPDATE SET
+            total_composite_score = EXCLUDED.total_composite_score,
+            final_rating_label = EXCLUDED.final_rating_label,
+            status = EXCLUDED.status,
+            result_snapshot = EXCLUDED.result_snapshot,
+            rule_version_id = EXCLUDED.rule_version_id
+        RETURNING id, (xmax = 0) AS is_new
+    ),
+    input AS (
+        SELECT * FROM unnest($6::int[], $7::float8[], $8::int[], $9::int[], $10::int[], $11::float8[], $14::float8[])
+            AS t(risk_type_id, inherent_original, inherent_rounded, kpmr_score, risk_rating, composite_score, weight)
+    ),
+    upserted AS (
+        INSERT INTO assessment_details
+        (assessment_id, risk_type_id, inherent_original, inherent_rounded, kpmr_score, risk_rating, composite_score, weight)
+        SELECT header.id, input.* FROM header, input
+        ON CONFLICT (assessment_id, risk_type_id) DO UPDATE SET
+            inherent_original = EXCLUDED.inherent_original,
+            inherent_rounded = EXCLUDED.inherent_rounded,
+            kpmr_score = EXCLUDED.kpmr_score,
+            risk_rating = EXCLUDED.risk_rating,
+            composite_score = EXCLUDED.composite_score,
+            weight = EXCLUDED.weight
+        WHERE (assessment_details.inherent_original, assessment_details.inherent_rounded,
+               assessment_details.kpmr_score, assessment_details.risk_rating, assessment_details.composite_score,
+               assessment_details.weight)
+            IS DISTINCT FROM
+              (EXCLUDED.inherent_original, EXCLUDED.inherent_rounded,
+               EXCLUDED.kpmr_score, EXCLUDED.risk_rating, EXCLUDED.composite_score, EXCLUDED.weight)
+        RETURNING risk_type_id
+    ),
+    removed AS (
+        DELETE FROM assessment_details d
+        USING header
+        WHERE d.assessment_id = header.id AND d.risk_type_id <> ALL($6::int[])
+        RETURNING d.risk_type_id
+    ),
+    -- Nilai lama (snapshot statement) untuk delta agregat analytics. Aman karena semua writer
+    -- assessment (calculate, bulk import, recompute) mengambil advisory lock key yang sama sebelum
+    -- menulis: snapshot ini diambil setelah writer lain untuk key ini COMMIT
+    old_header AS (
+        SELECT id, final_rating_label, total_composite_score FROM assessments
+        WHERE user_id = $1 AND period_id = $2 AND unit_type = $3
+    ),
+    old_details AS (
+        SELECT d.risk_type_id, d.risk_rating, d.composite_score
+        FROM assessment_details d JOIN old_header h ON h.id = d.assessment_id
+    ),
+    -- Delta -lama +baru, urut key (urutan lock sama di semua writer); delta 0 tidak ditulis
+    label_stats AS (
+        INSERT INTO assessment_label_stats AS s (period_id, unit_type, final_rating_label, assessments, total_score)
+        SELECT $2::int, $3::varchar, label, sum(n), sum(score)
+        FROM (
+            SELECT final_rating_label, -1, -total_composite_score FROM old_header
+            UNION ALL
+            SELECT $5::varchar, 1, $4::numeric(10, 2)
+        ) AS delta(label, n, score)
+        WHERE label IS NOT NULL
+        GROUP BY label
+        HAVING sum(n) <> 0 OR sum(score) <> 0
+        ORDER BY label
+        ON CONFLICT (period_id, unit_type, final_rating_label) DO UPDATE SET
+            assessments = s.assessments + EXCLUDED.assessments,
+            total_score = s.total_score + EXCLUDED.total_score
+    ),
+    risk_stats AS (
+        INSERT INTO risk_type_stats AS s (period_id, unit_type, risk_type_id, details, total_rating, total_composite)
+        SELECT $2::int, $3::varchar, risk_type_id, sum(n), sum(rating), sum(composite)
+        FROM (
+            SELECT risk_type_id, -1, -risk_rating, -composite_score FROM old_details
+            UNION ALL
+            SELECT risk_type_id, 1, risk_rating, composite_score::numeric(10, 4) FROM input
+        ) AS delta(risk_type_id, n, rating, composite)
+        GROUP BY risk_type_id
+        HAVING sum(n) <> 0 OR sum(rating) <> 0 OR sum(composite) <> 0
+        ORDER BY risk_type_id
+        ON CONFLICT (period_id, unit_type, risk_type_id) DO UPDATE SET
+            details = s.details + EXCLUDED.details,
+            total_rating = s.total_rating + EXCLUDED.total_rating,
+            total_composite = s.total_composite + EXCLUDED.total_composite
+    )
+    SELECT header.id, header.is_new,
+           ARRAY(SELECT risk_type_id FROM upserted),
+           ARRAY(SELECT risk_type_id FROM removed ORDER BY 1)
+    INTO id, is_new, changed_ids, removed_ids
+    FROM header;
+
+    -- Feed SSE (app/services/assessment_feed.py)
+    PERFORM pg_notify('assessment_saved', json_build_object(
+        'id', id, 'user_id', $1, 'period_id', $2, 'unit_type', $3,
+        'final_score', $4::numeric(10, 2), 'final_rating', $5, 'is_new', is_new
+    )::text);
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,28 @@
+"""
+Test unit tanpa Postgres. Jalankan dari folder backend:
+
+    pip install -r requirements-dev.txt
+    python -m pytest
+
+Test async memakai plugin pytest bawaan anyio (`@pytest.mark.anyio`), backend asyncio saja.
+"""
+import os
+
+import pytest
+
+# Settings wajib ada walau tidak pakai DB sungguhan (sama dengan benchmarks/__main__.py)
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test", "SECRET_KEY": "test-secret"}.items():
+    os.environ.setdefault(key, value)
+
+from benchmarks.fake_pool import seed_rules  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def rules():
+    """Aturan penilaian versi 1 (seed sql/007_risk_rules.sql)"""
+    return seed_rules()
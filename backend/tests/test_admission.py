@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, UserConcurrencyLimited
+from app.core.executor import ExecutorSaturated
+
+pytestmark = pytest.mark.anyio
+
+
+async def _hold(controller: AdmissionController, user_key, release: asyncio.Event, entered: asyncio.Event = None):
+    async with controller.admit(user_key):
+        if entered is not None:
+            entered.set()
+        await release.wait()
+
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0)
+
+
+async def test_per_user_limit_returns_429():
+    controller = AdmissionController("test", max_in_flight=10, max_queue=10, queue_timeout=1, per_user=1)
+    release, entered = asyncio.Event(), asyncio.Event()
+    held = asyncio.create_task(_hold(controller, 1, release, entered))
+    await entered.wait()
+
+    with pytest.raises(UserConcurrencyLimited) as exc:
+        async with controller.admit(1):
+            pass
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "1"}
+
+    # User lain tidak ikut tertahan
+    async with controller.admit(2):
+        pass
+
+    release.set()
+    await held
+    assert controller.stats() == {
+        "name": "test", "max_in_flight": 10, "running": 0, "waiting": 0, "users": 0, "admitted": 2,
+    }
+
+
+async def test_full_queue_returns_503():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=1, queue_timeout=5, per_user=5)
+    release = asyncio.Event()
+    held = [asyncio.create_task(_hold(controller, user, release)) for user in (1, 2)]
+    await _until(lambda: controller._running == 1 and controller._waiting == 1)
+
+    with pytest.raises(ExecutorSaturated) as exc:
+        async with controller.admit(3):
+            pass
+    assert exc.value.status_code == 503
+    assert 3 not in controller._by_user
+
+    release.set()
+    await asyncio.gather(*held)
+    assert controller.admitted == 2
+    assert controller._by_user == {}
+
+
+async def test_queue_timeout_returns_503_and_cleans_up():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=5, queue_timeout=0.02, per_user=5)
+    release, entered = asyncio.Event(), asyncio.Event()
+    held = asyncio.create_task(_hold(controller, 1, release, entered))
+    await entered.wait()
+
+    with pytest.raises(ExecutorSaturated):
+        async with controller.admit(2):
+            pass
+    assert controller.stats()["waiting"] == 0
+    assert controller._by_user == {1: 1}
+
+    release.set()
+    await held
+    # Slot dan hitungan per user kembali normal setelah semua selesai
+    async with controller.admit(2):
+        assert controller.stats()["running"] == 1
+    assert controller._by_user == {}
+
+
+async def test_error_inside_block_releases_slot():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=0, queue_timeout=1, per_user=1)
+    with pytest.raises(RuntimeError):
+        async with controller.admit(1):
+            raise RuntimeError("boom")
+    async with controller.admit(1):
+        pass
+    assert controller.stats()["running"] == 0 and controller._by_user == {}
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.services import analytics_rebuild
+from app.services.analytics_rebuild import AnalyticsRebuildRunner
+from benchmarks.fake_pool import FakePool
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRepo:
+    """Pengganti AnalyticsRepository: lock & rebuild dikontrol test"""
+
+    def __init__(self, locked=True, error=None):
+        self.locked = locked
+        self.error = error
+        self.release = asyncio.Event()
+        self.rebuilds = 0
+
+    async def try_lock_rebuild(self, conn):
+        return self.locked
+
+    async def rebuild(self, conn):
+        self.rebuilds += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def runner():
+    return AnalyticsRebuildRunner()
+
+
+def _install(monkeypatch, repo: FakeRepo):
+    monkeypatch.setattr(analytics_rebuild.AnalyticsRepository, "try_lock_rebuild", repo.try_lock_rebuild)
+    monkeypatch.setattr(analytics_rebuild.AnalyticsRepository, "rebuild", repo.rebuild)
+
+
+async def _finished(runner: AnalyticsRebuildRunner):
+    await asyncio.gather(runner._task, return_exceptions=True)
+
+
+async def test_lock_held_elsewhere_returns_false(monkeypatch, runner):
+    repo = FakeRepo(locked=False)
+    _install(monkeypatch, repo)
+    assert await runner.start(FakePool()) is False
+    await _finished(runner)
+    assert runner.status() == {"status": "IDLE"}
+    assert repo.rebuilds == 0
+
+
+async def test_rebuild_completes_and_rejects_second_start(monkeypatch, runner):
+    repo = FakeRepo()
+    _install(monkeypatch, repo)
+    pool = FakePool()
+    assert await runner.start(pool) is True
+    assert runner.status()["status"] == "RUNNING"
+    # Rebuild di worker ini masih berjalan
+    assert await runner.start(pool) is False
+
+    repo.release.set()
+    await _finished(runner)
+    status = runner.status()
+    assert status["status"] == "COMPLETED"
+    assert status["finished_at"] >= status["started_at"]
+    assert repo.rebuilds == 1
+
+
+async def test_rebuild_failure_reported(monkeypatch, runner):
+    repo = FakeRepo(error=RuntimeError("lock timeout"))
+    _install(monkeypatch, repo)
+    assert await runner.start(FakePool()) is True
+    repo.release.set()
+    await _finished(runner)
+    assert runner.status()["status"] == "FAILED"
+    assert runner.status()["error"] == "lock timeout"
+
+
+async def test_error_before_lock_propagates_to_caller(monkeypatch, runner):
+    async def broken(conn):
+        raise ConnectionError("pool closed")
+
+    monkeypatch.setattr(analytics_rebuild.AnalyticsRepository, "try_lock_rebuild", broken)
+    with pytest.raises(ConnectionError):
+        await runner.start(FakePool())
+    assert runner.status() == {"status": "IDLE"}
+
+
+async def test_stop_cancels_running_rebuild(monkeypatch, runner):
+    repo = FakeRepo()
+    _install(monkeypatch, repo)
+    assert await runner.start(FakePool()) is True
+    await runner.stop()
+    assert runner.status()["status"] == "CANCELLED"
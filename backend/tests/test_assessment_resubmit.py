@@ -0,0 +1,54 @@
+import pytest
+
+from app.repository.assessment_repo import AssessmentRepository
+from app.schemas.assessment import AssessmentSubmit
+from app.services.risk_rules import get_risk_rule_cache
+from app.services.risk_weights import risk_weight_cache
+from benchmarks.fake_pool import FakePool
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = 5
+
+
+@pytest.fixture
+async def pool():
+    pool = FakePool()
+    pool.db.seed("unused-hash")
+    await risk_weight_cache.load(pool)
+    await get_risk_rule_cache().load(pool)
+    return pool
+
+
+def _submission(details) -> AssessmentSubmit:
+    return AssessmentSubmit(period_id=1, unit_type="LPEI", details=[
+        {"risk_type_id": risk_id, "inherent": inherent, "kpmr": kpmr} for risk_id, inherent, kpmr in details
+    ])
+
+
+async def test_resubmission_keeps_id_and_reports_changed_rows(pool):
+    first = await AssessmentRepository.calculate(pool, USER_ID, _submission([(1, 2.5, 3), (2, 4.1, 2), (3, 1.0, 1)]))
+    assert first["is_new"] is True
+    assert all(row["changed"] for row in first["table_data"])
+
+    # Risk type 2 berubah, 3 dihapus, 1 sama
+    second = await AssessmentRepository.calculate(pool, USER_ID, _submission([(1, 2.5, 3), (2, 3.0, 2)]))
+    assert second["id"] == first["id"]
+    assert second["is_new"] is False
+    assert [row["changed"] for row in second["table_data"]] == [False, True]
+    assert second["removed_risk_type_ids"] == [3]
+
+    # Submission identik: tidak ada baris yang ditulis ulang
+    third = await AssessmentRepository.calculate(pool, USER_ID, _submission([(1, 2.5, 3), (2, 3.0, 2)]))
+    assert third["id"] == first["id"]
+    assert not any(row["changed"] for row in third["table_data"])
+    assert third["removed_risk_type_ids"] == []
+
+
+async def test_other_period_is_new_assessment(pool):
+    first = await AssessmentRepository.calculate(pool, USER_ID, _submission([(1, 2.5, 3)]))
+    other = await AssessmentRepository.calculate(pool, USER_ID, AssessmentSubmit(
+        period_id=2, unit_type="LPEI", details=[{"risk_type_id": 1, "inherent": 2.5, "kpmr": 3}]
+    ))
+    assert other["is_new"] is True
+    assert other["id"] != first["id"]
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from app.schemas.assessment import AssessmentSubmit
+from app.services.bulk_import import iter_csv, iter_ndjson, score_submissions
+from app.services.calculation import RiskCalculationService
+from app.services.risk_weights import weight_unit
+
+pytestmark = pytest.mark.anyio
+
+RISK_MAPS = {
+    "LPEI": {1: {"w": 0.2, "name": "Kredit"}, 2: {"w": 0.15, "name": "Pasar"}},
+    "UUS": {1: {"w": 0.1, "name": "Kredit"}, 3: {"w": 0.3, "name": "Imbal Hasil"}},
+}
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(parser, data: bytes, size: int = 7):
+    return [record async for record in parser(_chunks(data, size))]
+
+
+async def test_ndjson_split_across_chunks_and_errors_indexed():
+    lines = [
+        json.dumps({"period_id": 1, "unit_type": "LPEI", "details": [{"risk_type_id": 1, "inherent": 2.5, "kpmr": 3}]}),
+        "",
+        "{not json",
+        json.dumps({"period_id": 2, "unit_type": "UUS", "details": [{"risk_type_id": 3, "inherent": 9, "kpmr": 1}]}),
+        json.dumps({"period_id": 3, "unit_type": "UUS", "details": []}),
+    ]
+    # BOM + CRLF + baris terakhir tanpa newline
+    data = ("\ufeff" + "\r\n".join(lines)).encode()
+    records = await _collect(iter_ndjson, data)
+
+    assert [index for index, _ in records] == [0, 1, 2, 3]
+    assert isinstance(records[0][1], AssessmentSubmit) and records[0][1].details[0].kpmr == 3
+    assert isinstance(records[1][1], str)
+    assert "details.0.inherent" in records[2][1]
+    assert records[3][1].period_id == 3
+
+
+async def test_csv_groups_consecutive_rows_into_submissions():
+    data = (
+        "period_id,unit_type,risk_type_id,inherent,kpmr\n"
+        "1,LPEI,1,2.5,3\n"
+        "1,LPEI,2,4.1,2\n"
+        "\n"
+        "1,UUS,1,1.2,1\n"
+        "2,LPEI,1,7,1\n"
+        "2,LPEI,2,3,2\n"
+        "3,LPEI\n"
+    ).encode()
+    records = await _collect(iter_csv, data, size=5)
+
+    assert [index for index, _ in records] == [0, 1, 2, 3]
+    first = records[0][1]
+    assert (first.period_id, first.unit_type, [d.risk_type_id for d in first.details]) == (1, "LPEI", [1, 2])
+    assert records[1][1].unit_type == "UUS"
+    # Satu detail invalid -> seluruh submission ditolak
+    assert isinstance(records[2][1], str) and "inherent" in records[2][1]
+    assert records[3][1].startswith("Malformed CSV row")
+
+
+async def test_csv_missing_columns_and_empty_body():
+    assert await _collect(iter_csv, b"period_id,unit_type,inherent\n1,LPEI,2\n") == [
+        (0, "Missing CSV columns: risk_type_id, kpmr")
+    ]
+    assert await _collect(iter_csv, b"\n\n") == []
+
+
+def test_score_submissions_matches_calculate_row(rules):
+    submissions = [
+        AssessmentSubmit(period_id=1, unit_type="LPEI", details=[
+            {"risk_type_id": 1, "inherent": 2.5, "kpmr": 3},
+            {"risk_type_id": 2, "inherent": 4.45, "kpmr": 5},
+            {"risk_type_id": 3, "inherent": 3.0, "kpmr": 1},  # bukan risk type LPEI: dilewati
+        ]),
+        AssessmentSubmit(period_id=1, unit_type="UUS", details=[{"risk_type_id": 3, "inherent": 1.5, "kpmr": 2}]),
+        AssessmentSubmit(period_id=1, unit_type="lainnya", details=[{"risk_type_id": 2, "inherent": 5, "kpmr": 5}]),
+    ]
+    results = score_submissions(submissions, RISK_MAPS, rules)
+
+    for sub, result in zip(submissions, results):
+        risk_map = RISK_MAPS[weight_unit(sub.unit_type)]
+        total, details = 0.0, []
+        for item in sub.details:
+            if item.risk_type_id not in risk_map:
+                continue
+            weight = risk_map[item.risk_type_id]["w"]
+            row = RiskCalculationService.calculate_row(rules, item.inherent, item.kpmr, weight)
+            total += row["composite"]
+            details.append((
+                item.risk_type_id, item.inherent, row["inherent_round"], item.kpmr,
+                row["risk_rating"], row["composite"], weight,
+            ))
+        assert result["details"] == details
+        assert result["total_composite"] == total
+        assert result["final_label"] == RiskCalculationService.get_final_label(rules, total)
+        assert result["rule_version_id"] == rules.version_id
+        assert [r["risk_name"] for r in result["table_data"]] == [
+            risk_map[d[0]]["name"] for d in details
+        ]
+
+
+def test_weight_unit():
+    assert weight_unit("UUS") == "UUS"
+    assert weight_unit("LPEI") == "LPEI"
+    assert weight_unit("uus") == "LPEI"
@@ -0,0 +1,108 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import PrincipalCache, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _user(user_id: int, email: str) -> dict:
+    return {"id": user_id, "email": email, "role": "erm"}
+
+
+def test_ttl_expiry_counts_as_miss(clock):
+    c = TTLCache(max_size=10, ttl_seconds=5)
+    c.put("a", 1)
+    assert c.get("a") == 1
+    clock.now += 6
+    assert c.get("a") is None
+    assert c.stats() == {
+        "size": 0, "max_size": 10, "ttl_seconds": 5, "hits": 1, "misses": 1, "evictions": 0, "hit_ratio": 0.5,
+    }
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    c = TTLCache(max_size=2, ttl_seconds=60)
+    c.put("a", 1)
+    c.put("b", 2)
+    c.get("a")
+    c.put("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.evictions == 1
+
+
+def test_pop_returns_value_once(clock):
+    c = TTLCache(max_size=2, ttl_seconds=60)
+    c.put("a", 1)
+    assert c.pop("a") == 1
+    assert c.pop("a") is None
+
+
+@pytest.mark.parametrize("remove", ["evict", "expire", "pop"])
+def test_principal_index_pruned_when_entry_leaves(clock, remove):
+    c = PrincipalCache(max_size=1, ttl_seconds=60)
+    c.put("a@x.com", _user(1, "a@x.com"))
+    if remove == "evict":
+        c.put("b@x.com", _user(2, "b@x.com"))
+    elif remove == "expire":
+        clock.now += 61
+        assert c.get("a@x.com") is None
+    else:
+        c.pop("a@x.com")
+    assert 1 not in c._key_by_user_id
+    assert len(c._key_by_user_id) == len(c._data)
+
+
+def test_principal_index_survives_old_email_eviction(clock):
+    c = PrincipalCache(max_size=2, ttl_seconds=60)
+    c.put("old@x.com", _user(1, "old@x.com"))
+    # Email user berubah: key baru masuk, entry lama keluar belakangan
+    c.put("new@x.com", _user(1, "new@x.com"))
+    c.put("other@x.com", _user(2, "other@x.com"))
+    assert c.get("old@x.com") is None
+    assert c._key_by_user_id == {1: "new@x.com", 2: "other@x.com"}
+
+    c.invalidate_user(1)
+    assert c.get("new@x.com") is None
+    assert c._key_by_user_id == {2: "other@x.com"}
+
+
+def test_principal_put_with_stale_generation_is_dropped(clock):
+    c = PrincipalCache(max_size=10, ttl_seconds=60)
+    generation = c.generation
+    # User diubah selagi query principal masih berjalan
+    c.invalidate_user(1)
+    c.put("a@x.com", _user(1, "a@x.com"), generation)
+    assert c.get("a@x.com") is None
+
+    c.put("a@x.com", _user(1, "a@x.com"), c.generation)
+    assert c.get("a@x.com") is not None
+
+
+def test_principal_on_notify(clock):
+    c = PrincipalCache(max_size=10, ttl_seconds=60)
+    c.put("a@x.com", _user(1, "a@x.com"))
+    c.put("b@x.com", _user(2, "b@x.com"))
+
+    c.on_notify("1")
+    assert c.get("a@x.com") is None and c.get("b@x.com") is not None
+
+    generation = c.generation
+    c.on_notify("")
+    assert c.get("b@x.com") is None
+    assert c._key_by_user_id == {}
+    assert c.generation == generation + 1
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from app.services.calculation import RiskCalculationService
+
+WEIGHTS = [0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35]
+
+
+def _rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    # Termasuk nilai tepat .5 (pembulatan ke atas) & di luar 1..5 (clamp)
+    inherent = [rng.choice([0.5, 1.49, 2.5, 3.5, 4.5, 5.49, 6.0, round(rng.uniform(0.5, 5.5), 2)]) for _ in range(n)]
+    kpmr = [rng.randint(1, 5) for _ in range(n)]
+    weight = [rng.choice(WEIGHTS) for _ in range(n)]
+    return inherent, kpmr, weight
+
+
+def test_batch_matches_per_row(rules):
+    inherent, kpmr, weight = _rows(500)
+    batch = RiskCalculationService.calculate_batch(rules, inherent, kpmr, weight)
+
+    for i, args in enumerate(zip(inherent, kpmr, weight)):
+        row = RiskCalculationService.calculate_row(rules, *args)
+        assert batch["inherent_round"][i] == row["inherent_round"]
+        assert batch["risk_rating"][i] == row["risk_rating"]
+        assert batch["composite"][i] == row["composite"]
+
+
+def test_score_assessments_totals_are_bit_identical(rules):
+    inherent, kpmr, weight = _rows(600, seed=11)
+    rng = random.Random(3)
+    owner = sorted(rng.randrange(60) for _ in inherent)
+    scored = RiskCalculationService.score_assessments(rules, inherent, kpmr, weight, owner, n_assessments=60)
+
+    # Jalur per-row: total += composite berurutan per assessment
+    totals = [0.0] * 60
+    for i, args in zip(owner, zip(inherent, kpmr, weight)):
+        totals[i] += RiskCalculationService.calculate_row(rules, *args)["composite"]
+
+    assert scored["total_composite"].tolist() == totals
+    assert scored["final_label"].tolist() == [RiskCalculationService.get_final_label(rules, t) for t in totals]
+
+
+def test_assessment_without_details_scores_zero(rules):
+    scored = RiskCalculationService.score_assessments(rules, [3.0], [2], [0.2], [1], n_assessments=3)
+    composite = RiskCalculationService.calculate_row(rules, 3.0, 2, 0.2)["composite"]
+    assert scored["total_composite"].tolist() == [0.0, composite, 0.0]
+    assert scored["final_label"][0] == rules.labels[0]
+
+
+@pytest.mark.parametrize("score, label", [
+    (1.8, "Rendah (1)"),
+    (1.8000001, "Sedang Rendah (2)"),
+    (4.2, "Sedang Tinggi (4)"),
+    (4.21, "Tinggi (5)"),
+])
+def test_final_label_upper_bound_is_inclusive(rules, score, label):
+    assert RiskCalculationService.get_final_label(rules, score) == label
+    assert RiskCalculationService.get_final_labels(rules, [score]).tolist() == [label]
+
+
+@pytest.mark.parametrize("kpmr", [0, 6])
+def test_kpmr_outside_matrix_raises(rules, kpmr):
+    with pytest.raises(ValueError, match="KPMR"):
+        RiskCalculationService.calculate_row(rules, 3.0, kpmr, 0.2)
+    with pytest.raises(ValueError, match="KPMR"):
+        RiskCalculationService.calculate_batch(rules, [3.0, 3.0], [3, kpmr], [0.2, 0.2])
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorSaturated
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def gate():
+    """Event untuk menahan worker; selalu dilepas agar thread pool bisa selesai"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def pool():
+    executor = BoundedExecutor("test", workers=1, max_queue=1, queue_timeout=5)
+    yield executor
+    executor.shutdown()
+
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
+
+
+async def test_run_returns_result_and_counts(pool):
+    assert await pool.run(pow, 2, 10) == 1024
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["failed"]) == (1, 0, 0)
+    assert (stats["running"], stats["waiting"]) == (0, 0)
+
+
+async def test_full_queue_rejected_immediately(pool, gate):
+    running = asyncio.create_task(pool.run(gate.wait))
+    await _until(lambda: pool._running == 1)
+    queued = asyncio.create_task(pool.run(gate.wait))
+    await _until(lambda: pool._waiting == 1)
+
+    with pytest.raises(ExecutorSaturated) as exc:
+        await pool.run(gate.wait)
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "1"}
+
+    gate.set()
+    await asyncio.gather(running, queued)
+    assert (pool.completed, pool.rejected) == (2, 1)
+
+
+async def test_queue_timeout_rejected(gate):
+    pool = BoundedExecutor("test", workers=1, max_queue=5, queue_timeout=0.05)
+    try:
+        running = asyncio.create_task(pool.run(gate.wait))
+        await _until(lambda: pool._running == 1)
+        with pytest.raises(ExecutorSaturated):
+            await pool.run(gate.wait)
+        assert pool.stats()["waiting"] == 0
+
+        gate.set()
+        await running
+        assert (pool.completed, pool.rejected) == (1, 1)
+    finally:
+        pool.shutdown()
+
+
+async def test_failure_counted_and_slot_released(pool):
+    with pytest.raises(ZeroDivisionError):
+        await pool.run(divmod, 1, 0)
+    assert pool.failed == 1
+    # Slot dikembalikan: panggilan berikutnya tidak menunggu
+    assert await pool.run(divmod, 7, 2) == (3, 1)
+    assert pool.stats()["completed"] == 1
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import asyncpg
+import pytest
+
+from app.services import recompute
+from app.services.recompute import RecomputeRunner
+from benchmarks.fake_pool import FakePool
+
+pytestmark = pytest.mark.anyio
+
+JOB_ID = 7
+
+
+class FakeWeights:
+    """Pengganti risk_weight_cache: hash bisa diganti di tengah job"""
+
+    def __init__(self):
+        self.weights_hash = "w1"
+
+    async def ensure_loaded(self, pool):
+        pass
+
+    async def get_risk_maps(self, pool):
+        return {"LPEI": {}, "UUS": {}}
+
+
+class FakeRepo:
+    """Pengganti RecomputeRepository: chunk diambil dari daftar hasil (int / exception / callable)"""
+
+    def __init__(self, chunks, owned=True):
+        self.chunks = list(chunks)
+        self.owned = owned
+        self.calls = []
+
+    async def own_job(self, conn, job_id):
+        return self.owned
+
+    async def process_chunk(self, pool, job_id, risk_maps, chunk_size):
+        self.calls.append("chunk")
+        result = self.chunks.pop(0)
+        if callable(result):
+            result = result()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def restart_job(self, pool, job_id):
+        self.calls.append("restart")
+
+    async def finish_job(self, pool, job_id, status, error=None):
+        self.calls.append((status, error))
+
+
+@pytest.fixture
+def weights(monkeypatch):
+    weights = FakeWeights()
+    monkeypatch.setattr(recompute, "risk_weight_cache", weights)
+    monkeypatch.setattr(recompute, "settings", SimpleNamespace(
+        RECOMPUTE_CHUNK_SIZE=100, RECOMPUTE_CHUNK_PAUSE_SECONDS=0, RECOMPUTE_DEADLOCK_RETRIES=2,
+    ))
+    return weights
+
+
+def _install(monkeypatch, repo: FakeRepo):
+    for name in ("own_job", "process_chunk", "restart_job", "finish_job"):
+        monkeypatch.setattr(recompute.RecomputeRepository, name, getattr(repo, name))
+
+
+async def test_completes_without_restart_when_weights_unchanged(monkeypatch, weights):
+    repo = FakeRepo([100, 100, 0])
+    _install(monkeypatch, repo)
+    await RecomputeRunner()._run(FakePool(), JOB_ID)
+    assert repo.calls == ["chunk", "chunk", "chunk", ("COMPLETED", None)]
+
+
+async def test_restarts_when_weights_change(monkeypatch, weights):
+    def change_weights():
+        weights.weights_hash = "w2"
+        return 100
+
+    repo = FakeRepo([100, change_weights, 100, 0])
+    _install(monkeypatch, repo)
+    await RecomputeRunner()._run(FakePool(), JOB_ID)
+    assert repo.calls == ["chunk", "chunk", "restart", "chunk", "chunk", ("COMPLETED", None)]
+
+
+async def test_deadlock_retried_then_recovers(monkeypatch, weights):
+    deadlock = asyncpg.DeadlockDetectedError("deadlock detected")
+    # Hitungan percobaan di-reset setelah chunk sukses
+    repo = FakeRepo([deadlock, deadlock, 100, deadlock, deadlock, 0])
+    _install(monkeypatch, repo)
+    await RecomputeRunner()._run(FakePool(), JOB_ID)
+    assert repo.calls[-1] == ("COMPLETED", None)
+
+
+async def test_deadlock_retry_limit_fails_job(monkeypatch, weights):
+    repo = FakeRepo([asyncpg.DeadlockDetectedError("deadlock detected")] * 3)
+    _install(monkeypatch, repo)
+    await RecomputeRunner()._run(FakePool(), JOB_ID)
+    assert repo.calls == ["chunk", "chunk", "chunk", ("FAILED", "deadlock detected")]
+
+
+async def test_job_owned_elsewhere_is_skipped(monkeypatch, weights):
+    repo = FakeRepo([0], owned=False)
+    _install(monkeypatch, repo)
+    await RecomputeRunner()._run(FakePool(), JOB_ID)
+    assert repo.calls == []
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from app.services.calculation import RiskCalculationService, RuleCompileError, compile_rules
+from benchmarks.fake_pool import SEED_RISK_MATRIX, SEED_RULE_LABELS
+
+
+def _matrix(shift: int = 0):
+    return [
+        (i + 1, k + 1, min(rating + shift, 5))
+        for i, row in enumerate(SEED_RISK_MATRIX) for k, rating in enumerate(row)
+    ]
+
+
+def test_compile_rules_builds_lookup(rules):
+    assert rules.version_id == 1
+    assert rules.rating_lookup.tolist() == SEED_RISK_MATRIX
+    assert rules.thresholds == (1.8, 2.6, 3.4, 4.2)
+    assert rules.labels[-1] == "Tinggi (5)"
+
+
+def test_compile_rules_rejects_missing_cell():
+    with pytest.raises(RuleCompileError, match=r"missing .* \[\(5, 5\)\]"):
+        compile_rules(2, _matrix()[:-1], SEED_RULE_LABELS)
+
+
+def test_compile_rules_rejects_bounded_last_label():
+    labels = list(SEED_RULE_LABELS[:-1]) + [(SEED_RULE_LABELS[-1][0], 5.0, "Tinggi (5)")]
+    with pytest.raises(RuleCompileError, match="last label"):
+        compile_rules(2, _matrix(), labels)
+
+
+@pytest.mark.parametrize("bounds", [(1.8, 1.8, 3.4, 4.2), (1.8, 3.0, 2.6, 4.2), (1.8, None, 3.4, 4.2)])
+def test_compile_rules_rejects_bad_bounds(bounds):
+    labels = [(i + 1, bound, f"L{i + 1}") for i, bound in enumerate(bounds)] + [(5, None, "L5")]
+    with pytest.raises(RuleCompileError, match="strictly increasing"):
+        compile_rules(2, _matrix(), labels)
+
+
+def test_rule_compile_error_is_value_error():
+    assert issubclass(RuleCompileError, ValueError)
+
+
+def test_score_by_version_matches_per_version_scoring(rules):
+    stricter = compile_rules(
+        2, _matrix(shift=1), [(1, 1.0, "A"), (2, 2.0, "B"), (3, 3.0, "C"), (4, 4.0, "D"), (5, None, "E")]
+    )
+    rules_by_version = {1: rules, 2: stricter}
+
+    rng = random.Random(5)
+    n = 40
+    versions = [rng.choice([1, 2]) for _ in range(n)]
+    owner = sorted(rng.randrange(n) for _ in range(300))
+    inherent = [round(rng.uniform(1, 5), 2) for _ in owner]
+    kpmr = [rng.randint(1, 5) for _ in owner]
+    weight = [rng.choice([0.1, 0.15, 0.2]) for _ in owner]
+
+    scored = RiskCalculationService.score_assessments_by_version(
+        rules_by_version, versions, inherent, kpmr, weight, owner, n_assessments=n
+    )
+
+    totals = [0.0] * n
+    for row, i in enumerate(owner):
+        version_rules = rules_by_version[versions[i]]
+        result = RiskCalculationService.calculate_row(version_rules, inherent[row], kpmr[row], weight[row])
+        assert scored["risk_rating"][row] == result["risk_rating"]
+        totals[i] += result["composite"]
+
+    assert scored["total_composite"].tolist() == totals
+    assert scored["final_label"].tolist() == [
+        RiskCalculationService.get_final_label(rules_by_version[v], total) for v, total in zip(versions, totals)
+    ]
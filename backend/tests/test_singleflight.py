@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api import assessment as assessment_api
+from app.core.cache import get_idempotency_cache
+from app.core.singleflight import SingleFlight
+from app.schemas.assessment import AssessmentSubmit
+
+pytestmark = pytest.mark.anyio
+
+USER = {"id": 5, "email": "u1@x.com", "role": "erm"}
+
+
+def _submission(kpmr: int = 2) -> AssessmentSubmit:
+    return AssessmentSubmit(period_id=1, unit_type="LPEI", details=[{"risk_type_id": 1, "inherent": 3.2, "kpmr": kpmr}])
+
+
+@pytest.fixture
+def idempotency_cache():
+    cache = get_idempotency_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+async def test_identical_calls_share_one_execution():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await release.wait()
+        return {"id": 1}
+
+    callers = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flight.stats() == {"name": "test", "in_flight": 1, "calls": 3, "coalesced": 2}
+
+    release.set()
+    results = await asyncio.gather(*callers)
+    assert executions == 1
+    assert results[0] is results[1] is results[2]
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_exception_shared_and_key_released():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("KPMR 6 outside rule matrix 1..5")
+
+    results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+    assert [type(r) for r in results] == [ValueError, ValueError]
+
+    # Key dilepas: panggilan berikutnya menjalankan pekerjaan baru
+    async def ok():
+        return 1
+    assert await flight.do("k", ok) == 1
+
+
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", work))
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+
+    release.set()
+    assert await second == "done"
+    assert first.cancelled()
+
+
+async def test_concurrent_identical_submissions_saved_once(monkeypatch, idempotency_cache):
+    release = asyncio.Event()
+    saves = []
+
+    async def fake_calculate(pool, user_id, data):
+        saves.append(user_id)
+        await release.wait()
+        return {"id": 10}
+
+    monkeypatch.setattr(assessment_api, "_calculate", fake_calculate)
+    calls = [
+        asyncio.create_task(assessment_api.calculate_risk_profile(_submission(), Response(), USER, None))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*calls) == [{"id": 10}, {"id": 10}]
+    assert saves == [USER["id"]]
+
+
+async def test_idempotency_key_replays_same_submission(monkeypatch, idempotency_cache):
+    async def fake_calculate(pool, user_id, data):
+        return {"id": 10}
+
+    monkeypatch.setattr(assessment_api, "_calculate", fake_calculate)
+    first = await assessment_api.calculate_risk_profile(_submission(), Response(), USER, None, "abc")
+
+    async def must_not_run(pool, user_id, data):
+        raise AssertionError("replay must not save again")
+
+    monkeypatch.setattr(assessment_api, "_calculate", must_not_run)
+    response = Response()
+    replay = await assessment_api.calculate_risk_profile(_submission(), response, USER, None, "abc")
+    assert replay == first
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+
+async def test_idempotency_key_reused_for_different_submission_is_409(monkeypatch, idempotency_cache):
+    idempotency_cache.put(
+        (USER["id"], "abc"), (assessment_api._submission_key(USER["id"], _submission(kpmr=2)), {"id": 10})
+    )
+
+    async def must_not_run(pool, user_id, data):
+        raise AssertionError("conflicting key must not save")
+
+    monkeypatch.setattr(assessment_api, "_calculate", must_not_run)
+    with pytest.raises(HTTPException) as exc:
+        await assessment_api.calculate_risk_profile(_submission(kpmr=3), Response(), USER, None, "abc")
+    assert exc.value.status_code == 409
+
+    # Key sama milik user lain tidak bentrok
+    monkeypatch.setattr(assessment_api, "_calculate", lambda pool, user_id, data: asyncio.sleep(0, {"id": 11}))
+    other = {**USER, "id": 6}
+    assert await assessment_api.calculate_risk_profile(_submission(kpmr=3), Response(), other, None, "abc") == {"id": 11}
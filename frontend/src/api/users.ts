@@ -2,9 +2,16 @@ import apiClient from './client';
 import { User, UserCreate } from '../types/user';
 
 export const usersApi = {
+  // Endpoint dipaginasi (keyset): ikuti X-Next-After-Id sampai halaman terakhir
   getAllUsers: async (): Promise<User[]> => {
-    const response = await apiClient.get<User[]>('/users/');
-    return response.data;
+    const users: User[] = [];
+    let afterId: string | undefined = '0';
+    while (afterId !== undefined) {
+      const response = await apiClient.get<User[]>('/users/', { params: { after_id: afterId, limit: 1000 } });
+      users.push(...response.data);
+      afterId = response.headers['x-next-after-id'] as string | undefined;
+    }
+    return users;
   },
 
   createUser: async (data: UserCreate): Promise<User> => {
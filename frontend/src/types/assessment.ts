@@ -18,6 +18,7 @@ export interface AssessmentDetailResponse {
   kpmr: number;
   risk_rating: number;
   composite: number;
+  changed?: boolean; // false = tidak berubah dari submission sebelumnya
 }
 
 export interface AssessmentResponse {
@@ -25,6 +26,8 @@ export interface AssessmentResponse {
   final_score: number;
   final_rating: string;
   table_data: AssessmentDetailResponse[];
+  is_new?: boolean;
+  removed_risk_type_ids?: number[];
 }
 
 export interface RiskType {